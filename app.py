@@ -1,10 +1,11 @@
 import os
 
-from flask import Flask, request, Response
+from flask import Flask, request
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 
-from db.db import db
+from db.db import db, get_database_uri, get_sqlite_engine_options
+from db.migrations import run_migrations
 from scheduler.scheduler import Scheduler
 from util.logger import get_logger
 from route.user_routes import user_routes_blueprint
@@ -12,12 +13,14 @@ from route.scheduler_settings_routes import scheduler_settings_blueprint
 from route.email_routes import email_routes_blueprint
 from route.pwned_platform_routes import pwned_platform_routes_blueprint
 from service.user_service import UserService
-from model.response_model import ResponseModel
 from repository.user_repository import UserRepository
 from repository.email_repository import EmailRepository
 from repository.pwned_platform_repository import PwnedPlatformRepository
+from repository.breach_repository import BreachRepository
+from repository.breach_summary_repository import BreachSummaryRepository
 from util.hibp_client import HibpClient
 from util.email_sender import EmailSender
+from util.json_response import OrjsonJSONProvider, json_response
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -25,15 +28,19 @@ logger = get_logger(__name__)
 
 def create_app(config: dict | None = None) -> Flask:
     app = Flask(__name__)
+    app.json = OrjsonJSONProvider(app)
     jwt = JWTManager(app)
-    basedir = os.path.abspath(os.path.dirname(__file__))
     app.config.update(
-        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(basedir, 'db', 'hibp.sqlite3')}",
+        SQLALCHEMY_DATABASE_URI=get_database_uri(),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
         JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY"),
     )
     if config:
         app.config.update(config)
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS",
+        get_sqlite_engine_options(app.config["SQLALCHEMY_DATABASE_URI"]),
+    )
 
     # Blueprints
     logger.info("Registering blueprint")
@@ -48,7 +55,7 @@ def create_app(config: dict | None = None) -> Flask:
         # NOTE: db must be initialized before scheduler,
         #       since scheduler checks the config table
         db.init_app(app)
-        db.create_all()
+        run_migrations()
         jwt.init_app(app)
         EmailSender().init_app(app)
         Scheduler().init_app(app)
@@ -57,12 +64,18 @@ def create_app(config: dict | None = None) -> Flask:
         UserRepository()
         EmailRepository()
         PwnedPlatformRepository()
+        BreachRepository()
+        BreachSummaryRepository()
 
         # Utilities
         HibpClient()
 
     @app.before_request
     def block_until_user_exists():
+        # Static assets are served without touching the database
+        if request.endpoint == "static":
+            return None
+
         is_users_empty: bool = UserRepository().is_table_empty()
         if request.endpoint == "create_dummy_user" and is_users_empty:
             return None
@@ -74,31 +87,19 @@ def create_app(config: dict | None = None) -> Flask:
             return None
 
         if is_users_empty:
-            return Response(
-                response=str(
-                    ResponseModel(
-                        success=False,
-                        message="You have to create an account first!",
-                        data=None,
-                        error="",
-                    ).model_dump()
-                ),
+            return json_response(
+                success=False,
+                message="You have to create an account first!",
+                error="",
                 status=401,
-                mimetype="application/json",
             )
 
         if request.endpoint == "user_routes.register" and not is_users_empty:
-            return Response(
-                response=str(
-                    ResponseModel(
-                        success=False,
-                        message="There is already a user.",
-                        data=None,
-                        error="",
-                    ).model_dump()
-                ),
+            return json_response(
+                success=False,
+                message="There is already a user.",
+                error="",
                 status=409,
-                mimetype="application/json",
             )
 
     @app.before_request
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class EmailRow:
+    """Read-only projection of the emails table for list endpoints"""
+
+    __slots__ = ("id", "email", "last_checked_at", "last_check_status")
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        last_checked_at: Optional[datetime] = None,
+        last_check_status: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.email = email
+        self.last_checked_at = last_checked_at
+        self.last_check_status = last_check_status
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "email": self.email,
+            "last_checked_at": (
+                self.last_checked_at.isoformat() if self.last_checked_at else None
+            ),
+            "last_check_status": self.last_check_status,
+        }
@@ -0,0 +1,66 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+
+class PwnedPlatformRow:
+    """
+    Read-only projection of email_breaches joined with the breach catalog
+    for list endpoints. Built from plain result tuples, so no ORM state is
+    attached to it. Rows of the same breach share one data_classes list.
+    """
+
+    __slots__ = (
+        "id",
+        "email_id",
+        "name",
+        "title",
+        "domain",
+        "breach_date",
+        "added_date",
+        "description",
+        "is_verified",
+        "data_classes",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        email_id: int,
+        name: Optional[str],
+        title: Optional[str],
+        domain: str,
+        breach_date: date,
+        added_date: Optional[datetime],
+        description: Optional[str],
+        is_verified: bool,
+        data_classes: List[str],
+        created_at: Optional[datetime],
+    ) -> None:
+        self.id = id
+        self.email_id = email_id
+        self.name = name
+        self.title = title
+        self.domain = domain
+        self.breach_date = breach_date
+        self.added_date = added_date
+        self.description = description
+        self.is_verified = is_verified
+        self.data_classes = data_classes
+        self.created_at = created_at
+
+    def to_json(self) -> Dict[str, Any]:
+        """Same shape as EmailBreach.to_json"""
+        return {
+            "id": self.id,
+            "email_id": self.email_id,
+            "name": self.name,
+            "title": self.title,
+            "domain": self.domain,
+            "breach_date": self.breach_date.isoformat() if self.breach_date else None,
+            "added_date": self.added_date.isoformat() if self.added_date else None,
+            "description": self.description,
+            "is_verified": self.is_verified,
+            "data_classes": self.data_classes,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
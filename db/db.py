@@ -1,3 +1,6 @@
+import os
+from typing import Any, Dict
+
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import event
@@ -11,10 +14,75 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 
+# "wal" lets the scheduler write breaches while the dashboard reads them,
+# "default" keeps SQLite's rollback journal and only enables foreign keys.
+SQLITE_PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "foreign_keys": "ON",
+    },
+    "wal": {
+        "foreign_keys": "ON",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        # Negative values are KiB, so this is a 64 MiB page cache
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def get_sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Returns the pragmas of the SQLITE_PRAGMA_PROFILE profile, with the
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB and SQLITE_MMAP_SIZE overrides applied.
+    """
+    profile: str = os.getenv("SQLITE_PRAGMA_PROFILE", "wal").lower()
+    pragmas: Dict[str, Any] = dict(
+        SQLITE_PRAGMA_PROFILES.get(profile, SQLITE_PRAGMA_PROFILES["default"])
+    )
+    if os.getenv("SQLITE_BUSY_TIMEOUT_MS"):
+        pragmas["busy_timeout"] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS"))
+    if os.getenv("SQLITE_CACHE_SIZE_KB"):
+        pragmas["cache_size"] = -int(os.getenv("SQLITE_CACHE_SIZE_KB"))
+    if os.getenv("SQLITE_MMAP_SIZE"):
+        pragmas["mmap_size"] = int(os.getenv("SQLITE_MMAP_SIZE"))
+    return pragmas
+
+
+def get_database_uri() -> str:
+    """Returns the URI of the app database, db/hibp.sqlite3"""
+    path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hibp.sqlite3")
+    return f"sqlite:///{path}"
+
+
+def get_sqlite_engine_options(database_uri: str) -> Dict[str, Any]:
+    """
+    Returns SQLALCHEMY_ENGINE_OPTIONS for a SQLite database file.
+    In-memory databases keep SQLAlchemy's single connection pool.
+    """
+    if database_uri in ("sqlite://", "sqlite:///:memory:"):
+        return {}
+
+    busy_timeout_ms: int = get_sqlite_pragmas().get("busy_timeout", 5000)
+    return {
+        "pool_size": int(os.getenv("SQLALCHEMY_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("SQLALCHEMY_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("SQLALCHEMY_POOL_RECYCLE", 3600)),
+        "connect_args": {
+            "timeout": busy_timeout_ms / 1000,
+            # Pooled connections are handed to the scheduler thread as well
+            "check_same_thread": False,
+        },
+    }
+
 
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     if isinstance(dbapi_connection, sqlite3.Connection):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
         cursor.close()
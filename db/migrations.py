@@ -0,0 +1,189 @@
+import json
+from typing import Dict, List, Optional
+
+from sqlalchemy import MetaData, Table, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.db import db
+from db.model.breach import Breach
+from db.model.data_class import DataClass
+from repository.breach_repository import BreachRepository
+from repository.breach_summary_repository import BreachSummaryRepository
+from util.file_lock import FileLock
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _get_lock_path() -> Optional[str]:
+    """Lock file next to the database file, None for in-memory databases"""
+    database: Optional[str] = db.engine.url.database
+    if not database or database == ":memory:":
+        return None
+    return f"{database}.migrate.lock"
+
+
+def run_migrations() -> None:
+    """
+    Creates missing tables and brings an existing database up to date.
+    Every web and sweep worker process calls it at startup, so the steps
+    run under an exclusive file lock: the first process migrates and the
+    others find nothing left to do. Must be called within an app context.
+    """
+    with FileLock(_get_lock_path()):
+        db.create_all()
+        migrate_pwned_platforms()
+        ensure_columns()
+        ensure_indexes()
+        ensure_breach_summary()
+
+
+def ensure_columns() -> None:
+    """
+    Adds nullable columns declared on the models that an existing database
+    is missing, e.g. the last check of emails. db.create_all only creates
+    columns together with new tables. Must be called within an app context,
+    after db.create_all and before ensure_indexes.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.error(
+                    f"Cannot add the required column {column.name} to {table.name}"
+                )
+                continue
+            column_type: str = column.type.compile(dialect=db.engine.dialect)
+            logger.info(f"Adding column {column.name} to {table.name}")
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" '
+                    f'ADD COLUMN "{column.name}" {column_type}'
+                )
+
+
+def ensure_indexes() -> None:
+    """
+    Creates indexes declared on the models that an existing database is missing.
+    db.create_all only creates indexes together with new tables.
+    Must be called within an app context, after db.create_all.
+    """
+    inspector = inspect(db.engine)
+    created: List[str] = []
+    for table in db.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            logger.info(f"Creating index {index.name} on {table.name}")
+            index.create(bind=db.engine, checkfirst=True)
+            created.append(index.name)
+
+    if created:
+        # Refresh the planner statistics so the new indexes are picked up
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+
+
+def _migrate_pwned_platforms_table() -> None:
+    """
+    Adds the breaches of pwned_platforms that are missing from the catalog,
+    links every row to its catalog entry in email_breaches and drops the table.
+    """
+    pwned_platforms = Table("pwned_platforms", MetaData(), autoload_with=db.engine)
+    columns = pwned_platforms.c
+
+    # One row per breach name is enough to fill in a missing catalog entry
+    first_ids = (
+        select(db.func.min(columns.id))
+        .where(columns.name.is_not(None))
+        .group_by(columns.name)
+    )
+    catalog_names = select(Breach.name)
+    missing = db.session.execute(
+        select(pwned_platforms).where(
+            columns.id.in_(first_ids), columns.name.not_in(catalog_names)
+        )
+    ).all()
+    names_by_breach: Dict[str, List[str]] = {
+        row.name: json.loads(row.data_classes) if row.data_classes else []
+        for row in missing
+    }
+    data_classes: Dict[str, DataClass] = BreachRepository().get_data_classes(
+        name for names in names_by_breach.values() for name in names
+    )
+    added: int = 0
+    for row in missing:
+        breach_id: Optional[int] = db.session.execute(
+            sqlite_insert(Breach.__table__)
+            .values(
+                name=row.name,
+                title=row.title,
+                domain=row.domain,
+                breach_date=row.breach_date,
+                added_date=row.added_date,
+                description=row.description,
+                is_verified=row.is_verified,
+            )
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Breach.__table__.c.id)
+        ).scalar()
+        if breach_id is None:
+            continue
+        db.session.get(Breach, breach_id).set_data_classes(
+            [data_classes[name] for name in names_by_breach[row.name]]
+        )
+        added += 1
+    db.session.commit()
+
+    result = db.session.execute(
+        text(
+            "INSERT OR IGNORE INTO email_breaches (email_id, breach_id, detected_at) "
+            "SELECT p.email_id, b.id, COALESCE(p.created_at, p.added_date) "
+            "FROM pwned_platforms p JOIN breaches b ON b.name = p.name "
+            "ORDER BY p.id"
+        )
+    )
+    db.session.execute(text("DROP TABLE IF EXISTS pwned_platforms"))
+    BreachSummaryRepository().rebuild()
+    db.session.commit()
+    logger.info(
+        f"Moved {result.rowcount} pwned platforms to email_breaches, "
+        f"added {added} breaches to the catalog"
+    )
+
+    # Give the space of the dropped table back to the file system
+    with db.engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql(
+            "VACUUM"
+        )
+
+
+def migrate_pwned_platforms() -> None:
+    """
+    Migrates databases from before the breach catalog, where
+    pwned_platforms copied every breach detail per email. Must be called
+    within an app context, after db.create_all and before
+    ensure_breach_summary.
+    """
+    if inspect(db.engine).has_table("pwned_platforms"):
+        _migrate_pwned_platforms_table()
+
+
+def ensure_breach_summary() -> None:
+    """
+    Backfills breach_summary for databases that have email breaches from
+    before the table existed. Must be called within an app context.
+    """
+    repository = BreachSummaryRepository()
+    has_breaches: bool = (
+        db.session.execute(text("SELECT 1 FROM email_breaches LIMIT 1")).first()
+        is not None
+    )
+    if has_breaches and repository.is_table_empty():
+        logger.info("Backfilling breach summaries")
+        repository.rebuild()
+        db.session.commit()
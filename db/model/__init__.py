@@ -1,4 +1,11 @@
 from .email import Email
 from .user import User
-from .pwned_platform import PwnedPlatform
+from .email_breach import EmailBreach
 from .scheduler_config import SchedulerConfig
+from .breach import Breach
+from .data_class import DataClass
+from .breach_data_class import BreachDataClass
+from .breach_summary import BreachSummary
+from .scheduler_lease import SchedulerLease
+from .sweep_job import SweepJob
+from .check_queue_item import CheckQueueItem
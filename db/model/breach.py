@@ -0,0 +1,141 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import relationship
+from ..db import db
+from .breach_data_class import BreachDataClass
+from .data_class import DataClass
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+
+
+class Breach(db.Model):
+    """Local mirror of the HIBP breach catalog (the /breaches endpoint)."""
+
+    __tablename__ = "breaches"
+    __table_args__ = (
+        db.Index("ix_breaches_breach_date", "breach_date"),
+        db.Index("ix_breaches_domain", "domain"),
+    )
+
+    # Columns
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, nullable=False, unique=True)
+    title = db.Column(db.String, nullable=True)
+    domain = db.Column(db.String, nullable=True)
+    breach_date = db.Column(db.Date, nullable=True)
+    added_date = db.Column(db.DateTime, nullable=True)
+    modified_date = db.Column(db.DateTime, nullable=True)
+    pwn_count = db.Column(db.Integer, nullable=False, default=0)
+    description = db.Column(db.String, nullable=True)
+    logo_path = db.Column(db.String, nullable=True)
+    attribution = db.Column(db.String, nullable=True)
+    disclosure_url = db.Column(db.String, nullable=True)
+    is_verified = db.Column(db.Boolean, nullable=False, default=False)
+    is_fabricated = db.Column(db.Boolean, nullable=False, default=False)
+    is_sensitive = db.Column(db.Boolean, nullable=False, default=False)
+    is_retired = db.Column(db.Boolean, nullable=False, default=False)
+    is_spam_list = db.Column(db.Boolean, nullable=False, default=False)
+    is_malware = db.Column(db.Boolean, nullable=False, default=False)
+    is_subscription_free = db.Column(db.Boolean, nullable=False, default=False)
+    is_stealer_log = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
+
+    # Relationships
+    data_class_links = relationship(
+        "BreachDataClass",
+        order_by="BreachDataClass.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="selectin",
+    )
+
+    _COPIED_FIELDS = (
+        "name",
+        "title",
+        "domain",
+        "pwn_count",
+        "description",
+        "attribution",
+        "is_verified",
+        "is_fabricated",
+        "is_sensitive",
+        "is_retired",
+        "is_spam_list",
+        "is_malware",
+        "is_subscription_free",
+        "is_stealer_log",
+    )
+
+    @property
+    def data_classes(self) -> List[str]:
+        """
+        Get data class names as list, in HIBP order, treat it as read-only.
+        Built once per loaded link collection, reloading the links after an
+        expire or refresh replaces the collection and with it the cache.
+        """
+        links: List[BreachDataClass] = self.data_class_links
+        cached: Optional[Tuple[List[BreachDataClass], List[str]]] = self.__dict__.get(
+            "_data_class_names"
+        )
+        if cached is None or cached[0] is not links:
+            cached = (links, [link.data_class.name for link in links])
+            self._data_class_names = cached
+        return cached[1]
+
+    def set_data_classes(self, data_classes: List[DataClass]) -> None:
+        """
+        Replace the data classes of the breach. Existing links are updated in
+        place, since their (breach_id, position) keys would clash otherwise.
+        """
+        links: List[BreachDataClass] = self.data_class_links
+        for position, data_class in enumerate(data_classes):
+            if position < len(links):
+                links[position].data_class = data_class
+            else:
+                links.append(BreachDataClass(position=position, data_class=data_class))
+        del links[len(data_classes) :]
+        # The collection was changed in place, so its identity is unchanged
+        self.__dict__.pop("_data_class_names", None)
+
+    @staticmethod
+    def parse_breach_date(value: str) -> date:
+        """Parse a HIBP BreachDate, which is a date but sometimes a timestamp"""
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+    def update_from_hibp_model(
+        self, model: HibpBreachedSiteModel, data_classes: Dict[str, DataClass]
+    ) -> None:
+        """
+        Copy every catalog field from a validated API model.
+        :param data_classes: DataClass rows by name, covering model.data_classes.
+        """
+        for field in self._COPIED_FIELDS:
+            setattr(self, field, getattr(model, field))
+        self.breach_date = self.parse_breach_date(model.breach_date)
+        # SQLite stores naive datetimes, the API dates are all UTC
+        self.added_date = model.added_date.replace(tzinfo=None)
+        self.modified_date = model.modified_date.replace(tzinfo=None)
+        self.logo_path = str(model.logo_path)
+        self.disclosure_url = (
+            str(model.disclosure_url) if model.disclosure_url else None
+        )
+        self.set_data_classes([data_classes[name] for name in model.data_classes])
+
+    def to_hibp_model(self) -> HibpBreachedSiteModel:
+        """Rebuild the API model without validating the stored values again"""
+        fields: Dict[str, Any] = {
+            field: getattr(self, field) for field in self._COPIED_FIELDS
+        }
+        return HibpBreachedSiteModel.model_construct(
+            **fields,
+            breach_date=self.breach_date.isoformat() if self.breach_date else None,
+            added_date=self.added_date,
+            modified_date=self.modified_date,
+            logo_path=self.logo_path,
+            disclosure_url=self.disclosure_url,
+            data_classes=self.data_classes,
+        )
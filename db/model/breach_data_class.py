@@ -0,0 +1,25 @@
+from sqlalchemy.orm import relationship
+from ..db import db
+
+
+class BreachDataClass(db.Model):
+    """Links a catalog breach to its data classes, in HIBP order."""
+
+    __tablename__ = "breach_data_classes"
+    __table_args__ = (
+        db.Index("ix_breach_data_classes_data_class_id", "data_class_id"),
+    )
+
+    # Columns
+    breach_id = db.Column(
+        db.Integer,
+        db.ForeignKey("breaches.id", ondelete="CASCADE"),  # cascade at DB level
+        primary_key=True,
+    )
+    position = db.Column(db.Integer, primary_key=True)
+    data_class_id = db.Column(
+        db.Integer, db.ForeignKey("data_classes.id"), nullable=False
+    )
+
+    # Relationships
+    data_class = relationship("DataClass", lazy="joined")
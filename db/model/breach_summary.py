@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+from ..db import db
+
+
+class BreachSummary(db.Model):
+    """
+    Per-email breach totals, kept up to date as pwned platforms are saved
+    and deleted so the dashboard does not have to aggregate them.
+    """
+
+    __tablename__ = "breach_summary"
+
+    email_id = db.Column(
+        db.Integer,
+        db.ForeignKey("emails.id", ondelete="CASCADE"),  # cascade at DB level
+        primary_key=True,
+    )
+    breach_count = db.Column(db.Integer, nullable=False, default=0)
+    last_breach_date = db.Column(db.Date, nullable=True)
+    last_detected_at = db.Column(db.DateTime, nullable=True)
+    _data_class_counts = db.Column("data_class_counts", db.Text, nullable=True)
+
+    @property
+    def data_class_counts(self) -> Dict[str, int]:
+        """
+        Get data class totals as dict, treat it as read-only.
+        Decoded once per stored value: the cache is keyed on the identity of
+        the JSON string, which the setter and every expire or refresh replace.
+        """
+        raw: Optional[str] = self._data_class_counts
+        cached: Optional[Tuple[Optional[str], Dict[str, int]]] = self.__dict__.get(
+            "_decoded_data_class_counts"
+        )
+        if cached is None or cached[0] is not raw:
+            cached = (raw, json.loads(raw) if raw else {})
+            self._decoded_data_class_counts = cached
+        return cached[1]
+
+    @data_class_counts.setter
+    def data_class_counts(self, value: Dict[str, int]) -> None:
+        """Store data class totals as JSON string"""
+        self._data_class_counts = json.dumps(value) if value else None
+        self._decoded_data_class_counts = (self._data_class_counts, dict(value))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "email_id": self.email_id,
+            "breach_count": self.breach_count,
+            "last_breach_date": (
+                self.last_breach_date.isoformat() if self.last_breach_date else None
+            ),
+            "last_detected_at": (
+                self.last_detected_at.isoformat() if self.last_detected_at else None
+            ),
+            "data_class_counts": self.data_class_counts,
+        }
@@ -0,0 +1,36 @@
+# db/model/check_queue_item.py
+from datetime import datetime
+from typing import Dict, Any
+from ..db import db
+
+
+class CheckQueueItem(db.Model):
+    """
+    An email waiting to be checked by a sweep worker. Workers lease batches
+    of items, delete them once checked, and items whose lease expired are
+    claimed again until they have been tried max_attempts times.
+    """
+
+    __tablename__ = "check_queue"
+
+    email_id = db.Column(
+        db.Integer,
+        db.ForeignKey("emails.id", ondelete="CASCADE"),  # cascade at DB level
+        primary_key=True,
+    )
+    enqueued_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    # Worker holding the lease, as host:pid
+    leased_by = db.Column(db.String, nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "email_id": self.email_id,
+            "enqueued_at": self.enqueued_at.isoformat() if self.enqueued_at else None,
+            "leased_by": self.leased_by,
+            "lease_expires_at": (
+                self.lease_expires_at.isoformat() if self.lease_expires_at else None
+            ),
+            "attempts": self.attempts,
+        }
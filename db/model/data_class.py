@@ -0,0 +1,11 @@
+from ..db import db
+
+
+class DataClass(db.Model):
+    """Lookup of the HIBP data class names, e.g. "Email addresses"."""
+
+    __tablename__ = "data_classes"
+
+    # Columns
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, nullable=False, unique=True)
@@ -6,6 +6,11 @@ from ..db import db
 class Email(db.Model):
     __tablename__ = "emails"
 
+    # Outcome of the last breach check
+    CHECK_STATUS_OK: str = "ok"
+    CHECK_STATUS_BREACHED: str = "breached"
+    CHECK_STATUS_FAILED: str = "failed"
+
     # Columns
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(
@@ -15,11 +20,16 @@ class Email(db.Model):
     )
     email = db.Column(db.String, nullable=False, unique=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now())
+    # Sweeps check the emails that were checked longest ago first
+    last_checked_at = db.Column(db.DateTime, nullable=True)
+    last_check_status = db.Column(db.String, nullable=True)
+
+    __table_args__ = (db.Index("ix_emails_last_checked_at", "last_checked_at"),)
 
     # Relationships
     user = relationship("User", back_populates="emails")
-    pwned_platforms = relationship(
-        "PwnedPlatform",
+    email_breaches = relationship(
+        "EmailBreach",
         back_populates="email",
         cascade="all, delete-orphan",
         passive_deletes=True,
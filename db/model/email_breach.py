@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy.orm import relationship
+from ..db import db
+
+
+class EmailBreach(db.Model):
+    """
+    An email found in a breach. The breach details live once in the
+    breaches catalog, this row only records which email and when.
+    """
+
+    __tablename__ = "email_breaches"
+    __table_args__ = (
+        # Lets bulk inserts skip breaches that are already saved, its leading
+        # email_id column also serves per-email lookups and cascade deletes
+        db.Index(
+            "uq_email_breaches_email_breach", "email_id", "breach_id", unique=True
+        ),
+        db.Index("ix_email_breaches_breach_id", "breach_id"),
+    )
+
+    # Columns
+    id = db.Column(db.Integer, primary_key=True)
+    email_id = db.Column(
+        db.Integer,
+        db.ForeignKey("emails.id", ondelete="CASCADE"),  # cascade at DB level
+        nullable=False,
+    )
+    breach_id = db.Column(
+        db.Integer,
+        db.ForeignKey("breaches.id", ondelete="CASCADE"),  # cascade at DB level
+        nullable=False,
+    )
+    detected_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    # Relationships
+    email = relationship("Email", back_populates="email_breaches")
+    breach = relationship("Breach", lazy="joined")
+
+    def to_json(self) -> Dict[str, Any]:
+        """Same shape as the pwned_platforms rows this table replaced"""
+        breach = self.breach
+        return {
+            "id": self.id,
+            "email_id": self.email_id,
+            "name": breach.name,
+            "title": breach.title,
+            "domain": breach.domain,
+            "breach_date": (
+                breach.breach_date.isoformat() if breach.breach_date else None
+            ),
+            "added_date": breach.added_date.isoformat() if breach.added_date else None,
+            "description": breach.description,
+            "is_verified": breach.is_verified,
+            "data_classes": breach.data_classes,
+            "created_at": self.detected_at.isoformat() if self.detected_at else None,
+        }
@@ -0,0 +1,32 @@
+# db/model/scheduler_lease.py
+from typing import Dict, Any
+from ..db import db
+
+
+class SchedulerLease(db.Model):
+    """
+    Lease on a scheduler job, held by the one process allowed to run it.
+    The holder renews expires_at while it is alive, any process may take
+    the lease over once it has expired. Times are naive UTC, expires_at
+    by the database's clock.
+    """
+
+    __tablename__ = "scheduler_leases"
+
+    name = db.Column(db.String, primary_key=True)
+    holder = db.Column(db.String, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    # Schedule of the job at the holder, for processes that do not run it
+    next_run_time = db.Column(db.DateTime, nullable=True)
+    trigger = db.Column(db.String, nullable=True)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "holder": self.holder,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "next_run_time": (
+                self.next_run_time.isoformat() if self.next_run_time else None
+            ),
+            "trigger": self.trigger,
+        }
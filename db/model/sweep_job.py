@@ -0,0 +1,54 @@
+# db/model/sweep_job.py
+from datetime import datetime
+from typing import Dict, Any
+from ..db import db
+
+
+class SweepJob(db.Model):
+    """
+    A requested breach check of every email. Jobs are pending until a
+    sweep worker claims them, then running until done or failed. A job
+    whose worker stopped is pending again and resumes from its cursor.
+    Only one job runs at a time.
+    """
+
+    __tablename__ = "sweep_jobs"
+
+    STATUS_PENDING: str = "pending"
+    STATUS_RUNNING: str = "running"
+    STATUS_DONE: str = "done"
+    STATUS_FAILED: str = "failed"
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String, nullable=False, default=STATUS_PENDING)
+    requested_by = db.Column(db.String, nullable=True)
+    requested_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    # Worker that claimed the job, as host:pid
+    worker = db.Column(db.String, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Renewed while the worker runs the job, a job left stale was abandoned
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    # Set when the job first starts, emails last checked before it are still due
+    cursor = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    error = db.Column(db.String, nullable=True)
+
+    __table_args__ = (db.Index("ix_sweep_jobs_status", "status"),)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "requested_by": self.requested_by,
+            "requested_at": (
+                self.requested_at.isoformat() if self.requested_at else None
+            ),
+            "worker": self.worker,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "heartbeat_at": (
+                self.heartbeat_at.isoformat() if self.heartbeat_at else None
+            ),
+            "cursor": self.cursor.isoformat() if self.cursor else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
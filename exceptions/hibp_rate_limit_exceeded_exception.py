@@ -0,0 +1,6 @@
+class HibpRateLimitExceededException(Exception):
+    def __init__(self, attempts: int):
+        self.message = str(
+            f"The hibp platform kept rate limiting the request after {attempts} attempts."
+        )
+        super().__init__(self.message)
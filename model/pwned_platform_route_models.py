@@ -0,0 +1,16 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class PwnedPlatformQueryModel(BaseModel):
+    """Query parameters of GET /api/pwned_platforms"""
+
+    after_id: int = Field(default=0, ge=0)
+    limit: int = Field(default=500, ge=1, le=5000)
+    email_id: Optional[int] = None
+    domain: Optional[str] = None
+    breach_date_from: Optional[date] = None
+    breach_date_to: Optional[date] = None
+    format: str = Field(default="json", pattern="^(json|ndjson)$")
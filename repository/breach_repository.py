@@ -0,0 +1,228 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+
+from decorators.singleton import singleton
+from util.logger import get_logger
+from db.db import db
+from db.model.breach import Breach
+from db.model.breach_data_class import BreachDataClass
+from db.model.data_class import DataClass
+from db.model.email_breach import EmailBreach
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+from base.repository_base_class import RepositoryBaseClass
+
+
+@singleton
+class BreachRepository(RepositoryBaseClass):
+    _IN_CLAUSE_CHUNK_SIZE: int = 500
+
+    def __init__(self):
+        self._logger = get_logger(self.__class__.__name__)
+        self._logger.info("Creating breach repository")
+
+    def insert_one(self, model: Breach) -> bool:
+        try:
+            db.session.add(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_repository.insert_one failed: {e}")
+            return False
+
+    def insert_many(self, models: list[Breach]) -> bool:
+        try:
+            db.session.add_all(models)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_repository.insert_many failed: {e}")
+            return False
+
+    def get_all(self) -> list[Breach]:
+        return Breach.query.all()
+
+    def get_all_by_name(self) -> Dict[str, Breach]:
+        return {breach.name: breach for breach in Breach.query.all()}
+
+    def get_data_classes(self, names: Iterable[str]) -> Dict[str, DataClass]:
+        """
+        Get DataClass rows by name, adding the names that are not in the
+        lookup yet. Does not commit.
+        """
+        names = set(names)
+        data_classes: Dict[str, DataClass] = {
+            data_class.name: data_class
+            for data_class in DataClass.query.filter(DataClass.name.in_(names))
+        }
+        for name in names - data_classes.keys():
+            data_classes[name] = DataClass(name=name)
+            db.session.add(data_classes[name])
+        return data_classes
+
+    def get_data_classes_by_breach_ids(
+        self, breach_ids: Iterable[int]
+    ) -> Dict[int, List[str]]:
+        """
+        Get the data class names of catalog breaches, in HIBP order.
+        Every requested id is in the result, breaches without data classes
+        map to an empty list.
+        """
+        breach_ids = list(breach_ids)
+        data_classes: Dict[int, List[str]] = {breach_id: [] for breach_id in breach_ids}
+        for start in range(0, len(breach_ids), self._IN_CLAUSE_CHUNK_SIZE):
+            chunk = breach_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+            rows = (
+                db.session.query(BreachDataClass.breach_id, DataClass.name)
+                .join(DataClass, DataClass.id == BreachDataClass.data_class_id)
+                .filter(BreachDataClass.breach_id.in_(chunk))
+                .order_by(BreachDataClass.breach_id, BreachDataClass.position)
+            )
+            for breach_id, name in rows:
+                data_classes[breach_id].append(name)
+        return data_classes
+
+    def upsert_from_hibp_models(self, models: List[HibpBreachedSiteModel]) -> bool:
+        """
+        Insert new catalog entries and overwrite existing ones by name. The
+        breach summaries of emails found in entries whose breach date or data
+        classes changed are rebuilt in the same transaction.
+        """
+        try:
+            existing: Dict[str, Breach] = {
+                breach.name: breach
+                for breach in Breach.query.filter(
+                    Breach.name.in_([model.name for model in models])
+                ).all()
+            }
+            data_classes: Dict[str, DataClass] = self.get_data_classes(
+                name for model in models for name in model.data_classes
+            )
+            changed_ids: List[int] = []
+            for model in models:
+                breach: Breach = existing.get(model.name)
+                if breach is None:
+                    breach = Breach()
+                    db.session.add(breach)
+                    breach.update_from_hibp_model(model, data_classes)
+                    continue
+                summarized = (breach.breach_date, list(breach.data_classes))
+                breach.update_from_hibp_model(model, data_classes)
+                if summarized != (breach.breach_date, breach.data_classes):
+                    changed_ids.append(breach.id)
+            self._rebuild_summaries(changed_ids)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(
+                f"breach_repository.upsert_from_hibp_models failed: {e}"
+            )
+            return False
+
+    def _rebuild_summaries(self, breach_ids: List[int]) -> None:
+        """Rebuild the summaries of emails in the given breaches. Does not commit."""
+        # Imported here, the summary repository depends on this one
+        from repository.breach_summary_repository import BreachSummaryRepository
+
+        if not breach_ids:
+            return
+        db.session.flush()
+        email_ids: Set[int] = set()
+        for start in range(0, len(breach_ids), self._IN_CLAUSE_CHUNK_SIZE):
+            chunk = breach_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+            email_ids.update(
+                db.session.execute(
+                    select(EmailBreach.email_id)
+                    .where(EmailBreach.breach_id.in_(chunk))
+                    .distinct()
+                ).scalars()
+            )
+
+        sorted_ids: List[int] = sorted(email_ids)
+        for start in range(0, len(sorted_ids), self._IN_CLAUSE_CHUNK_SIZE):
+            BreachSummaryRepository().rebuild(
+                sorted_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+            )
+        if sorted_ids:
+            self._logger.info(
+                f"Rebuilt the breach summaries of {len(sorted_ids)} emails "
+                f"after {len(breach_ids)} catalog breaches changed"
+            )
+
+    def get_ids_for_hibp_models(
+        self, models: List[HibpBreachedSiteModel]
+    ) -> Optional[Dict[str, int]]:
+        """
+        Get catalog ids by breach name, adding the breaches that are not in
+        the catalog yet. Existing entries are left as they are, the catalog
+        refresh keeps them up to date.
+        :return: Ids by name, or None on failure.
+        """
+        try:
+            names: List[str] = list({model.name for model in models})
+            ids: Dict[str, int] = {}
+            for start in range(0, len(names), self._IN_CLAUSE_CHUNK_SIZE):
+                chunk = names[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+                ids.update(
+                    db.session.query(Breach.name, Breach.id).filter(
+                        Breach.name.in_(chunk)
+                    )
+                )
+
+            missing: Dict[str, HibpBreachedSiteModel] = {
+                model.name: model for model in models if model.name not in ids
+            }
+            if missing:
+                data_classes: Dict[str, DataClass] = self.get_data_classes(
+                    name for model in missing.values() for name in model.data_classes
+                )
+                breaches: List[Breach] = []
+                for model in missing.values():
+                    breach = Breach()
+                    breach.update_from_hibp_model(model, data_classes)
+                    breaches.append(breach)
+                db.session.add_all(breaches)
+                db.session.flush()
+                ids.update((breach.name, breach.id) for breach in breaches)
+                db.session.commit()
+            return ids
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(
+                f"breach_repository.get_ids_for_hibp_models failed: {e}"
+            )
+            return None
+
+    def update_one(self, model: Breach) -> bool:
+        try:
+            db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_repository.update_one failed: {e}")
+            return False
+
+    def update_many(self, models: List[Breach]) -> bool:
+        try:
+            for model in models:
+                db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_repository.update_many failed: {e}")
+            return False
+
+    def delete_one(self, model: Breach) -> bool:
+        try:
+            db.session.delete(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_repository.delete_one failed: {e}")
+            return False
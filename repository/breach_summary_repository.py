@@ -0,0 +1,186 @@
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from decorators.singleton import singleton
+from util.logger import get_logger
+from db.db import db
+from db.model.breach import Breach
+from db.model.breach_summary import BreachSummary
+from db.model.email_breach import EmailBreach
+from repository.breach_repository import BreachRepository
+from base.repository_base_class import RepositoryBaseClass
+
+
+@singleton
+class BreachSummaryRepository(RepositoryBaseClass):
+    _IN_CLAUSE_CHUNK_SIZE: int = 500
+
+    def __init__(self):
+        self._logger = get_logger(self.__class__.__name__)
+        self._logger.info("Creating breach summary repository")
+        self._breach_repository = BreachRepository()
+
+    def insert_one(self, model: BreachSummary) -> bool:
+        try:
+            db.session.add(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_summary_repository.insert_one failed: {e}")
+            return False
+
+    def insert_many(self, models: list[BreachSummary]) -> bool:
+        try:
+            db.session.add_all(models)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_summary_repository.insert_many failed: {e}")
+            return False
+
+    def get_all(self) -> list[BreachSummary]:
+        return BreachSummary.query.order_by(BreachSummary.email_id).all()
+
+    def update_one(self, model: BreachSummary) -> bool:
+        try:
+            db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_summary_repository.update_one failed: {e}")
+            return False
+
+    def update_many(self, models: list[BreachSummary]) -> bool:
+        try:
+            for model in models:
+                db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_summary_repository.update_many failed: {e}")
+            return False
+
+    def delete_one(self, model: BreachSummary) -> bool:
+        try:
+            db.session.delete(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"breach_summary_repository.delete_one failed: {e}")
+            return False
+
+    def is_table_empty(self) -> bool:
+        return db.session.query(BreachSummary.email_id).first() is None
+
+    def add_breaches(self, rows: Iterable[Any]) -> None:
+        """
+        Adds newly inserted email breaches to the summaries of their emails.
+        Does not commit, so it runs in the transaction of the insert.
+        :param rows: EmailBreach objects or named rows with email_id,
+                     breach_id and detected_at.
+        """
+        rows = list(rows)
+        breaches: Dict[int, Tuple[Optional[date], List[str]]] = self._get_breaches(
+            {row.breach_id for row in rows}
+        )
+        deltas: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            breach_date, data_classes = breaches[row.breach_id]
+            delta = deltas.setdefault(
+                row.email_id,
+                {
+                    "count": 0,
+                    "last_breach_date": None,
+                    "last_detected_at": None,
+                    "data_classes": Counter(),
+                },
+            )
+            delta["count"] += 1
+            delta["last_breach_date"] = self._latest(
+                delta["last_breach_date"], breach_date
+            )
+            delta["last_detected_at"] = self._latest(
+                delta["last_detected_at"], row.detected_at
+            )
+            delta["data_classes"].update(data_classes)
+
+        if not deltas:
+            return
+
+        summaries: Dict[int, BreachSummary] = {
+            summary.email_id: summary
+            for summary in BreachSummary.query.filter(
+                BreachSummary.email_id.in_(list(deltas))
+            )
+        }
+        for email_id, delta in deltas.items():
+            summary: Optional[BreachSummary] = summaries.get(email_id)
+            if summary is None:
+                summary = BreachSummary(email_id=email_id, breach_count=0)
+                db.session.add(summary)
+
+            data_class_counts: Counter = Counter(summary.data_class_counts)
+            data_class_counts.update(delta["data_classes"])
+            summary.breach_count += delta["count"]
+            summary.last_breach_date = self._latest(
+                summary.last_breach_date, delta["last_breach_date"]
+            )
+            summary.last_detected_at = self._latest(
+                summary.last_detected_at, delta["last_detected_at"]
+            )
+            summary.data_class_counts = dict(data_class_counts)
+
+    def rebuild(self, email_ids: Optional[List[int]] = None) -> None:
+        """
+        Recomputes summaries from email_breaches, for the given emails or all
+        of them. Used after deletes and to backfill existing databases.
+        Does not commit.
+        """
+        query = BreachSummary.query
+        email_breaches = db.session.query(
+            EmailBreach.email_id, EmailBreach.breach_id, EmailBreach.detected_at
+        )
+        if email_ids is not None:
+            query = query.filter(BreachSummary.email_id.in_(email_ids))
+            email_breaches = email_breaches.filter(EmailBreach.email_id.in_(email_ids))
+
+        query.delete(synchronize_session=False)
+        db.session.expire_all()
+        self.add_breaches(email_breaches.yield_per(1000))
+
+    def _get_breaches(
+        self, breach_ids: Iterable[int]
+    ) -> Dict[int, Tuple[Optional[date], List[str]]]:
+        """Get (breach_date, data class names) of catalog breaches by id"""
+        breach_ids = list(breach_ids)
+        if not breach_ids:
+            return {}
+        data_classes: Dict[int, List[str]] = (
+            self._breach_repository.get_data_classes_by_breach_ids(breach_ids)
+        )
+        breach_dates: Dict[int, Optional[date]] = {}
+        for start in range(0, len(breach_ids), self._IN_CLAUSE_CHUNK_SIZE):
+            chunk = breach_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+            breach_dates.update(
+                db.session.query(Breach.id, Breach.breach_date).filter(
+                    Breach.id.in_(chunk)
+                )
+            )
+        return {
+            breach_id: (breach_dates.get(breach_id), data_classes[breach_id])
+            for breach_id in breach_ids
+        }
+
+    @staticmethod
+    def _latest(first: Optional[Any], second: Optional[Any]) -> Optional[Any]:
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return max(first, second)
@@ -0,0 +1,237 @@
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from decorators.singleton import singleton
+from util.logger import get_logger
+from db.db import db
+from db.model.check_queue_item import CheckQueueItem
+from db.model.email import Email
+from base.repository_base_class import RepositoryBaseClass
+
+
+@singleton
+class CheckQueueRepository(RepositoryBaseClass):
+    """
+    The emails of requested sweeps, shared out to sweep workers in leased
+    batches. An item is claimable while it is not leased, or its lease has
+    expired, and it has been tried fewer than max_attempts times. Emails
+    checked longest ago are claimed first.
+    """
+
+    _IN_CLAUSE_CHUNK_SIZE: int = 500
+
+    def __init__(self):
+        self._logger = get_logger(self.__class__.__name__)
+        self._logger.info("Creating check queue repository")
+
+    def insert_one(self, model: CheckQueueItem) -> bool:
+        try:
+            db.session.add(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.insert_one failed: {e}")
+            return False
+
+    def insert_many(self, models: list[CheckQueueItem]) -> bool:
+        try:
+            db.session.add_all(models)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.insert_many failed: {e}")
+            return False
+
+    def get_all(self) -> list[CheckQueueItem]:
+        return CheckQueueItem.query.order_by(CheckQueueItem.email_id).all()
+
+    def update_one(self, model: CheckQueueItem) -> bool:
+        try:
+            db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.update_one failed: {e}")
+            return False
+
+    def update_many(self, models: list[CheckQueueItem]) -> bool:
+        try:
+            for model in models:
+                db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.update_many failed: {e}")
+            return False
+
+    def delete_one(self, model: CheckQueueItem) -> bool:
+        try:
+            db.session.delete(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.delete_one failed: {e}")
+            return False
+
+    def fill(self, email_ids: list[int]) -> bool:
+        """
+        Queue emails for checking. Emails that are already queued keep
+        their lease and attempts.
+        """
+        try:
+            statement = sqlite_insert(CheckQueueItem.__table__).on_conflict_do_nothing()
+            now: datetime = datetime.now()
+            for start in range(0, len(email_ids), self._IN_CLAUSE_CHUNK_SIZE):
+                db.session.execute(
+                    statement,
+                    [
+                        {"email_id": email_id, "enqueued_at": now, "attempts": 0}
+                        for email_id in email_ids[
+                            start : start + self._IN_CLAUSE_CHUNK_SIZE
+                        ]
+                    ],
+                )
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.fill failed: {e}")
+            return False
+
+    def claim(
+        self, worker: str, limit: int, lease_seconds: float, max_attempts: int
+    ) -> Optional[List[int]]:
+        """
+        Lease up to limit claimable items to worker, in one
+        UPDATE ... RETURNING so two workers never get the same email.
+        :return: The claimed email ids, None on failure.
+        """
+        try:
+            now: datetime = datetime.now()
+            table = CheckQueueItem.__table__
+            claimable = (
+                select(table.c.email_id)
+                .join(Email.__table__, Email.__table__.c.id == table.c.email_id)
+                .where(
+                    or_(
+                        table.c.lease_expires_at.is_(None),
+                        table.c.lease_expires_at < now,
+                    ),
+                    table.c.attempts < max_attempts,
+                )
+                .order_by(
+                    Email.__table__.c.last_checked_at.asc().nulls_first(),
+                    table.c.email_id,
+                )
+                .limit(limit)
+            )
+            statement = (
+                update(table)
+                .where(table.c.email_id.in_(claimable))
+                .values(
+                    leased_by=worker,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=table.c.attempts + 1,
+                )
+                .returning(table.c.email_id)
+            )
+            email_ids: List[int] = list(db.session.execute(statement).scalars())
+            db.session.commit()
+            return sorted(email_ids)
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.claim failed: {e}")
+            return None
+
+    def ack(self, worker: str, email_ids: list[int]) -> bool:
+        """Remove checked items that are still leased to worker."""
+        table = CheckQueueItem.__table__
+        return self._execute_chunked(
+            "ack",
+            email_ids,
+            lambda chunk: delete(table).where(
+                table.c.email_id.in_(chunk), table.c.leased_by == worker
+            ),
+        )
+
+    def release(self, worker: str, email_ids: list[int]) -> bool:
+        """Give leased items back so any worker can retry them right away."""
+        table = CheckQueueItem.__table__
+        return self._execute_chunked(
+            "release",
+            email_ids,
+            lambda chunk: update(table)
+            .where(table.c.email_id.in_(chunk), table.c.leased_by == worker)
+            .values(leased_by=None, lease_expires_at=None),
+        )
+
+    def renew(self, worker: str, email_ids: list[int], lease_seconds: float) -> bool:
+        """Extend the lease of the items still leased to worker during a long batch."""
+        table = CheckQueueItem.__table__
+        lease_expires_at: datetime = datetime.now() + timedelta(seconds=lease_seconds)
+        return self._execute_chunked(
+            "renew",
+            email_ids,
+            lambda chunk: update(table)
+            .where(table.c.email_id.in_(chunk), table.c.leased_by == worker)
+            .values(lease_expires_at=lease_expires_at),
+        )
+
+    def _execute_chunked(
+        self, name: str, email_ids: list[int], make_statement: Callable
+    ) -> bool:
+        try:
+            for start in range(0, len(email_ids), self._IN_CLAUSE_CHUNK_SIZE):
+                chunk = email_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+                db.session.execute(make_statement(chunk))
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.{name} failed: {e}")
+            return False
+
+    def count_remaining(self, max_attempts: int) -> int:
+        """Count items that are leased or will be claimable again."""
+        table = CheckQueueItem.__table__
+        statement = select(func.count()).where(
+            or_(
+                table.c.attempts < max_attempts,
+                table.c.lease_expires_at >= datetime.now(),
+            )
+        )
+        return db.session.execute(statement).scalar()
+
+    def drop_exhausted(self, max_attempts: int) -> List[int]:
+        """
+        Remove items that failed max_attempts times and are no longer leased.
+        :return: The ids of the removed emails.
+        """
+        try:
+            table = CheckQueueItem.__table__
+            result = db.session.execute(
+                delete(table)
+                .where(
+                    table.c.attempts >= max_attempts,
+                    or_(
+                        table.c.lease_expires_at.is_(None),
+                        table.c.lease_expires_at < datetime.now(),
+                    ),
+                )
+                .returning(table.c.email_id)
+            )
+            email_ids: List[int] = sorted(result.scalars())
+            db.session.commit()
+            return email_ids
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"check_queue_repository.drop_exhausted failed: {e}")
+            return []
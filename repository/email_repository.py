@@ -1,6 +1,12 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
 from decorators.singleton import singleton
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, or_, select, update
+from db.model.check_queue_item import CheckQueueItem
 from db.model.email import Email
+from db.custom_data_model.email_row import EmailRow
 from db.db import db
 from base.repository_base_class import RepositoryBaseClass
 from util.logger import get_logger
@@ -8,6 +14,8 @@ from util.logger import get_logger
 
 @singleton
 class EmailRepository(RepositoryBaseClass):
+    _IN_CLAUSE_CHUNK_SIZE: int = 500
+
     def __init__(self):
         self._logger = get_logger(self.__class__.__name__)
         self._logger.info("Creating email repository")
@@ -38,6 +46,84 @@ class EmailRepository(RepositoryBaseClass):
     def get_all(self) -> list[Email]:
         return Email.query.all()
 
+    def get_all_rows(self) -> list[EmailRow]:
+        """Get the id, address and last check of every email, without ORM objects"""
+        statement = select(
+            Email.id, Email.email, Email.last_checked_at, Email.last_check_status
+        ).order_by(Email.id)
+        return [EmailRow(*row) for row in db.session.execute(statement)]
+
+    @staticmethod
+    def _oldest_checked_first():
+        """Never checked emails first, then the ones checked longest ago"""
+        return Email.last_checked_at.asc().nulls_first(), Email.id
+
+    def get_stalest(self, limit: Optional[int] = None) -> list[Email]:
+        """Get emails in the order sweeps check them, oldest checked first"""
+        return Email.query.order_by(*self._oldest_checked_first()).limit(limit).all()
+
+    def get_due_ids(
+        self, checked_before: datetime, limit: Optional[int] = None
+    ) -> list[int]:
+        """
+        Get the ids of emails not checked since checked_before and not in
+        the check queue yet, oldest checked first.
+        """
+        statement = (
+            select(Email.id)
+            .where(
+                or_(
+                    Email.last_checked_at.is_(None),
+                    Email.last_checked_at < checked_before,
+                ),
+                Email.id.not_in(select(CheckQueueItem.email_id)),
+            )
+            .order_by(*self._oldest_checked_first())
+            .limit(limit)
+        )
+        return list(db.session.execute(statement).scalars())
+
+    def count_all(self) -> int:
+        return db.session.execute(select(func.count(Email.id))).scalar()
+
+    def get_by_ids(self, email_ids: list[int]) -> list[Email]:
+        """Get the emails with the given ids in id order, missing ids are skipped"""
+        emails: list[Email] = []
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(email_ids), self._IN_CLAUSE_CHUNK_SIZE):
+            chunk = email_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+            emails.extend(Email.query.filter(Email.id.in_(chunk)).all())
+        return sorted(emails, key=lambda email: email.id)
+
+    def mark_checked(
+        self, statuses: Dict[int, str], checked_at: Optional[datetime] = None
+    ) -> bool:
+        """
+        Record the outcome of breach checks.
+        :param statuses: Email.CHECK_STATUS_* by email id.
+        :param checked_at: Defaults to now.
+        """
+        try:
+            checked_at = checked_at or datetime.now()
+            ids_by_status: Dict[str, List[int]] = {}
+            for email_id, status in statuses.items():
+                ids_by_status.setdefault(status, []).append(email_id)
+
+            for status, email_ids in ids_by_status.items():
+                for start in range(0, len(email_ids), self._IN_CLAUSE_CHUNK_SIZE):
+                    chunk = email_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+                    db.session.execute(
+                        update(Email)
+                        .where(Email.id.in_(chunk))
+                        .values(last_checked_at=checked_at, last_check_status=status)
+                    )
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"email_repository.mark_checked() failed: {e}")
+            return False
+
     def update_one(self, email: Email) -> bool:
         try:
             db.session.merge(email)
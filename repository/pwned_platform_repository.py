@@ -1,19 +1,43 @@
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from decorators.singleton import singleton
 from util.logger import get_logger
 from db.db import db
-from db.model.pwned_platform import PwnedPlatform
+from db.model.breach import Breach
+from db.model.email_breach import EmailBreach
+from db.custom_data_model.pwned_platform_row import PwnedPlatformRow
+from db.model.breach_summary import BreachSummary
+from repository.breach_repository import BreachRepository
+from repository.breach_summary_repository import BreachSummaryRepository
 from base.repository_base_class import RepositoryBaseClass
 
 
 @singleton
 class PwnedPlatformRepository(RepositoryBaseClass):
+    """
+    Pwned platforms are the breaches an email was found in, stored as
+    email_breaches rows that point into the breaches catalog.
+    """
+
+    _IN_CLAUSE_CHUNK_SIZE: int = 500
+    _BULK_INSERT_CHUNK_SIZE: int = 1000
+    _STREAM_BATCH_SIZE: int = 1000
+
     def __init__(self):
         self._logger = get_logger(self.__class__.__name__)
         self._logger.info("Creating pwned platform repository")
+        self._breach_repository = BreachRepository()
+        self._breach_summary_repository = BreachSummaryRepository()
 
     def insert_one(self, model) -> bool:
         try:
             db.session.add(model)
+            db.session.flush()
+            self._breach_summary_repository.add_breaches([model])
             db.session.commit()
             return True
         except Exception as e:
@@ -21,10 +45,12 @@ class PwnedPlatformRepository(RepositoryBaseClass):
             self._logger.exception(f"pwned_platform_repository.insert_one failed: {e}")
             return False
 
-    def insert_many(self, models: list[PwnedPlatform]) -> bool:
+    def insert_many(self, models: list[EmailBreach]) -> bool:
         try:
             for model in models:
                 db.session.add(model)
+            db.session.flush()
+            self._breach_summary_repository.add_breaches(models)
             db.session.commit()
             return True
         except Exception as e:
@@ -32,8 +58,36 @@ class PwnedPlatformRepository(RepositoryBaseClass):
             self._logger.exception(f"pwned_platform_repository.insert_many failed: {e}")
             return False
 
-    def get_all(self) -> list[PwnedPlatform]:
-        return PwnedPlatform.query.all()
+    def bulk_insert(self, rows: list[dict[str, Any]]) -> bool:
+        """
+        Insert email_breaches column dicts (email_id, breach_id, detected_at)
+        with INSERT ... ON CONFLICT DO NOTHING, executed as one executemany
+        per chunk without the unit of work. Rows that already exist for
+        (email_id, breach_id) are skipped.
+        The breach summaries are updated in the same transaction.
+        """
+        try:
+            columns = EmailBreach.__table__.c
+            statement = (
+                sqlite_insert(EmailBreach.__table__)
+                .on_conflict_do_nothing()
+                .returning(columns.email_id, columns.breach_id, columns.detected_at)
+            )
+            for start in range(0, len(rows), self._BULK_INSERT_CHUNK_SIZE):
+                inserted = db.session.execute(
+                    statement, rows[start : start + self._BULK_INSERT_CHUNK_SIZE]
+                ).all()
+                # Only rows that were actually inserted are counted
+                self._breach_summary_repository.add_breaches(inserted)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"pwned_platform_repository.bulk_insert failed: {e}")
+            return False
+
+    def get_all(self) -> list[EmailBreach]:
+        return EmailBreach.query.all()
 
     def update_one(self, model) -> bool:
         try:
@@ -59,6 +113,8 @@ class PwnedPlatformRepository(RepositoryBaseClass):
     def delete_one(self, model) -> bool:
         try:
             db.session.delete(model)
+            db.session.flush()
+            self._breach_summary_repository.rebuild([model.email_id])
             db.session.commit()
             return True
         except Exception as e:
@@ -68,7 +124,9 @@ class PwnedPlatformRepository(RepositoryBaseClass):
 
     def delete_all(self) -> bool:
         try:
-            db.session.query(PwnedPlatform).delete()
+            # The breach catalog is shared and kept
+            db.session.query(EmailBreach).delete()
+            db.session.query(BreachSummary).delete()
             db.session.commit()
             return True
         except Exception as e:
@@ -76,12 +134,130 @@ class PwnedPlatformRepository(RepositoryBaseClass):
             self._logger.exception(f"pwned_platform_repository.delete_all failed: {e}")
             return False
 
-    def get_by_email_id(self, email_id: int) -> list[PwnedPlatform]:
+    def get_by_email_id(self, email_id: int) -> list[EmailBreach]:
         """Get all pwned platforms for a specific email ID"""
         try:
-            return PwnedPlatform.query.filter_by(email_id=email_id).all()
+            return EmailBreach.query.filter_by(email_id=email_id).all()
         except Exception as e:
             self._logger.exception(
                 f"pwned_platform_repository.get_by_email_id failed: {e}"
             )
             return []
+
+    def get_fingerprints_by_email_ids(
+        self, email_ids: list[int]
+    ) -> list[tuple[int, str]] | None:
+        """
+        Get (email_id, breach name) of every pwned platform of the given emails.
+        Only the two columns are selected, no ORM objects are built.
+        Returns None on failure, so callers can tell it apart from no rows.
+        """
+        try:
+            fingerprints: list[tuple[int, str]] = []
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(email_ids), self._IN_CLAUSE_CHUNK_SIZE):
+                chunk = email_ids[start : start + self._IN_CLAUSE_CHUNK_SIZE]
+                fingerprints.extend(
+                    db.session.query(EmailBreach.email_id, Breach.name)
+                    .join(Breach, Breach.id == EmailBreach.breach_id)
+                    .filter(EmailBreach.email_id.in_(chunk))
+                    .all()
+                )
+            return fingerprints
+        except Exception as e:
+            self._logger.exception(
+                f"pwned_platform_repository.get_fingerprints_by_email_ids failed: {e}"
+            )
+            return None
+
+    @staticmethod
+    def _select_rows(
+        email_id: int | None = None,
+        domain: str | None = None,
+        breach_date_from: date | None = None,
+        breach_date_to: date | None = None,
+    ) -> Select:
+        email_breaches = EmailBreach.__table__.c
+        breaches = Breach.__table__.c
+        statement = select(
+            email_breaches.id,
+            email_breaches.email_id,
+            breaches.name,
+            breaches.title,
+            breaches.domain,
+            breaches.breach_date,
+            breaches.added_date,
+            breaches.description,
+            breaches.is_verified,
+            email_breaches.detected_at,
+            email_breaches.breach_id,
+        ).join_from(
+            EmailBreach.__table__,
+            Breach.__table__,
+            email_breaches.breach_id == breaches.id,
+        )
+        if email_id is not None:
+            statement = statement.where(email_breaches.email_id == email_id)
+        if domain is not None:
+            statement = statement.where(breaches.domain == domain)
+        if breach_date_from is not None:
+            statement = statement.where(breaches.breach_date >= breach_date_from)
+        if breach_date_to is not None:
+            statement = statement.where(breaches.breach_date <= breach_date_to)
+        return statement
+
+    def _to_rows(
+        self, rows: Iterable[Row], data_classes: Dict[int, List[str]]
+    ) -> List[PwnedPlatformRow]:
+        """
+        Build PwnedPlatformRows, looking up data classes only for breaches
+        that are not in data_classes yet.
+        :param data_classes: Data class names by breach id, updated in place.
+        """
+        rows = list(rows)
+        missing = {row.breach_id for row in rows} - data_classes.keys()
+        if missing:
+            data_classes.update(
+                self._breach_repository.get_data_classes_by_breach_ids(missing)
+            )
+        return [
+            PwnedPlatformRow(
+                *row[:9],
+                data_classes=data_classes[row.breach_id],
+                created_at=row.detected_at,
+            )
+            for row in rows
+        ]
+
+    def get_page(
+        self, after_id: int = 0, limit: int = 500, **filters
+    ) -> list[PwnedPlatformRow]:
+        """
+        Get up to limit pwned platforms with an id greater than after_id, in id order.
+        Keyset pagination, so every page costs the same no matter how deep it is.
+        Only the columns are selected, no ORM objects are built.
+        :param filters: email_id, domain, breach_date_from and breach_date_to.
+        """
+        statement = (
+            self._select_rows(**filters)
+            .where(EmailBreach.id > after_id)
+            .order_by(EmailBreach.id)
+            .limit(limit)
+        )
+        return self._to_rows(db.session.execute(statement), {})
+
+    def iter_rows(self, after_id: int = 0, **filters) -> Iterator[PwnedPlatformRow]:
+        """
+        Yield every matching pwned platform in id order, fetching
+        _STREAM_BATCH_SIZE rows at a time from the cursor. Data classes are
+        looked up once per breach for the whole stream.
+        """
+        statement = (
+            self._select_rows(**filters)
+            .where(EmailBreach.id > after_id)
+            .order_by(EmailBreach.id)
+            .execution_options(yield_per=self._STREAM_BATCH_SIZE)
+        )
+        data_classes: Dict[int, List[str]] = {}
+        for partition in db.session.execute(statement).partitions():
+            yield from self._to_rows(partition, data_classes)
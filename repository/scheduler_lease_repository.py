@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from decorators.singleton import singleton
+from util.logger import get_logger
+from db.db import db
+from db.model.scheduler_lease import SchedulerLease
+
+
+def _database_now(offset_seconds: float = 0):
+    """
+    The current UTC time by the database's clock, as naive UTC like the
+    other lease times. Leases are shared by every host, so their expiry
+    is never decided by the clock or timezone of one of them.
+    """
+    return func.strftime("%Y-%m-%d %H:%M:%f", "now", f"{offset_seconds:+f} seconds")
+
+
+@singleton
+class SchedulerLeaseRepository:
+    def __init__(self) -> None:
+        self._logger = get_logger(__name__)
+
+    def get(self, name: str) -> Optional[SchedulerLease]:
+        return db.session.get(SchedulerLease, name, populate_existing=True)
+
+    def get_active(self, name: str) -> Optional[SchedulerLease]:
+        """The lease, if it has not expired by the database's clock."""
+        return (
+            SchedulerLease.query.filter(
+                SchedulerLease.name == name,
+                SchedulerLease.expires_at >= _database_now(),
+            )
+            .populate_existing()
+            .first()
+        )
+
+    def acquire(
+        self,
+        name: str,
+        holder: str,
+        ttl_seconds: float,
+        next_run_time: Optional[datetime] = None,
+        trigger: Optional[str] = None,
+    ) -> Optional[bool]:
+        """
+        Take or renew the lease in one atomic upsert. The lease is only
+        overwritten if holder already has it or it has expired, so two
+        processes can never both get it. Expiry is computed and compared
+        in SQL, in UTC.
+        :param next_run_time: Published for processes that do not hold the
+            lease, as naive UTC.
+        :param trigger: Published for processes that do not hold the lease.
+        :return: True if holder has the lease until now + ttl_seconds, False
+            if another process has it, None if the database could not be
+            asked, e.g. while it is locked.
+        """
+        try:
+            table = SchedulerLease.__table__
+            statement = sqlite_insert(table).values(
+                name=name,
+                holder=holder,
+                expires_at=_database_now(ttl_seconds),
+                next_run_time=next_run_time,
+                trigger=trigger,
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={
+                    "holder": statement.excluded.holder,
+                    "expires_at": statement.excluded.expires_at,
+                    "next_run_time": statement.excluded.next_run_time,
+                    "trigger": statement.excluded.trigger,
+                },
+                where=(table.c.holder == holder)
+                | (table.c.expires_at < _database_now()),
+            ).returning(table.c.holder)
+            acquired: bool = db.session.execute(statement).first() is not None
+            db.session.commit()
+            return acquired
+        except Exception as e:
+            db.session.rollback()
+            self._logger.error(f"Failed to acquire lease {name}: {str(e)}")
+            return None
+
+    def release(self, name: str, holder: str) -> bool:
+        """Give the lease up, if holder has it, so another process can take over."""
+        try:
+            SchedulerLease.query.filter_by(name=name, holder=holder).delete()
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.error(f"Failed to release lease {name}: {str(e)}")
+            return False
@@ -0,0 +1,209 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import exists, func, or_, select, update
+
+from decorators.singleton import singleton
+from util.logger import get_logger
+from db.db import db
+from db.model.sweep_job import SweepJob
+from base.repository_base_class import RepositoryBaseClass
+
+
+@singleton
+class SweepJobRepository(RepositoryBaseClass):
+    def __init__(self):
+        self._logger = get_logger(self.__class__.__name__)
+        self._logger.info("Creating sweep job repository")
+
+    def insert_one(self, model: SweepJob) -> bool:
+        try:
+            db.session.add(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.insert_one failed: {e}")
+            return False
+
+    def insert_many(self, models: list[SweepJob]) -> bool:
+        try:
+            db.session.add_all(models)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.insert_many failed: {e}")
+            return False
+
+    def get_all(self) -> list[SweepJob]:
+        return SweepJob.query.order_by(SweepJob.id).all()
+
+    def update_one(self, model: SweepJob) -> bool:
+        try:
+            db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.update_one failed: {e}")
+            return False
+
+    def update_many(self, models: list[SweepJob]) -> bool:
+        try:
+            for model in models:
+                db.session.merge(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.update_many failed: {e}")
+            return False
+
+    def delete_one(self, model: SweepJob) -> bool:
+        try:
+            db.session.delete(model)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.delete_one failed: {e}")
+            return False
+
+    def enqueue(self, requested_by: str) -> Optional[SweepJob]:
+        """
+        Request a sweep. Requests made while one is still pending are
+        merged into it, since a single sweep serves them all.
+        :return: The pending job, None on failure.
+        """
+        try:
+            job: Optional[SweepJob] = SweepJob.query.filter_by(
+                status=SweepJob.STATUS_PENDING
+            ).first()
+            if job is None:
+                job = SweepJob(
+                    status=SweepJob.STATUS_PENDING, requested_by=requested_by
+                )
+                db.session.add(job)
+                db.session.commit()
+            return job
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.enqueue failed: {e}")
+            return None
+
+    def claim(self, worker: str) -> Optional[SweepJob]:
+        """
+        Mark the oldest pending job as running for worker, in one UPDATE so
+        two workers can never claim the same job. Nothing is claimed while
+        another job is running, put abandoned jobs back with requeue or
+        requeue_stale first. The cursor of a resumed job is kept.
+        :return: The claimed job, None if there is no pending job, a job is
+            already running or on failure.
+        """
+        try:
+            now: datetime = datetime.now()
+            table = SweepJob.__table__
+            oldest_pending = (
+                select(table.c.id)
+                .where(table.c.status == SweepJob.STATUS_PENDING)
+                .order_by(table.c.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            statement = (
+                update(table)
+                .where(
+                    table.c.id == oldest_pending,
+                    ~exists().where(table.c.status == SweepJob.STATUS_RUNNING),
+                )
+                .values(
+                    status=SweepJob.STATUS_RUNNING,
+                    worker=worker,
+                    started_at=now,
+                    heartbeat_at=now,
+                    cursor=func.coalesce(table.c.cursor, now),
+                )
+                .returning(table.c.id)
+            )
+            job_id: Optional[int] = db.session.execute(statement).scalar()
+            db.session.commit()
+            if job_id is None:
+                return None
+            return db.session.get(SweepJob, job_id, populate_existing=True)
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.claim failed: {e}")
+            return None
+
+    def finish(self, job: SweepJob, error: Optional[str] = None) -> bool:
+        """Mark a running job as done, or as failed with error."""
+        try:
+            job.status = SweepJob.STATUS_FAILED if error else SweepJob.STATUS_DONE
+            job.error = error
+            job.finished_at = datetime.now()
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.finish failed: {e}")
+            return False
+
+    def requeue(self, job: SweepJob) -> bool:
+        """Put a running job back to pending, so the next claim resumes it."""
+        try:
+            job.status = SweepJob.STATUS_PENDING
+            job.worker = None
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.requeue failed: {e}")
+            return False
+
+    def touch(self, job: SweepJob) -> bool:
+        """Renew the heartbeat of a running job, so it is not taken as abandoned."""
+        try:
+            job.heartbeat_at = datetime.now()
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.touch failed: {e}")
+            return False
+
+    def requeue_stale(self, stale_seconds: float) -> List[int]:
+        """
+        Put running jobs back to pending whose heartbeat is older than
+        stale_seconds, since their worker died, on any host.
+        :return: The ids of the requeued jobs.
+        """
+        try:
+            table = SweepJob.__table__
+            stale_before: datetime = datetime.now() - timedelta(seconds=stale_seconds)
+            result = db.session.execute(
+                update(table)
+                .where(
+                    table.c.status == SweepJob.STATUS_RUNNING,
+                    or_(
+                        table.c.heartbeat_at.is_(None),
+                        table.c.heartbeat_at < stale_before,
+                    ),
+                )
+                .values(status=SweepJob.STATUS_PENDING, worker=None)
+                .returning(table.c.id),
+                execution_options={"synchronize_session": False},
+            )
+            job_ids: List[int] = sorted(result.scalars())
+            db.session.commit()
+            return job_ids
+        except Exception as e:
+            db.session.rollback()
+            self._logger.exception(f"sweep_job_repository.requeue_stale failed: {e}")
+            return []
+
+    def get_running(self) -> list[SweepJob]:
+        return SweepJob.query.filter_by(status=SweepJob.STATUS_RUNNING).all()
+
+    def get_latest(self) -> Optional[SweepJob]:
+        return SweepJob.query.order_by(SweepJob.id.desc()).first()
@@ -1,9 +1,13 @@
+import os
+from typing import Optional, Tuple
+
 from sqlalchemy.exc import IntegrityError
 
 from db.db import db
 from db.model import User
 from base.repository_base_class import RepositoryBaseClass
 from decorators.singleton import singleton
+from util.generation_counter import GenerationCounter
 from util.logger import get_logger
 from exceptions.user_already_exists import UserAlreadyExistsException
 from exceptions.no_user_found_exception import NoUserFoundException
@@ -14,14 +18,37 @@ class UserRepository(RepositoryBaseClass):
     def __init__(self):
         self._logger = get_logger(self.__class__.__name__)
         self._logger.info("Creating user repository")
+        # is_table_empty runs before every request, so its answer is cached
+        # until a user is added or deleted in any worker process.
+        self._generation = GenerationCounter(
+            os.getenv(
+                "USER_GENERATION_PATH",
+                os.path.join(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    "db",
+                    "users.generation",
+                ),
+            )
+        )
+        self._is_empty: Optional[bool] = None
+        self._is_empty_generation: Optional[Tuple[int, ...]] = None
+
+    def is_table_empty(self) -> bool:
+        generation: Tuple[int, ...] = self._generation.current()
+        if self._is_empty is None or generation != self._is_empty_generation:
+            self._is_empty = db.session.query(User.id).first() is None
+            self._is_empty_generation = generation
+        return self._is_empty
 
-    def is_table_empty(self):
-        return db.session.query(User.id).first() is None
+    def _invalidate_is_empty(self) -> None:
+        self._is_empty = None
+        self._generation.bump()
 
     def insert_one(self, model: User) -> bool:
         try:
             db.session.add(model)
             db.session.commit()
+            self._invalidate_is_empty()
             return True
 
         except IntegrityError as e:
@@ -37,6 +64,7 @@ class UserRepository(RepositoryBaseClass):
         try:
             db.session.add_all(models)
             db.session.commit()
+            self._invalidate_is_empty()
             return True
         except Exception as e:
             db.session.rollback()
@@ -96,6 +124,7 @@ class UserRepository(RepositoryBaseClass):
         try:
             db.session.delete(model)
             db.session.commit()
+            self._invalidate_is_empty()
             return True
         except Exception as e:
             db.session.rollback()
@@ -15,13 +15,13 @@ This approach follows REST principles where:
 3. Operations can apply to collections or individual resources
 """
 
-from flask import Blueprint, request, Response, json
+from flask import Blueprint, request, Response
 from flask_jwt_extended import jwt_required
 from pydantic import ValidationError
 
-from model.response_model import ResponseModel
 from model.email_service_models import NewEmailModel
 from service.email_service import EmailService
+from util.json_response import json_response, service_response
 from util.logger import get_logger
 from typing import Dict, Any
 
@@ -38,31 +38,14 @@ def get_all_emails() -> Response:
     try:
         result: Dict[str, Any] = email_service.get_all_emails()
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200)
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -73,31 +56,14 @@ def delete_email_by_id(email_id: int) -> Response:
     try:
         result: Dict[str, Any] = email_service.delete_one_by_id(email_id)
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200 if result.get("success") else 400,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200 if result.get("success") else 400)
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -108,31 +74,14 @@ def delete_all_emails() -> Response:
     try:
         result: Dict[str, Any] = email_service.delete_all_emails()
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200 if result.get("success") else 400,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200 if result.get("success") else 400)
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -144,40 +93,20 @@ def create_email() -> Response:
         new_email = NewEmailModel(**request.get_json())
         result: Dict[str, Any] = email_service.create_email(new_email)
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200 if result.get("success") else 400,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200 if result.get("success") else 400)
 
     except ValidationError as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False, message="Wrong JSON Format!", data=None, error=str(e)
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="Wrong JSON Format!",
+            error=str(e),
             status=422,
-            mimetype="application/json",
         )
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
@@ -5,18 +5,21 @@ This module implements RESTful API endpoints for pwned platform management.
 The routes intentionally use empty path strings with the base URL prefix '/api/pwned-platforms'
 following RESTful conventions:
 
-- GET /api/pwned-platforms     - Retrieve all pwned platforms (collection)
+- GET /api/pwned-platforms     - Retrieve pwned platforms page by page or as a stream
 - DELETE /api/pwned-platforms  - Delete all pwned platforms (clear collection)
+- GET /api/pwned-platforms/summary - Breach totals per email
 
 Since data is added to the pwned platform table via tasks, users cannot add
 pwned platforms voluntarily; they can only view them or delete them all.
 """
 
-from flask import Blueprint, request, Response, json
+from flask import Blueprint, request, Response, stream_with_context
 from flask_jwt_extended import jwt_required
+from pydantic import ValidationError
 
-from model.response_model import ResponseModel
+from model.pwned_platform_route_models import PwnedPlatformQueryModel
 from service.pwned_platform_service import PwnedPlatformService
+from util.json_response import json_response, service_response
 from util.logger import get_logger
 from typing import Dict, Any
 
@@ -31,36 +34,42 @@ pwned_platform_service = PwnedPlatformService()
 @pwned_platform_routes_blueprint.route("", methods=["GET"])
 @jwt_required()
 def get_all_pwned_platforms() -> Response:
-    """Get all pwned platforms"""
-    logger.info("GET /api/pwned-platforms - Getting all pwned platforms")
+    """
+    Get pwned platforms with keyset pagination.
+    Query parameters: after_id, limit, email_id, domain, breach_date_from,
+    breach_date_to and format=ndjson to stream every matching row instead.
+    """
+    logger.info("GET /api/pwned-platforms - Getting pwned platforms")
     try:
-        result: Dict[str, Any] = pwned_platform_service.get_all_pwned_platforms()
-
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200,
-            mimetype="application/json",
+        query = PwnedPlatformQueryModel.model_validate(request.args.to_dict())
+
+        if query.format == "ndjson":
+            return Response(
+                stream_with_context(
+                    pwned_platform_service.stream_pwned_platforms(query)
+                ),
+                status=200,
+                mimetype="application/x-ndjson",
+            )
+
+        result: Dict[str, Any] = pwned_platform_service.get_pwned_platforms_page(query)
+
+        return service_response(result, status=200)
+
+    except ValidationError as e:
+        return json_response(
+            success=False,
+            message="Invalid query parameters!",
+            error=str(e),
+            status=422,
         )
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -72,31 +81,14 @@ def delete_all_pwned_platforms() -> Response:
     try:
         result: Dict[str, Any] = pwned_platform_service.delete_all_pwned_platforms()
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200 if result.get("success") else 400,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200 if result.get("success") else 400)
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -110,29 +102,31 @@ def get_by_email_id(email_id: int) -> Response:
     try:
         result: Dict[str, Any] = pwned_platform_service.get_by_email_id(email_id)
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200 if result.get("success") else 400,
-            mimetype="application/json",
+        return service_response(result, status=200 if result.get("success") else 400)
+
+    except Exception as e:
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
+            status=500,
         )
 
+
+@pwned_platform_routes_blueprint.route("/summary", methods=["GET"])
+@jwt_required()
+def get_summary() -> Response:
+    """Get breach totals per email, read from the breach_summary table only"""
+    logger.info("GET /api/pwned-platforms/summary - Getting breach summary")
+    try:
+        result: Dict[str, Any] = pwned_platform_service.get_breach_summary()
+
+        return service_response(result, status=200 if result.get("success") else 400)
+
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
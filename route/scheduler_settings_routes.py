@@ -1,10 +1,10 @@
-from flask import Blueprint, request, Response, json
+from flask import Blueprint, request, Response
 from pydantic import ValidationError
 from flask_jwt_extended import jwt_required
 from service.scheduler_settings_service import SchedulerSettingsService
-from model.response_model import ResponseModel
 from model.scheduler_setting_route_models import SchedulerSettingsModel
 from typing import Dict, Any
+from util.json_response import json_response, service_response
 
 scheduler_settings_blueprint = Blueprint(
     "scheduler_settings", __name__, url_prefix="/api/scheduler"
@@ -17,18 +17,7 @@ settings_service = SchedulerSettingsService()
 def get_settings() -> Response:
     result: Dict[str, Any] = settings_service.get_pwn_check_settings()
 
-    return Response(
-        response=json.dumps(
-            ResponseModel(
-                success=result.get("success"),
-                message=result.get("message"),
-                data=result.get("data"),
-                error=result.get("error"),
-            ).model_dump()
-        ),
-        status=200 if result.get("success") else 400,
-        mimetype="application/json",
-    )
+    return service_response(result, status=200 if result.get("success") else 400)
 
 
 @scheduler_settings_blueprint.route("/status", methods=["GET"])
@@ -36,18 +25,7 @@ def get_settings() -> Response:
 def get_status() -> Response:
     result: Dict[str, Any] = settings_service.get_scheduler_status()
 
-    return Response(
-        response=json.dumps(
-            ResponseModel(
-                success=result.get("success"),
-                message=result.get("message"),
-                data=result.get("data"),
-                error=result.get("error"),
-            ).model_dump()
-        ),
-        status=200 if result.get("success") else 400,
-        mimetype="application/json",
-    )
+    return service_response(result, status=200 if result.get("success") else 400)
 
 
 @scheduler_settings_blueprint.route("/settings", methods=["PUT"])
@@ -61,40 +39,20 @@ def update_settings() -> Response:
             interval_value=new_settings.interval_value,
         )
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200 if result.get("success") else 400,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200 if result.get("success") else 400)
 
     except ValidationError as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False, message="Wrong JSON Format!", data=None, error=str(e)
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="Wrong JSON Format!",
+            error=str(e),
             status=422,
-            mimetype="application/json",
         )
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
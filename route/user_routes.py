@@ -1,5 +1,5 @@
 from pydantic import ValidationError
-from flask import Blueprint, request, Response, render_template, json
+from flask import Blueprint, request, Response, render_template
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from repository.user_repository import UserRepository
 
@@ -9,8 +9,8 @@ from model.user_route_models import (
     ChangePasswordModel,
 )
 
-from model.response_model import ResponseModel
 from service.user_service import UserService
+from util.json_response import json_response, service_response
 from util.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,42 +38,22 @@ def register() -> Response:
         new_user = CreateNewUserModel(**request.get_json())
         service = UserService()
         result: dict = service.create_user(new_user)
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200)
 
     except ValidationError as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False, message="Wrong JSON Format!", data=None, error=str(e)
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="Wrong JSON Format!",
+            error=str(e),
             status=422,
-            mimetype="application/json",
         )
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -83,42 +63,22 @@ def login() -> Response:
         user_credentials = UserCredentials(**request.get_json())
         service = UserService()
         result: dict = service.login(user_credentials)
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200)
 
     except ValidationError as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False, message="Wrong JSON Format!", data=None, error=str(e)
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="Wrong JSON Format!",
+            error=str(e),
             status=422,
-            mimetype="application/json",
         )
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
 
 
@@ -129,40 +89,20 @@ def change_password() -> Response:
         service = UserService()
         result: dict = service.change_password(password_data.user_name, password_data)
 
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=result.get("success"),
-                    message=result.get("message"),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                ).model_dump()
-            ),
-            status=200,
-            mimetype="application/json",
-        )
+        return service_response(result, status=200)
 
     except ValidationError as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False, message="Wrong JSON Format!", data=None, error=str(e)
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="Wrong JSON Format!",
+            error=str(e),
             status=422,
-            mimetype="application/json",
         )
 
     except Exception as e:
-        return Response(
-            response=json.dumps(
-                ResponseModel(
-                    success=False,
-                    message="An unknown error occurred.",
-                    data=None,
-                    error=str(e),
-                ).model_dump()
-            ),
+        return json_response(
+            success=False,
+            message="An unknown error occurred.",
+            error=str(e),
             status=500,
-            mimetype="application/json",
         )
@@ -1,18 +1,72 @@
-from typing import Dict, List, Any, Optional, Callable
+import atexit
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from flask import Flask
 from flask_apscheduler import APScheduler
 from decorators.singleton import singleton
 from util.logger import get_logger
+from db.model.scheduler_lease import SchedulerLease
 from repository.scheduler_config_repository import SchedulerConfigRepository
+from repository.scheduler_lease_repository import SchedulerLeaseRepository
+from repository.sweep_job_repository import SweepJobRepository
+
+PWN_CHECK_JOB_ID: str = "pwn_check_job"
+HEARTBEAT_JOB_ID: str = "scheduler_heartbeat_job"
 
 
 @singleton
 class Scheduler:
+    """
+    Runs pwn_check_job on APScheduler. The job runs a sweep in this process,
+    or with PWN_CHECK_RUNNER=worker only requests one from the sweep worker.
+
+    With PWN_CHECK_SCHEDULE=rolling the job runs every
+    PWN_CHECK_ROLLING_TICK_SECONDS instead and checks an even slice of the
+    emails each time, so every email is still checked once per configured
+    interval without a burst of lookups, writes and mails at its start.
+
+    Every process that creates the app starts a scheduler, e.g. each
+    gunicorn worker. With leader election (SCHEDULER_LEADER_ELECTION) only
+    the process that holds the pwn_check_job lease in the database runs the
+    job, the others serve HTTP only. Every process renews or tries to take
+    the lease on a heartbeat job, so a crashed leader is replaced once its
+    lease expires after SCHEDULER_LEASE_TTL_SECONDS.
+    """
+
     def __init__(self) -> None:
         self._logger = get_logger(__name__)
         self._scheduler = APScheduler()
         self._config_repo = SchedulerConfigRepository()
+        self._lease_repo = SchedulerLeaseRepository()
+        self._sweep_job_repo = SweepJobRepository()
         self._app = None  # Store app reference
+        self._leader_election: bool = (
+            os.getenv("SCHEDULER_LEADER_ELECTION", "True").lower() == "true"
+        )
+        self._lease_ttl_seconds: float = float(
+            os.getenv("SCHEDULER_LEASE_TTL_SECONDS", 60)
+        )
+        self._heartbeat_seconds: float = float(
+            os.getenv("SCHEDULER_HEARTBEAT_SECONDS", 15)
+        )
+        # "scheduler" runs sweeps in this process, "worker" only enqueues them
+        self._sweep_runner: str = os.getenv("PWN_CHECK_RUNNER", "scheduler").lower()
+        # "burst" sweeps every email once per interval, "rolling" a slice per tick
+        self._sweep_schedule: str = os.getenv("PWN_CHECK_SCHEDULE", "burst").lower()
+        self._rolling_tick_seconds: float = float(
+            os.getenv("PWN_CHECK_ROLLING_TICK_SECONDS", 60)
+        )
+        self._holder: Optional[str] = None
+        self._is_leader: bool = False
+        self._pwn_check_interval: Optional[Tuple[str, int]] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """True if this process runs the jobs"""
+        return self._is_leader or not self._leader_election
 
     def init_app(self, app: Flask) -> None:
         self._app = app  # Store app reference
@@ -23,51 +77,141 @@ class Scheduler:
         with app.app_context():
             self._config_repo.create_default_configs()
         self._scheduler.start()
-        self._register_jobs()
+
+        if not self._leader_election:
+            self._register_jobs()
+            return
+
+        # Set here rather than in __init__, the process may have been forked since
+        self._holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat()
+        self._scheduler.add_job(
+            id=HEARTBEAT_JOB_ID,
+            func=self._heartbeat,
+            trigger="interval",
+            seconds=self._heartbeat_seconds,
+            name="Renew the scheduler lease",
+            max_instances=1,
+            coalesce=True,
+        )
+        atexit.register(self._release_lease)
 
     def _register_jobs(self) -> None:
         self._register_pwn_check_job()
 
-    def _register_pwn_check_job(self) -> None:
-        from task.pwn_checker import PwnChecker
+    def _remove_jobs(self) -> None:
+        try:
+            self._scheduler.remove_job(PWN_CHECK_JOB_ID)
+        except Exception:
+            pass
+        self._pwn_check_interval = None
 
+    def _get_pwn_check_interval(self) -> Tuple[str, int]:
         interval_unit: str = self._config_repo.get_value(
             "pwn_check_interval_unit", "hours"
         )
         interval_value: int = int(
             self._config_repo.get_value("pwn_check_interval_value", "1")
         )
+        return interval_unit, interval_value
 
-        interval_kwargs: Dict[str, int] = {interval_unit: interval_value}
+    def _register_pwn_check_job(self) -> None:
+        from task.sweep_worker import SweepWorker
+
+        interval_unit, interval_value = self._get_pwn_check_interval()
+
+        interval_kwargs: Dict[str, float] = {interval_unit: interval_value}
+        rolling: bool = self._sweep_schedule == "rolling"
+        interval_seconds: float = timedelta(**interval_kwargs).total_seconds()
+        tick_seconds: float = min(self._rolling_tick_seconds, interval_seconds)
+        # Kept between runs, so its checker and catalog sync are reused
+        worker = SweepWorker()
 
         # Create a wrapper function that establishes app context using stored app reference
         def run_with_app_context():
             with self._app.app_context():
-                PwnChecker().run()
+                if rolling and self._sweep_runner == "worker":
+                    # Sweep worker processes check the queued slice
+                    worker.enqueue_slice(interval_seconds, tick_seconds)
+                elif rolling:
+                    worker.run_slice(interval_seconds, tick_seconds)
+                elif self._sweep_runner == "worker":
+                    # A sweep worker process runs it
+                    self._sweep_job_repo.enqueue("scheduler")
+                else:
+                    worker.run_once("scheduler")
 
         self._scheduler.add_job(
-            id="pwn_check_job",
+            id=PWN_CHECK_JOB_ID,
             func=run_with_app_context,
             trigger="interval",
-            **interval_kwargs,
+            **({"seconds": tick_seconds} if rolling else interval_kwargs),
             name="Check for new breaches",
         )
+        self._pwn_check_interval = (interval_unit, interval_value)
 
         self._logger.info(
             f"Scheduled pwn check job to run every {interval_value} {interval_unit}"
+            + (f", a slice every {tick_seconds:g} seconds" if rolling else "")
         )
 
+    def _heartbeat(self) -> None:
+        """Renew or take the lease, then start or stop the jobs to match."""
+        with self._app.app_context():
+            next_run_time: Optional[datetime] = None
+            trigger: Optional[str] = None
+            job = self._scheduler.get_job(PWN_CHECK_JOB_ID)
+            if job is not None:
+                trigger = str(job.trigger)
+                if job.next_run_time:
+                    # Stored as naive UTC
+                    next_run_time = job.next_run_time.astimezone(timezone.utc).replace(
+                        tzinfo=None
+                    )
+
+            is_leader: Optional[bool] = self._lease_repo.acquire(
+                PWN_CHECK_JOB_ID,
+                self._holder,
+                self._lease_ttl_seconds,
+                next_run_time=next_run_time,
+                trigger=trigger,
+            )
+
+            if is_leader is None:
+                # Unknown, e.g. the database is locked. Keep the current role
+                # and try again on the next heartbeat.
+                return
+            if is_leader and not self._is_leader:
+                self._logger.info(f"{self._holder} took the scheduler lease")
+                self._is_leader = True
+                self._register_jobs()
+            elif not is_leader and self._is_leader:
+                self._logger.warning(f"{self._holder} lost the scheduler lease")
+                self._is_leader = False
+                self._remove_jobs()
+            elif is_leader and (
+                self._get_pwn_check_interval() != self._pwn_check_interval
+            ):
+                # The settings were changed through another process
+                self._remove_jobs()
+                self._register_jobs()
+
+    def _release_lease(self) -> None:
+        if not self._is_leader:
+            return
+        with self._app.app_context():
+            self._lease_repo.release(PWN_CHECK_JOB_ID, self._holder)
+        self._is_leader = False
+
     def update_pwn_check_job(self, interval_unit: str, interval_value: int) -> bool:
         try:
-            try:
-                self._scheduler.remove_job("pwn_check_job")
-            except Exception:
-                pass
-
             self._config_repo.set_value("pwn_check_interval_unit", interval_unit)
             self._config_repo.set_value("pwn_check_interval_value", str(interval_value))
 
-            self._register_pwn_check_job()
+            # Other processes pick the settings up on the leader's next heartbeat
+            if self.is_leader:
+                self._remove_jobs()
+                self._register_pwn_check_job()
 
             return True
         except Exception as e:
@@ -75,7 +219,7 @@ class Scheduler:
             return False
 
     def get_jobs(self) -> List[Dict[str, Any]]:
-        return [
+        jobs: List[Dict[str, Any]] = [
             {
                 "id": job.id,
                 "name": job.name,
@@ -83,6 +227,28 @@ class Scheduler:
                 if job.next_run_time
                 else None,
                 "trigger": str(job.trigger),
+                "leader": self._holder,
             }
             for job in self._scheduler.get_jobs()
+            if job.id != HEARTBEAT_JOB_ID
         ]
+        if self.is_leader:
+            return jobs
+
+        # The job runs in another process, report what its leader published
+        lease: Optional[SchedulerLease] = self._lease_repo.get_active(PWN_CHECK_JOB_ID)
+        if lease is not None:
+            jobs.append(
+                {
+                    "id": PWN_CHECK_JOB_ID,
+                    "name": "Check for new breaches",
+                    "next_run_time": lease.next_run_time.replace(
+                        tzinfo=timezone.utc
+                    ).isoformat()
+                    if lease.next_run_time
+                    else None,
+                    "trigger": lease.trigger,
+                    "leader": lease.holder,
+                }
+            )
+        return jobs
@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from decorators.singleton import singleton
+from repository.breach_repository import BreachRepository
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+from util.hibp_client import HibpClient
+from util.logger import get_logger
+
+
+@singleton
+class BreachCatalogService:
+    """
+    Keeps an in-memory copy of the HIBP breach catalog, backed by the breaches table.
+
+    Per-email lookups only return breach names (truncateResponse=true), the
+    details are filled in from this catalog instead of being downloaded and
+    validated again for every email.
+    """
+
+    def __init__(self) -> None:
+        self._logger = get_logger(__name__)
+        self._repository = BreachRepository()
+        self._hibp_client = HibpClient()
+        self._models: Dict[str, HibpBreachedSiteModel] = {}
+        self._modified_dates: Dict[str, datetime] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._models)
+
+    @staticmethod
+    def _parse_modified_date(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+    def _load(self) -> None:
+        for breach in self._repository.get_all():
+            self._models[breach.name] = breach.to_hibp_model()
+            self._modified_dates[breach.name] = breach.modified_date
+        self._logger.info(f"Loaded {len(self._models)} breaches from the catalog")
+
+    def refresh(self) -> bool:
+        """
+        Syncs the catalog with the /breaches endpoint. Only entries that are
+        new or whose ModifiedDate changed are validated and written.
+        Must be called within an app context.
+        :return: True if the catalog is usable, False otherwise.
+        """
+        try:
+            if not self._models:
+                self._load()
+
+            catalog: List[Dict[str, Any]] = self._hibp_client.get_all_breaches()
+            changed: List[HibpBreachedSiteModel] = [
+                HibpBreachedSiteModel.model_validate(item)
+                for item in catalog
+                if self._modified_dates.get(item["Name"])
+                != self._parse_modified_date(item["ModifiedDate"])
+            ]
+            if not changed:
+                self._logger.info("Breach catalog is up to date")
+                return True
+
+            if not self._repository.upsert_from_hibp_models(changed):
+                self._logger.error("Failed to save the breach catalog")
+                return self.is_loaded
+
+            for model in changed:
+                self._models[model.name] = model
+                self._modified_dates[model.name] = model.modified_date.replace(
+                    tzinfo=None
+                )
+            self._logger.info(f"Updated {len(changed)} breaches in the catalog")
+            return True
+
+        except Exception as e:
+            self._logger.error(f"Failed to refresh the breach catalog: {str(e)}")
+            return self.is_loaded
+
+    def resolve(self, names: List[str]) -> Optional[List[HibpBreachedSiteModel]]:
+        """
+        Looks up catalog details for breach names.
+        :param names: Breach names from a truncated breachedaccount response.
+        :return: The matching models, or None if any name is missing from the catalog.
+        """
+        models: List[HibpBreachedSiteModel] = []
+        for name in names:
+            model: Optional[HibpBreachedSiteModel] = self._models.get(name)
+            if model is None:
+                self._logger.warning(f"Breach {name} is not in the catalog yet")
+                return None
+            models.append(model)
+        return models
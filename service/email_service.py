@@ -6,7 +6,9 @@ from decorators.singleton import singleton
 from repository.email_repository import EmailRepository
 from repository.user_repository import UserRepository
 from db.model.email import Email
+from db.custom_data_model.email_row import EmailRow
 from model.email_service_models import NewEmailModel
+from util.hibp_client import HibpClient
 from util.logger import get_logger
 
 
@@ -26,13 +28,11 @@ class EmailService:
         }
 
         try:
-            emails: List[Email] = self._db.get_all()
+            emails: List[EmailRow] = self._db.get_all_rows()
 
             result["success"] = True
             result["message"] = "Successfully retrieved all emails"
-            result["data"] = {
-                "emails": [{"id": email.id, "email": email.email} for email in emails]
-            }
+            result["data"] = {"emails": [email.to_json() for email in emails]}
 
         except Exception as e:
             result["success"] = False
@@ -115,6 +115,8 @@ class EmailService:
             is_created: bool = self._db.insert_one(email)
 
             if is_created:
+                # A re-added address has no stored breaches, it must be diffed in full
+                HibpClient().response_cache.invalidate_email(new_email_data.email)
                 result["success"] = True
                 result["message"] = "Successfully added email"
                 result["data"] = {"email": new_email_data.email}
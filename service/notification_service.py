@@ -1,4 +1,7 @@
-from typing import List
+import os
+import threading
+import time
+from typing import Dict, List, Optional
 
 from decorators.singleton import singleton
 from repository.user_repository import UserRepository
@@ -14,6 +17,81 @@ class NotificationService:
         self._user_repository = UserRepository()
         self._email_sender = EmailSender()
 
+        # "immediate" sends one message per breached email address, "digest"
+        # collects the new breaches of a sweep and sends them as one message.
+        # A digest is also sent once its oldest breach has waited
+        # NOTIFICATION_DIGEST_WINDOW_SECONDS, 0 waits for the end of the sweep.
+        self._mode: str = os.getenv("NOTIFICATION_MODE", "immediate").lower()
+        self._digest_window_seconds: float = float(
+            os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", 0)
+        )
+        self._pending: Dict[str, List[HibpBreachedSiteModel]] = {}
+        self._pending_since: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def notify(
+        self, email_address: str, new_breaches: List[HibpBreachedSiteModel]
+    ) -> bool:
+        """Notify about new breaches of an email address, or add them to the digest.
+
+        Args:
+            email_address: The breached email address
+            new_breaches: List of HibpBreachedSiteModel objects containing breach information
+
+        Returns:
+            bool: False if a message had to be sent and failed, True otherwise
+        """
+        if not new_breaches:
+            return True
+        if self._mode != "digest":
+            return self.send_breach_notification(email_address, new_breaches)
+
+        with self._lock:
+            self._pending.setdefault(email_address, []).extend(new_breaches)
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            window_passed: bool = (
+                self._digest_window_seconds > 0
+                and time.monotonic() - self._pending_since
+                >= self._digest_window_seconds
+            )
+
+        return self.flush() if window_passed else True
+
+    def flush(self) -> bool:
+        """Send every breach collected for the digest in one message.
+
+        Returns:
+            bool: True if the digest was sent or there was nothing to send
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_since = None
+        if not pending:
+            return True
+
+        try:
+            main_account_mail = self._user_repository.get_first()
+            if not main_account_mail or not main_account_mail.email:
+                self._logger.error(
+                    "Cannot send digest: No user found or user has no email"
+                )
+                return False
+
+            result = self._email_sender.send_breach_digest(
+                recipient_email=main_account_mail.email,
+                breached_sites_by_email=pending,
+            )
+            if result:
+                self._logger.info(
+                    f"Sent breach digest for {len(pending)} email addresses"
+                )
+            return result
+
+        except Exception as e:
+            self._logger.error(f"Failed to send breach digest: {str(e)}")
+            return False
+
     def send_breach_notification(
         self, email_address: str, new_breaches: List[HibpBreachedSiteModel]
     ) -> bool:
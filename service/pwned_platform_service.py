@@ -1,9 +1,15 @@
+from collections import Counter
 from logging import Logger
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 
 from decorators.singleton import singleton
 from repository.pwned_platform_repository import PwnedPlatformRepository
-from db.model.pwned_platform import PwnedPlatform
+from repository.breach_summary_repository import BreachSummaryRepository
+from db.model.breach_summary import BreachSummary
+from db.custom_data_model.pwned_platform_row import PwnedPlatformRow
+from model.pwned_platform_route_models import PwnedPlatformQueryModel
+from util.hibp_client import HibpClient
+from util.json_response import dumps
 from util.logger import get_logger
 
 
@@ -11,10 +17,23 @@ from util.logger import get_logger
 class PwnedPlatformService:
     def __init__(self) -> None:
         self._db: PwnedPlatformRepository = PwnedPlatformRepository()
+        self._summary_db: BreachSummaryRepository = BreachSummaryRepository()
         self._logger: Logger = get_logger(self.__class__.__name__)
 
-    def get_all_pwned_platforms(self) -> Dict[str, Any]:
-        """Get all pwned platforms in the system"""
+    @staticmethod
+    def _get_filters(query: PwnedPlatformQueryModel) -> Dict[str, Any]:
+        return query.model_dump(
+            include={"email_id", "domain", "breach_date_from", "breach_date_to"}
+        )
+
+    def get_pwned_platforms_page(
+        self, query: PwnedPlatformQueryModel
+    ) -> Dict[str, Any]:
+        """
+        Get one keyset page of pwned platforms.
+        :param query: Cursor, page size and filters.
+        :return: The page, and the after_id of the next page or None on the last one.
+        """
         result: Dict[str, Any] = {
             "success": False,
             "message": "",
@@ -23,14 +42,20 @@ class PwnedPlatformService:
         }
 
         try:
-            platforms: List[PwnedPlatform] = self._db.get_all()
-
-            # Convert to JSON format
-            platforms_json = [platform.to_json() for platform in platforms]
+            platforms: List[PwnedPlatformRow] = self._db.get_page(
+                after_id=query.after_id,
+                limit=query.limit,
+                **self._get_filters(query),
+            )
 
             result["success"] = True
-            result["message"] = "Successfully retrieved all pwned platforms"
-            result["data"] = {"platforms": platforms_json}
+            result["message"] = "Successfully retrieved pwned platforms"
+            result["data"] = {
+                "platforms": [platform.to_json() for platform in platforms],
+                "next_after_id": (
+                    platforms[-1].id if len(platforms) == query.limit else None
+                ),
+            }
 
         except Exception as e:
             result["success"] = False
@@ -40,6 +65,59 @@ class PwnedPlatformService:
 
         return result
 
+    def stream_pwned_platforms(self, query: PwnedPlatformQueryModel) -> Iterator[bytes]:
+        """
+        Yields every matching pwned platform as one NDJSON line, ignoring the
+        page size. Must be consumed within an app context.
+        """
+        try:
+            for platform in self._db.iter_rows(
+                after_id=query.after_id, **self._get_filters(query)
+            ):
+                yield dumps(platform) + b"\n"
+        except Exception as e:
+            # Headers are already sent, the client sees a truncated stream
+            self._logger.error(f"Failed to stream pwned platforms: {str(e)}")
+
+    def get_breach_summary(self) -> Dict[str, Any]:
+        """
+        Get breach totals per email and across all emails. Only reads the
+        breach_summary table, so the cost grows with emails, not breaches.
+        """
+        result: Dict[str, Any] = {
+            "success": False,
+            "message": "",
+            "data": {},
+            "error": "",
+        }
+
+        try:
+            summaries: List[BreachSummary] = self._summary_db.get_all()
+            data_class_counts: Counter = Counter()
+            for summary in summaries:
+                data_class_counts.update(summary.data_class_counts)
+
+            result["success"] = True
+            result["message"] = "Successfully retrieved breach summary"
+            result["data"] = {
+                "summaries": [summary.to_json() for summary in summaries],
+                "totals": {
+                    "breached_emails": sum(
+                        1 for summary in summaries if summary.breach_count
+                    ),
+                    "breach_count": sum(summary.breach_count for summary in summaries),
+                    "data_class_counts": dict(data_class_counts),
+                },
+            }
+
+        except Exception as e:
+            result["success"] = False
+            result["message"] = "Failed to retrieve breach summary"
+            result["error"] = str(e)
+            self._logger.error(f"Failed to retrieve breach summary: {str(e)}")
+
+        return result
+
     def delete_all_pwned_platforms(self) -> Dict[str, Any]:
         """Delete all pwned platforms in the system"""
         result: Dict[str, Any] = {
@@ -61,6 +139,8 @@ class PwnedPlatformService:
                 deleted = self._db.delete_all()
 
             if deleted:
+                # Cached responses would hide the deleted breaches from the next sweep
+                HibpClient().response_cache.clear()
                 result["success"] = True
                 result["message"] = "Successfully deleted all pwned platforms"
             else:
@@ -85,7 +165,9 @@ class PwnedPlatformService:
         }
 
         try:
-            platforms: List[PwnedPlatform] = self._db.get_by_email_id(email_id)
+            platforms: List[PwnedPlatformRow] = list(
+                self._db.iter_rows(email_id=email_id)
+            )
 
             # Convert to JSON format
             platforms_json = [platform.to_json() for platform in platforms]
@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Union
 from decorators.singleton import singleton
 from util.logger import get_logger
 from repository.scheduler_config_repository import SchedulerConfigRepository
+from repository.sweep_job_repository import SweepJobRepository
 from scheduler.scheduler import Scheduler
 
 
@@ -10,6 +11,7 @@ class SchedulerSettingsService:
     def __init__(self) -> None:
         self._logger = get_logger(__name__)
         self._config_repo = SchedulerConfigRepository()
+        self._sweep_job_repo = SweepJobRepository()
         self._scheduler = Scheduler()
 
     def get_pwn_check_settings(self) -> Dict[str, Any]:
@@ -97,10 +99,14 @@ class SchedulerSettingsService:
 
         try:
             jobs = self._scheduler.get_jobs()
+            last_sweep = self._sweep_job_repo.get_latest()
 
             result["success"] = True
             result["message"] = "Scheduler status retrieved successfully"
-            result["data"] = {"jobs": jobs}
+            result["data"] = {
+                "jobs": jobs,
+                "last_sweep": last_sweep.to_json() if last_sweep else None,
+            }
 
         except Exception as e:
             result["success"] = False
@@ -1,13 +1,16 @@
 /* Breach Management Functions */
 
+const BREACH_PAGE_SIZE = 1000;
+
 function loadBreaches() {
+    // Only per-email totals are loaded up front, breaches are fetched when a card is opened
     $.ajax({
-        url: '/api/pwned_platforms',
+        url: '/api/pwned_platforms/summary',
         method: 'GET',
         headers: getAuthHeaders(),
         success: function(response) {
             if (response.success) {
-                displayBreaches(response.data.platforms);
+                displayBreaches(response.data.summaries.filter(summary => summary.breach_count > 0));
             } else {
                 showAlert('danger', response.message);
             }
@@ -20,10 +23,10 @@ function loadBreaches() {
     });
 }
 
-function displayBreaches(platforms) {
+function displayBreaches(summaries) {
     const breachesContent = $('#breachesContent');
     
-    if (platforms.length === 0) {
+    if (summaries.length === 0) {
         breachesContent.html(`
             <div class="alert alert-success">
                 <h5>Good news!</h5>
@@ -33,27 +36,18 @@ function displayBreaches(platforms) {
         return;
     }
 
-    // Group breaches by email_id
-    const breachesByEmail = {};
-    platforms.forEach(breach => {
-        if (!breachesByEmail[breach.email_id]) {
-            breachesByEmail[breach.email_id] = [];
-        }
-        breachesByEmail[breach.email_id].push(breach);
-    });
-
     // We need to get email information to display email addresses
-    loadEmailsForBreaches(breachesByEmail);
+    loadEmailsForBreaches(summaries);
 }
 
-function loadEmailsForBreaches(breachesByEmail) {
+function loadEmailsForBreaches(summaries) {
     $.ajax({
         url: '/api/email',
         method: 'GET',
         headers: getAuthHeaders(),
         success: function(response) {
             if (response.success) {
-                displayBreachesGrouped(breachesByEmail, response.data.emails);
+                displayBreachSummaries(summaries, response.data.emails);
             } else {
                 $('#breachesContent').html('<div class="alert alert-danger">Failed to load email information</div>');
             }
@@ -64,7 +58,7 @@ function loadEmailsForBreaches(breachesByEmail) {
     });
 }
 
-function displayBreachesGrouped(breachesByEmail, emails) {
+function displayBreachSummaries(summaries, emails) {
     const breachesContent = $('#breachesContent');
     
     // Create email lookup map
@@ -75,10 +69,13 @@ function displayBreachesGrouped(breachesByEmail, emails) {
 
     let breachesHtml = '';
     
-    Object.keys(breachesByEmail).forEach(emailId => {
+    summaries.forEach(summary => {
+        const emailId = summary.email_id;
         const emailAddress = emailMap[emailId] || `Email ID: ${emailId}`;
-        const breaches = breachesByEmail[emailId];
-        const breachCount = breaches.length;
+        const breachCount = summary.breach_count;
+        const lastBreachDate = summary.last_breach_date
+            ? new Date(summary.last_breach_date).toLocaleDateString()
+            : null;
         
         breachesHtml += `
             <div class="breach-card">
@@ -87,56 +84,92 @@ function displayBreachesGrouped(breachesByEmail, emails) {
                         <div>
                             <strong>${emailAddress}</strong>
                             <span class="text-muted ms-2">(${breachCount} breach${breachCount !== 1 ? 'es' : ''})</span>
+                            ${lastBreachDate ? `<span class="text-muted ms-2">Latest: ${lastBreachDate}</span>` : ''}
                         </div>
                         <i class="bi bi-chevron-down" id="chevron-${emailId}"></i>
                     </div>
                 </div>
-                <div class="breach-card-body collapse" id="breaches-${emailId}">
+                <div class="breach-card-body collapse" id="breaches-${emailId}" data-loaded="false">
+                    <div class="text-muted">Loading breaches...</div>
+                </div>
+            </div>
         `;
+    });
+    
+    breachesContent.html(breachesHtml);
+}
+
+function loadEmailBreaches(emailId, afterId, platforms) {
+    $.ajax({
+        url: '/api/pwned_platforms',
+        method: 'GET',
+        data: { email_id: emailId, after_id: afterId, limit: BREACH_PAGE_SIZE },
+        headers: getAuthHeaders(),
+        success: function(response) {
+            if (response.success) {
+                platforms = platforms.concat(response.data.platforms);
+                if (response.data.next_after_id !== null) {
+                    loadEmailBreaches(emailId, response.data.next_after_id, platforms);
+                } else {
+                    displayEmailBreaches(emailId, platforms);
+                }
+            } else {
+                $(`#breaches-${emailId}`).html(`<div class="alert alert-danger">${response.message}</div>`);
+            }
+        },
+        error: function(xhr) {
+            if (!handleAuthError(xhr)) {
+                $(`#breaches-${emailId}`).html('<div class="alert alert-danger">Failed to load breaches</div>');
+            }
+        }
+    });
+}
+
+function displayEmailBreaches(emailId, breaches) {
+    let breachesHtml = '';
+
+    breaches.forEach(breach => {
+        const verificationStatus = breach.is_verified ? 'verified' : 'unverified';
+        const verificationText = breach.is_verified ? 'Verified' : 'Unverified';
+        const breachDate = new Date(breach.breach_date).toLocaleDateString();
         
-        breaches.forEach(breach => {
-            const verificationStatus = breach.is_verified ? 'verified' : 'unverified';
-            const verificationText = breach.is_verified ? 'Verified' : 'Unverified';
-            const breachDate = new Date(breach.breach_date).toLocaleDateString();
-            
-            breachesHtml += `
-                <div class="breach-item">
-                    <div class="breach-header">
-                        <div class="flex-grow-1">
-                            <div class="breach-title">${breach.title || breach.name}</div>
-                            <div class="breach-date">Breach Date: ${breachDate}</div>
-                        </div>
-                        <span class="breach-status breach-${verificationStatus}">${verificationText}</span>
-                    </div>
-                    
-                    ${breach.description ? `<div class="breach-description">${breach.description}</div>` : ''}
-                    
-                    <div class="data-classes">
-                        <strong>Compromised Data:</strong><br>
-                        <div class="mt-1">
-                            ${breach.data_classes && breach.data_classes.length > 0 
-                                ? breach.data_classes.map(dc => `<span class="data-class-tag">${dc}</span>`).join('') 
-                                : '<span class="text-muted">No data classification available</span>'
-                            }
-                        </div>
+        breachesHtml += `
+            <div class="breach-item">
+                <div class="breach-header">
+                    <div class="flex-grow-1">
+                        <div class="breach-title">${breach.title || breach.name}</div>
+                        <div class="breach-date">Breach Date: ${breachDate}</div>
                     </div>
+                    <span class="breach-status breach-${verificationStatus}">${verificationText}</span>
                 </div>
-            `;
-        });
-        
-        breachesHtml += `
+                
+                ${breach.description ? `<div class="breach-description">${breach.description}</div>` : ''}
+                
+                <div class="data-classes">
+                    <strong>Compromised Data:</strong><br>
+                    <div class="mt-1">
+                        ${breach.data_classes && breach.data_classes.length > 0 
+                            ? breach.data_classes.map(dc => `<span class="data-class-tag">${dc}</span>`).join('') 
+                            : '<span class="text-muted">No data classification available</span>'
+                        }
+                    </div>
                 </div>
             </div>
         `;
     });
-    
-    breachesContent.html(breachesHtml);
+
+    $(`#breaches-${emailId}`).html(breachesHtml);
 }
 
 // Global function to toggle breach cards
 window.toggleBreachCard = function(emailId) {
     const cardBody = $(`#breaches-${emailId}`);
     const chevron = $(`#chevron-${emailId}`);
+
+    if (cardBody.attr('data-loaded') === 'false') {
+        cardBody.attr('data-loaded', 'true');
+        loadEmailBreaches(emailId, 0, []);
+    }
     
     cardBody.collapse('toggle');
     
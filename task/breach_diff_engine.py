@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+from repository.pwned_platform_repository import PwnedPlatformRepository
+from util.logger import get_logger
+
+# (email_id, breach name), breach names are unique in the HIBP catalog
+BreachFingerprint = Tuple[int, str]
+
+
+class BreachDiffEngine:
+    """
+    Finds new breaches for a sweep against an in-memory fingerprint index.
+
+    The index is loaded once per sweep with a single projected query instead
+    of loading every breach of an email before diffing it. API results are
+    compared as (email_id, name) tuples, and only breaches that are not in
+    the index yet are turned into rows for a bulk insert.
+    """
+
+    def __init__(self, repository: PwnedPlatformRepository = None) -> None:
+        self._logger = get_logger(__name__)
+        self._repository = repository or PwnedPlatformRepository()
+        self._fingerprints: Set[BreachFingerprint] = set()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def load(self, email_ids: Iterable[int]) -> bool:
+        """
+        Replaces the index with the saved breaches of the given emails.
+        Must be called within an app context.
+        :return: False if the fingerprints could not be loaded.
+        """
+        rows = self._repository.get_fingerprints_by_email_ids(list(email_ids))
+        if rows is None:
+            self._fingerprints = set()
+            return False
+
+        self._fingerprints = {(email_id, name) for email_id, name in rows}
+        self._logger.info(f"Loaded {len(self._fingerprints)} breach fingerprints")
+        return True
+
+    def diff(
+        self, email_id: int, breach_api_results: List[HibpBreachedSiteModel]
+    ) -> List[HibpBreachedSiteModel]:
+        """
+        Returns the breaches of an email that are not in the index yet, and
+        adds them to it so they are reported only once per sweep.
+        :param email_id: ID of the checked email.
+        :param breach_api_results: Breaches returned by HIBP for the email.
+        :return: The new breaches, in API order.
+        """
+        new_breaches: List[HibpBreachedSiteModel] = []
+        for breach in breach_api_results:
+            fingerprint: BreachFingerprint = (email_id, breach.name)
+            if fingerprint in self._fingerprints:
+                continue
+            self._fingerprints.add(fingerprint)
+            new_breaches.append(breach)
+
+        if new_breaches:
+            self._logger.info(
+                f"Found {len(new_breaches)} new breaches for email {email_id}"
+            )
+        return new_breaches
+
+    @staticmethod
+    def to_rows(
+        email_id: int,
+        breaches: List[HibpBreachedSiteModel],
+        breach_ids: Dict[str, int],
+    ) -> List[Dict[str, Any]]:
+        """
+        Turns new breaches into email_breaches column dicts for
+        PwnedPlatformRepository.bulk_insert.
+        :param breach_ids: Catalog ids by breach name.
+        """
+        detected_at: datetime = datetime.now()
+        return [
+            {
+                "email_id": email_id,
+                "breach_id": breach_ids[breach.name],
+                "detected_at": detected_at,
+            }
+            for breach in breaches
+        ]
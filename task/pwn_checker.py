@@ -1,16 +1,27 @@
-from typing import List, Optional, Set
-from datetime import datetime
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import time
 
+from dotenv import load_dotenv
+from flask import current_app, has_app_context
+
 from util.hibp_client import HibpClient
+from util.async_hibp_client import AsyncHibpClient
+from util.rate_limiter import TokenBucketRateLimiter
 from repository.email_repository import EmailRepository
 from repository.pwned_platform_repository import PwnedPlatformRepository
+from repository.breach_repository import BreachRepository
 from service.notification_service import NotificationService
+from service.breach_catalog_service import BreachCatalogService
+from task.breach_diff_engine import BreachDiffEngine
 from db.model.email import Email
-from db.model.pwned_platform import PwnedPlatform
 from model.hibp_breached_site_model import HibpBreachedSiteModel
 from util.logger import get_logger
 
+load_dotenv()
+
 
 class PwnChecker:
     def __init__(self) -> None:
@@ -18,126 +29,271 @@ class PwnChecker:
         self._hibp_client = HibpClient()
         self._email_repository = EmailRepository()
         self._pwned_platform_repository = PwnedPlatformRepository()
+        self._breach_repository = BreachRepository()
         self._notification_service = NotificationService()
+        self._breach_catalog = BreachCatalogService()
+        self._diff_engine = BreachDiffEngine(self._pwned_platform_repository)
         self._rate_limit_wait_time: int = 15
 
+        # With the breach catalog, lookups only fetch breach names and the
+        # details come from the local mirror of /breaches.
+        self._use_breach_catalog: bool = (
+            os.getenv("HIBP_USE_BREACH_CATALOG", "True").lower() == "true"
+        )
+        self._catalog_ready: bool = False
+        # Addresses whose lookup raised in the current run
+        self._failed_lookups: Set[str] = set()
+        # Emails recorded as failed in the current run
+        self._failed_email_ids: List[int] = []
+        # Called after every recorded batch of checks in the current run
+        self._on_progress: Optional[Callable[[], None]] = None
+
+        # Sweep mode is one of "batch", "async" or "sequential". The limiter is
+        # sized to the HIBP subscription tier, so batch and async sweeps are
+        # bound by the quota instead of a fixed sleep.
+        self._mode: str = os.getenv("PWN_CHECK_MODE", "batch").lower()
+        self._requests_per_minute: int = int(os.getenv("HIBP_RATE_LIMIT_RPM", 10))
+        self._max_workers: int = int(os.getenv("PWN_CHECK_MAX_WORKERS", 4))
+        self._db_batch_size: int = int(os.getenv("PWN_CHECK_DB_BATCH_SIZE", 50))
+        if self._mode != "sequential" and not self._hibp_client.rate_limiter:
+            self._hibp_client.rate_limiter = TokenBucketRateLimiter.per_minute(
+                self._requests_per_minute
+            )
+
     def _get_all_emails(self) -> List[Email]:
-        return self._email_repository.get_all()
+        return self._email_repository.get_stalest()
+
+    def _refresh_breach_catalog(self) -> None:
+        self._catalog_ready = (
+            self._use_breach_catalog and self._breach_catalog.refresh()
+        )
 
-    def _check_email_for_breaches(self, email: Email) -> Optional[List[PwnedPlatform]]:
+    def _fetch_breaches(
+        self, email_address: str
+    ) -> Optional[List[HibpBreachedSiteModel]]:
+        """
+        Looks up an address on HIBP. Safe to call from worker threads.
+        Returns None when nothing was found or the response is unchanged
+        since the last sweep, since there is nothing new to diff then.
+        """
         try:
-            breach_api_results: List[HibpBreachedSiteModel] = (
-                self._hibp_client.get_breached_accounts(email=email.email)
+            if self._catalog_ready:
+                breach_names, changed = self._hibp_client.lookup_breached_account_names(
+                    email=email_address
+                )
+                if not changed or not breach_names:
+                    return None
+
+                breach_api_results = self._breach_catalog.resolve(breach_names)
+                if breach_api_results is not None:
+                    return breach_api_results
+                self._logger.info(
+                    f"Catalog is missing breaches for {email_address}, "
+                    f"falling back to a full lookup"
+                )
+
+            breach_api_results, changed = self._hibp_client.lookup_breached_accounts(
+                email=email_address
             )
-            self._logger.info(f"Breach api results: {breach_api_results}")
-            if not breach_api_results:
+            if not changed:
+                self._logger.info(f"Breach api results unchanged for {email_address}")
                 return None
 
-            existing_breaches = set(
-                self._pwned_platform_repository.get_by_email_id(email.id)
-            )
-            self._logger.info(f"Existing breaches are: {existing_breaches}")
-
-            breach_api_comparison = set()
-            for breach in breach_api_results:
-                added_date = breach.added_date
-                if isinstance(added_date, str):
-                    added_date = datetime.fromisoformat(
-                        added_date.replace("Z", "+00:00")
-                    )
-                breach_date = breach.breach_date
-                if isinstance(breach_date, str):
-                    try:
-                        breach_date = datetime.fromisoformat(
-                            breach_date.replace("Z", "+00:00")
-                        ).date()
-                    except Exception:
-                        breach_date = datetime.strptime(breach_date, "%Y-%m-%d").date()
-                breach_api_comparison.add(
-                    PwnedPlatform(
-                        name=breach.name,
-                        title=breach.title,
-                        domain=breach.domain,
-                        breach_date=breach_date,
-                        added_date=added_date,
-                        description=breach.description,
-                        is_verified=breach.is_verified,
-                        data_classes=breach.data_classes,
-                    )
+            self._logger.info(f"Breach api results: {breach_api_results}")
+            return breach_api_results
+
+        except Exception as e:
+            self._logger.error(f"Error checking breaches for {email_address}: {str(e)}")
+            self._failed_lookups.add(email_address)
+            return None
+
+    async def _fetch_breaches_async(
+        self, client: AsyncHibpClient, email_address: str
+    ) -> Optional[List[HibpBreachedSiteModel]]:
+        """Event loop counterpart of _fetch_breaches."""
+        try:
+            if self._catalog_ready:
+                breach_names, changed = await client.lookup_breached_account_names(
+                    email=email_address
                 )
+                if not changed or not breach_names:
+                    return None
+
+                breach_api_results = self._breach_catalog.resolve(breach_names)
+                if breach_api_results is not None:
+                    return breach_api_results
 
-            new_breaches: Set[PwnedPlatform] = breach_api_comparison - existing_breaches
-            self._logger.info(f"Found {len(new_breaches)} new breaches!")
-            return list(new_breaches)
+            breach_api_results, changed = await client.lookup_breached_accounts(
+                email=email_address
+            )
+            return breach_api_results if changed else None
 
         except Exception as e:
-            self._logger.error(f"Error checking breaches for {email.email}: {str(e)}")
+            self._logger.error(f"Error checking breaches for {email_address}: {str(e)}")
+            self._failed_lookups.add(email_address)
             return None
 
-    def _save_breaches(self, email: Email, breaches: List[PwnedPlatform]) -> bool:
-        try:
-            if not breaches:
-                return True
+    def _check_email_for_breaches(
+        self, email: Email
+    ) -> Optional[List[HibpBreachedSiteModel]]:
+        breach_api_results: Optional[List[HibpBreachedSiteModel]] = (
+            self._fetch_breaches(email.email)
+        )
+        if not breach_api_results:
+            return None
 
-            for breach in breaches:
-                breach.email_id = email.id
+        return self._diff_engine.diff(email.id, breach_api_results)
 
-            result = self._pwned_platform_repository.insert_many(breaches)
-            if result:
-                self._logger.info(
-                    f"Saved {len(breaches)} new breaches for {email.email}"
-                )
-            else:
-                self._logger.error(f"Failed to save breaches for {email.email}")
+    def _get_check_status(self, email_address: str) -> str:
+        """Status of a check that found no new breaches"""
+        if email_address in self._failed_lookups:
+            return Email.CHECK_STATUS_FAILED
+        return Email.CHECK_STATUS_OK
 
-            return result
+    def _record_checks(self, checks: List[Tuple[int, str, str]]) -> None:
+        """
+        Saves the statuses of checked emails, then commits their cached HIBP
+        responses, or discards them if the check failed so the next sweep
+        diffs them again.
+        :param checks: (email_id, email_address, status) per email.
+        """
+        if not checks:
+            return
+        statuses: Dict[int, str] = {email_id: status for email_id, _, status in checks}
+        if not self._email_repository.mark_checked(statuses):
+            self._logger.error(f"Failed to record the checks of {len(checks)} emails")
 
-        except Exception as e:
-            self._logger.error(f"Error saving breaches for {email.email}: {str(e)}")
-            return False
+        response_cache = self._hibp_client.response_cache
+        for email_id, email_address, status in checks:
+            if status == Email.CHECK_STATUS_FAILED:
+                self._failed_email_ids.append(email_id)
+                response_cache.discard_email(email_address)
+            else:
+                response_cache.commit_email(email_address)
+        if self._on_progress is not None:
+            self._on_progress()
+
+    def _load_fingerprints(self, emails: List[Email]) -> bool:
+        if self._diff_engine.load(email.id for email in emails):
+            return True
+        self._logger.error("Could not load saved breaches, skipping this sweep")
+        return False
 
     def _send_notification(
-        self, email: Email, breaches: List[HibpBreachedSiteModel]
+        self, email_address: str, breaches: List[HibpBreachedSiteModel]
     ) -> bool:
         try:
             if not breaches:
                 return True
 
-            result = self._notification_service.send_breach_notification(
-                email_address=email.email, new_breaches=breaches
+            result = self._notification_service.notify(
+                email_address=email_address, new_breaches=breaches
             )
 
             if result:
-                self._logger.info(f"Sent breach notification for {email.email}")
+                self._logger.info(f"Notified about new breaches of {email_address}")
             else:
                 self._logger.error(
-                    f"Failed to send breach notification for {email.email}"
+                    f"Failed to send breach notification for {email_address}"
                 )
 
             return result
 
         except Exception as e:
             self._logger.error(
-                f"Error sending notification for {email.email}: {str(e)}"
+                f"Error sending notification for {email_address}: {str(e)}"
             )
             return False
 
-    def run(self) -> None:
+    def flush_notifications(self) -> None:
+        """
+        Sends the digest of the sweep, a no-op outside of digest mode.
+        Callers checking a sweep in several runs call it once at the end.
+        """
+        try:
+            if not self._notification_service.flush():
+                self._logger.error("Failed to send the breach digest")
+        except Exception as e:
+            self._logger.error(f"Error sending the breach digest: {str(e)}")
+
+    def _prepare(
+        self, emails: Optional[List[Email]], refresh_catalog: bool
+    ) -> Optional[List[Email]]:
+        """Refreshes the catalog and loads the fingerprints of the emails to check."""
+        if refresh_catalog:
+            self._refresh_breach_catalog()
+        self._failed_lookups = set()
+        self._failed_email_ids = []
+        if emails is None:
+            emails = self._get_all_emails()
+        if self._load_fingerprints(emails):
+            return emails
+        self._failed_email_ids = [email.id for email in emails]
+        return None
+
+    def run(
+        self,
+        emails: Optional[List[Email]] = None,
+        refresh_catalog: bool = True,
+        flush_notifications: bool = True,
+        on_progress: Optional[Callable[[], None]] = None,
+    ) -> List[int]:
+        """
+        Checks emails, all of them oldest checked first by default, and
+        records when and with which outcome each one was checked.
+        :param refresh_catalog: False skips syncing the breach catalog, for
+            callers checking one batch after another with the same instance.
+        :param flush_notifications: False keeps the digest pending, so those
+            callers send one digest for the whole sweep.
+        :param on_progress: Called on the database thread after every
+            recorded batch of checks, e.g. to renew a lease on the emails.
+        :return: The ids of the emails that could not be checked, e.g.
+            because their lookup failed, so the caller can retry them.
+        """
+        self._on_progress = on_progress
+        try:
+            if self._mode == "async":
+                self.run_async(emails, refresh_catalog)
+            elif self._mode == "sequential":
+                self.run_sequential(emails, refresh_catalog)
+            else:
+                self.run_batch(emails, refresh_catalog)
+        finally:
+            self._on_progress = None
+
+        if flush_notifications:
+            self.flush_notifications()
+        return list(self._failed_email_ids)
+
+    def run_sequential(
+        self, emails: Optional[List[Email]] = None, refresh_catalog: bool = True
+    ) -> None:
         self._logger.info("Starting breach check for all emails")
-        emails: list[Email] = self._get_all_emails()
+        emails = self._prepare(emails, refresh_catalog)
+        if emails is None:
+            return
 
         for i, email in enumerate(emails):
             self._logger.info(f"Processing email {i + 1}/{len(emails)}: {email.email}")
 
-            new_breaches: Optional[List[PwnedPlatform]] = (
+            new_breaches: Optional[List[HibpBreachedSiteModel]] = (
                 self._check_email_for_breaches(email)
             )
 
+            status: str = self._get_check_status(email.email)
             if new_breaches:
-                save_result: bool = self._save_breaches(email, new_breaches)
+                save_result: bool = self._save_breach_batch(
+                    [(email.id, email.email, new_breaches)]
+                )
+                status = (
+                    Email.CHECK_STATUS_BREACHED
+                    if save_result
+                    else Email.CHECK_STATUS_FAILED
+                )
 
                 if save_result:
-                    self._send_notification(email, new_breaches)
+                    self._send_notification(email.email, new_breaches)
+            self._record_checks([(email.id, email.email, status)])
 
             if i < len(emails) - 1:
                 self._logger.info(
@@ -146,3 +302,227 @@ class PwnChecker:
                 time.sleep(self._rate_limit_wait_time)
 
         self._logger.info("Completed breach check for all emails")
+
+    def run_batch(
+        self, emails: Optional[List[Email]] = None, refresh_catalog: bool = True
+    ) -> None:
+        """
+        Checks all emails in three stages:
+        1. HIBP lookups on a bounded worker pool, paced by the rate limiter.
+        2. Diffing against the fingerprint index on the calling thread, which
+           owns the database session, as lookups complete. New breaches are
+           bulk inserted, and the checks recorded, every PWN_CHECK_DB_BATCH_SIZE
+           emails.
+        3. Notifications, once every lookup has been saved. In digest mode
+           they are collected and sent as one message by run.
+        """
+        self._logger.info(
+            f"Starting batch breach check with {self._max_workers} workers "
+            f"at {self._requests_per_minute} requests/minute"
+        )
+        emails = self._prepare(emails, refresh_catalog)
+        if emails is None:
+            return
+        # Read the addresses up front, worker threads must not touch ORM objects.
+        emails_by_address: Dict[str, Email] = {email.email: email for email in emails}
+        pending_writes: List[Tuple[int, str, List[HibpBreachedSiteModel]]] = []
+        pending_notifications: List[Tuple[str, List[HibpBreachedSiteModel]]] = []
+        # Statuses of checked emails without pending writes, by email id
+        pending_checks: List[Tuple[int, str, str]] = []
+
+        def flush_writes() -> None:
+            if pending_writes:
+                saved: bool = self._save_breach_batch(pending_writes)
+                if saved:
+                    pending_notifications.extend(
+                        (address, breaches) for _, address, breaches in pending_writes
+                    )
+                status: str = (
+                    Email.CHECK_STATUS_BREACHED if saved else Email.CHECK_STATUS_FAILED
+                )
+                pending_checks.extend(
+                    (email_id, address, status)
+                    for email_id, address, _ in pending_writes
+                )
+            pending_writes.clear()
+            self._record_checks(pending_checks[:])
+            pending_checks.clear()
+
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="pwn_checker"
+        ) as executor:
+            futures: Dict[Future, str] = {
+                executor.submit(self._fetch_breaches, address): address
+                for address in emails_by_address
+            }
+
+            for i, future in enumerate(as_completed(futures)):
+                address: str = futures[future]
+                email: Email = emails_by_address[address]
+                self._logger.info(f"Processing email {i + 1}/{len(futures)}: {address}")
+
+                breach_api_results: Optional[List[HibpBreachedSiteModel]] = (
+                    future.result()
+                )
+                new_breaches: List[HibpBreachedSiteModel] = (
+                    self._diff_engine.diff(email.id, breach_api_results)
+                    if breach_api_results
+                    else []
+                )
+                if new_breaches:
+                    pending_writes.append((email.id, address, new_breaches))
+                else:
+                    pending_checks.append(
+                        (email.id, address, self._get_check_status(address))
+                    )
+                if len(pending_writes) + len(pending_checks) >= self._db_batch_size:
+                    flush_writes()
+
+        flush_writes()
+
+        for address, new_breaches in pending_notifications:
+            self._send_notification(address, new_breaches)
+
+        self._logger.info("Completed batch breach check for all emails")
+
+    def run_async(
+        self, emails: Optional[List[Email]] = None, refresh_catalog: bool = True
+    ) -> None:
+        """
+        Checks all emails on an asyncio event loop, keeping up to
+        PWN_CHECK_MAX_WORKERS lookups in flight under the rate limiter.
+        Diffing against the fingerprint index runs on the loop, batched writes
+        and notifications are handed to a single database thread.
+        """
+        self._logger.info(
+            f"Starting async breach check with {self._max_workers} requests in flight "
+            f"at {self._requests_per_minute} requests/minute"
+        )
+        emails = self._prepare(emails, refresh_catalog)
+        if emails is None:
+            return
+        targets: List[Tuple[int, str]] = [(email.id, email.email) for email in emails]
+        app = current_app._get_current_object() if has_app_context() else None
+
+        with ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="pwn_checker_db"
+        ) as db_executor:
+            asyncio.run(self._run_async_sweep(targets, app, db_executor))
+
+        self._logger.info("Completed async breach check for all emails")
+
+    async def _run_async_sweep(
+        self,
+        targets: List[Tuple[int, str]],
+        app: Any,
+        db_executor: ThreadPoolExecutor,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+
+        def run_in_db_thread(func: Callable, *args) -> asyncio.Future:
+            def call():
+                if app is None:
+                    return func(*args)
+                with app.app_context():
+                    return func(*args)
+
+            return loop.run_in_executor(db_executor, call)
+
+        semaphore = asyncio.Semaphore(self._max_workers)
+        pending_writes: List[Tuple[int, str, List[HibpBreachedSiteModel]]] = []
+        pending_notifications: List[Tuple[str, List[HibpBreachedSiteModel]]] = []
+        pending_checks: List[Tuple[int, str, str]] = []
+
+        async def flush_writes() -> None:
+            batch = pending_writes[:]
+            pending_writes.clear()
+            checks = pending_checks[:]
+            pending_checks.clear()
+            saved: bool = bool(batch) and await run_in_db_thread(
+                self._save_breach_batch, batch
+            )
+            if saved:
+                pending_notifications.extend(
+                    (address, breaches) for _, address, breaches in batch
+                )
+            status: str = (
+                Email.CHECK_STATUS_BREACHED if saved else Email.CHECK_STATUS_FAILED
+            )
+            checks.extend((email_id, address, status) for email_id, address, _ in batch)
+            await run_in_db_thread(self._record_checks, checks)
+
+        async def check(email_id: int, address: str) -> None:
+            async with semaphore:
+                breach_api_results = await self._fetch_breaches_async(client, address)
+
+            new_breaches: List[HibpBreachedSiteModel] = (
+                self._diff_engine.diff(email_id, breach_api_results)
+                if breach_api_results
+                else []
+            )
+            if new_breaches:
+                pending_writes.append((email_id, address, new_breaches))
+            else:
+                pending_checks.append(
+                    (email_id, address, self._get_check_status(address))
+                )
+            if len(pending_writes) + len(pending_checks) >= self._db_batch_size:
+                await flush_writes()
+
+        async with AsyncHibpClient(
+            rate_limiter=self._hibp_client.rate_limiter
+        ) as client:
+            await asyncio.gather(
+                *(check(email_id, address) for email_id, address in targets)
+            )
+        await flush_writes()
+
+        for address, new_breaches in pending_notifications:
+            await run_in_db_thread(self._send_notification, address, new_breaches)
+
+    def _save_breach_batch(
+        self, batch: List[Tuple[int, str, List[HibpBreachedSiteModel]]]
+    ) -> bool:
+        """
+        Bulk inserts the new breaches of several emails in one transaction.
+        Breaches missing from the catalog, e.g. found by a full lookup, are
+        added to it first.
+        :param batch: (email_id, email_address, new_breaches) per email.
+        """
+        try:
+            breach_ids: Optional[Dict[str, int]] = (
+                self._breach_repository.get_ids_for_hibp_models(
+                    [breach for _, _, new_breaches in batch for breach in new_breaches]
+                )
+            )
+            if breach_ids is None:
+                self._logger.error(f"Failed to save breaches for {len(batch)} emails")
+                return False
+
+            rows: List[Dict[str, Any]] = []
+            for email_id, _, new_breaches in batch:
+                rows.extend(
+                    self._diff_engine.to_rows(email_id, new_breaches, breach_ids)
+                )
+
+            result = self._pwned_platform_repository.bulk_insert(rows)
+            if result:
+                self._logger.info(
+                    f"Saved {len(rows)} new breaches for {len(batch)} emails"
+                )
+            else:
+                self._logger.error(f"Failed to save breaches for {len(batch)} emails")
+
+            return result
+
+        except Exception as e:
+            self._logger.error(f"Error saving breach batch: {str(e)}")
+            return False
+
+
+if __name__ == "__main__":
+    import sys
+
+    from task.sweep_worker import main
+
+    sys.exit(main())
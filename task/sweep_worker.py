@@ -0,0 +1,336 @@
+import argparse
+import math
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from dotenv import load_dotenv
+from flask import Flask
+
+from db.db import db, get_database_uri, get_sqlite_engine_options
+from db.migrations import run_migrations
+from db.model.email import Email
+from db.model.sweep_job import SweepJob
+from repository.check_queue_repository import CheckQueueRepository
+from repository.email_repository import EmailRepository
+from repository.scheduler_config_repository import SchedulerConfigRepository
+from repository.sweep_job_repository import SweepJobRepository
+from task.pwn_checker import PwnChecker
+from util.email_sender import EmailSender
+from util.logger import get_logger
+from util.process import is_process_running
+
+load_dotenv()
+
+
+class SweepWorker:
+    """
+    Runs the sweeps requested in the sweep_jobs table.
+
+    With PWN_CHECK_RUNNER=worker the web app only enqueues sweeps, and a
+    worker started with `python -m task.pwn_checker --daemon` claims and
+    runs them in its own process. Otherwise the scheduler leader runs them
+    in the web process through run_once.
+
+    A sweep puts every email in the check_queue table. Any number of
+    workers, e.g. on several hosts with their own HIBP keys, then lease
+    batches of PWN_CHECK_QUEUE_BATCH_SIZE emails from it. Checked emails
+    are removed, emails whose lookup failed, or whole batches whose check
+    raised, are given back. The lease is renewed for another
+    PWN_CHECK_QUEUE_LEASE_SECONDS whenever the worker records checks. A
+    worker that dies keeps its batch until the lease expires, then another
+    worker checks it. Emails are given up on after
+    PWN_CHECK_QUEUE_MAX_ATTEMPTS tries.
+
+    Only emails not checked since the job's cursor are queued, oldest
+    checked first. A job whose worker stops or dies is put back to pending,
+    and the worker that claims it next only checks what is still due. One
+    job runs at a time. Its worker renews the job's heartbeat while it runs
+    it, and a job whose heartbeat is older than SWEEP_JOB_STALE_SECONDS is
+    taken as abandoned, whichever host ran it.
+
+    With a rolling schedule there are no jobs, every scheduler tick queues
+    a slice of the emails instead, see enqueue_slice.
+
+    The worker keeps one PwnChecker between drains. The breach catalog is
+    synced at the start of every job, and otherwise at most once per
+    configured sweep interval, so rolling ticks do not download it each time.
+    """
+
+    def __init__(
+        self, worker_id: Optional[str] = None, poll_seconds: Optional[float] = None
+    ) -> None:
+        self._logger = get_logger(__name__)
+        self._repository = SweepJobRepository()
+        self._queue = CheckQueueRepository()
+        self._email_repository = EmailRepository()
+        self._worker_id: str = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._poll_seconds: float = (
+            poll_seconds
+            if poll_seconds is not None
+            else float(os.getenv("SWEEP_WORKER_POLL_SECONDS", 5))
+        )
+        self._batch_size: int = int(os.getenv("PWN_CHECK_QUEUE_BATCH_SIZE", 100))
+        self._lease_seconds: float = float(
+            os.getenv("PWN_CHECK_QUEUE_LEASE_SECONDS", 900)
+        )
+        self._max_attempts: int = int(os.getenv("PWN_CHECK_QUEUE_MAX_ATTEMPTS", 3))
+        self._stale_seconds: float = float(os.getenv("SWEEP_JOB_STALE_SECONDS", 1800))
+        self._stopping = threading.Event()
+        self._checker: Optional[PwnChecker] = None
+        # time.monotonic() of the last catalog sync
+        self._catalog_refreshed_at: Optional[float] = None
+
+    def run_job(self, job: SweepJob) -> bool:
+        """Queue the emails of a claimed job, check them and record how it ended."""
+        self._logger.info(f"{self._worker_id} is running sweep job {job.id}")
+        email_ids: List[int] = self._email_repository.get_due_ids(job.cursor)
+        if not self._queue.fill(email_ids):
+            self._repository.finish(job, "Could not queue the emails")
+            return False
+
+        given_up: int = self.drain(wait=True, job=job)
+        if self._stopping.is_set() and self._queue.count_remaining(self._max_attempts):
+            # The queue is kept, the next worker to claim the job resumes it
+            self._logger.info(f"Sweep job {job.id} paused with emails left to check")
+            self._repository.requeue(job)
+            return False
+        if given_up:
+            self._repository.finish(
+                job, f"Gave up on {given_up} emails after {self._max_attempts} attempts"
+            )
+            return False
+        self._repository.finish(job)
+        return True
+
+    def drain(self, wait: bool = False, job: Optional[SweepJob] = None) -> int:
+        """
+        Check batches leased from the check queue until none is claimable.
+        :param wait: Also wait for batches leased by other workers to be
+            checked or to expire, until the queue is empty.
+        :param job: The job being run, its heartbeat is renewed after every
+            batch and wait.
+        :return: The number of emails given up on after too many attempts.
+        """
+        refresh_catalog: bool = self._is_catalog_stale(job)
+        checked: bool = False
+        given_up: int = 0
+        while not self._stopping.is_set():
+            email_ids: Optional[List[int]] = self._queue.claim(
+                self._worker_id,
+                self._batch_size,
+                self._lease_seconds,
+                self._max_attempts,
+            )
+            if email_ids:
+                self._checker = self._checker or PwnChecker()
+                self._check_batch(self._checker, email_ids, refresh_catalog)
+                if refresh_catalog:
+                    self._catalog_refreshed_at = time.monotonic()
+                    refresh_catalog = False
+                checked = True
+                if job is not None:
+                    self._repository.touch(job)
+                continue
+
+            given_up += self._give_up_exhausted()
+            if not wait or self._queue.count_remaining(self._max_attempts) == 0:
+                break
+            self._stopping.wait(self._poll_seconds)
+            if job is not None:
+                self._repository.touch(job)
+
+        if checked:
+            # One digest for every batch this drain checked
+            self._checker.flush_notifications()
+        if given_up:
+            self._logger.error(f"Gave up on checking {given_up} emails")
+        return given_up
+
+    def _is_catalog_stale(self, job: Optional[SweepJob]) -> bool:
+        """True if the next batch should sync the breach catalog first."""
+        if job is not None or self._catalog_refreshed_at is None:
+            return True
+        interval_unit: str = SchedulerConfigRepository().get_value(
+            "pwn_check_interval_unit", "hours"
+        )
+        interval_value: int = int(
+            SchedulerConfigRepository().get_value("pwn_check_interval_value", "1")
+        )
+        interval_seconds: float = timedelta(
+            **{interval_unit: interval_value}
+        ).total_seconds()
+        return time.monotonic() - self._catalog_refreshed_at >= interval_seconds
+
+    def enqueue_slice(self, interval_seconds: float, tick_seconds: float) -> int:
+        """
+        Queue the share of the emails one tick of a rolling schedule checks,
+        so each email is checked about once per interval at an even rate.
+        Only emails not checked within the interval are queued, oldest
+        checked first.
+        :param interval_seconds: How often every email should be checked.
+        :param tick_seconds: How often slices are queued.
+        :return: The number of queued emails.
+        """
+        total: int = self._email_repository.count_all()
+        slice_size: int = math.ceil(total * min(tick_seconds / interval_seconds, 1))
+        email_ids: List[int] = self._email_repository.get_due_ids(
+            datetime.now() - timedelta(seconds=interval_seconds), slice_size
+        )
+        if not email_ids:
+            return 0
+        if not self._queue.fill(email_ids):
+            self._logger.error(f"Could not queue a slice of {len(email_ids)} emails")
+            return 0
+        self._logger.info(f"Queued {len(email_ids)} of {total} emails for checking")
+        return len(email_ids)
+
+    def run_slice(self, interval_seconds: float, tick_seconds: float) -> int:
+        """
+        Queue one slice of a rolling schedule and check the queue in this
+        process, see enqueue_slice.
+        :return: The number of emails given up on after too many attempts.
+        """
+        self.enqueue_slice(interval_seconds, tick_seconds)
+        return self.drain()
+
+    def _give_up_exhausted(self) -> int:
+        email_ids: List[int] = self._queue.drop_exhausted(self._max_attempts)
+        if email_ids:
+            self._email_repository.mark_checked(
+                {email_id: Email.CHECK_STATUS_FAILED for email_id in email_ids}
+            )
+        return len(email_ids)
+
+    def _check_batch(
+        self, checker: PwnChecker, email_ids: List[int], refresh_catalog: bool
+    ) -> bool:
+        self._logger.info(f"{self._worker_id} is checking {len(email_ids)} emails")
+        try:
+            failed_ids: List[int] = checker.run(
+                self._email_repository.get_by_ids(email_ids),
+                refresh_catalog=refresh_catalog,
+                flush_notifications=False,
+                on_progress=lambda: self._queue.renew(
+                    self._worker_id, email_ids, self._lease_seconds
+                ),
+            )
+        except Exception as e:
+            self._logger.exception(f"Checking a batch of the check queue failed: {e}")
+            self._queue.release(self._worker_id, email_ids)
+            return False
+        if failed_ids:
+            self._logger.warning(f"Checking {len(failed_ids)} emails failed, retrying")
+            self._queue.release(self._worker_id, failed_ids)
+        failed: Set[int] = set(failed_ids)
+        self._queue.ack(
+            self._worker_id,
+            [email_id for email_id in email_ids if email_id not in failed],
+        )
+        return not failed_ids
+
+    def run_once(self, requested_by: str) -> bool:
+        """
+        Run the oldest pending sweep, or request and run a new one.
+        :return: True if a sweep ran to completion.
+        """
+        self._requeue_abandoned_jobs()
+        job: Optional[SweepJob] = self._repository.claim(self._worker_id)
+        if job is None and self._repository.enqueue(requested_by) is not None:
+            job = self._repository.claim(self._worker_id)
+        if job is None:
+            # Claimed by another worker in between, or another sweep is running
+            return False
+        return self.run_job(job)
+
+    def run_forever(self) -> None:
+        """Run requested sweeps until stop is called."""
+        self._logger.info(f"Sweep worker {self._worker_id} started")
+        while not self._stopping.is_set():
+            # Help with sweeps started by other workers first
+            self.drain()
+            self._requeue_abandoned_jobs()
+            job: Optional[SweepJob] = self._repository.claim(self._worker_id)
+            if job is None:
+                self._stopping.wait(self._poll_seconds)
+                continue
+            self.run_job(job)
+        self._logger.info(f"Sweep worker {self._worker_id} stopped")
+
+    def stop(self) -> None:
+        """Stop run_forever once the current sweep is done."""
+        self._stopping.set()
+
+    def _requeue_abandoned_jobs(self) -> None:
+        """
+        Put back running jobs of workers on this host that no longer exist,
+        and jobs of workers on any host that stopped renewing their heartbeat.
+        """
+        for job_id in self._repository.requeue_stale(self._stale_seconds):
+            self._logger.warning(f"Sweep job {job_id} abandoned, its heartbeat stopped")
+        host: str = socket.gethostname()
+        for job in self._repository.get_running():
+            worker_host, _, pid = (job.worker or "").rpartition(":")
+            if worker_host != host or not pid.isdigit():
+                continue
+            if not is_process_running(int(pid)):
+                self._logger.warning(f"Sweep job {job.id} abandoned by {job.worker}")
+                self._repository.requeue(job)
+
+
+def create_worker_app() -> Flask:
+    """Flask app with the database and mail set up, without routes or scheduler"""
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=get_database_uri(),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = get_sqlite_engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+
+    with app.app_context():
+        db.init_app(app)
+        run_migrations()
+        EmailSender().init_app(app)
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m task.pwn_checker",
+        description="Run breach check sweeps outside of the web app.",
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--once", action="store_true", help="run one sweep, then exit")
+    mode.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run the sweeps requested by the web app until stopped",
+    )
+    args = parser.parse_args(argv)
+
+    app: Flask = create_worker_app()
+    with app.app_context():
+        worker = SweepWorker()
+        succeeded: bool = True
+        try:
+            if args.once:
+                succeeded = worker.run_once("cli")
+            else:
+                for signal_number in (signal.SIGINT, signal.SIGTERM):
+                    signal.signal(signal_number, lambda *_: worker.stop())
+                worker.run_forever()
+        finally:
+            # Send the notifications of the last sweep before exiting
+            EmailSender().close()
+    return 0 if succeeded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
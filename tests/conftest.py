@@ -2,4 +2,32 @@ import sys
 import os
 from pathlib import Path
 
+import pytest
+from flask import Flask
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep the HIBP response cache, the user generation counter and the mail
+# outbox in memory while testing
+os.environ.setdefault("HIBP_CACHE_PATH", "")
+os.environ.setdefault("USER_GENERATION_PATH", "")
+os.environ.setdefault("MAIL_SPOOL_PATH", "")
+
+
+@pytest.fixture
+def app():
+    """Bare Flask app bound to an in-memory database, with an app context pushed"""
+    from db.db import db
+    from db import model  # noqa: F401 - registers every table
+
+    flask_app = Flask(__name__)
+    flask_app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(flask_app)
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,93 @@
+# tests/integration/test_hibp_client_connection_pool.py
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from util.hibp_client import HibpClient
+
+
+class StubHibpHandler(BaseHTTPRequestHandler):
+    """Answers every lookup with 404 over a keep-alive connection"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHibpHandler)
+    server.lock = threading.Lock()
+    server.connection_count = 0
+    server.request_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_hibp_client(stub_server, monkeypatch):
+    """HibpClient pointed at the stub server with a fresh session"""
+    monkeypatch.setenv("HIBP_API_KEY", "test_api_key")
+    client = HibpClient()
+    original_base_url = client._BASE_URL
+    original_session = client._session
+
+    client._BASE_URL = f"http://127.0.0.1:{stub_server.server_port}/api/v3"
+    client._session = client._create_session()
+    yield client
+
+    client.close()
+    client._BASE_URL = original_base_url
+    client._session = original_session
+
+
+class TestHibpClientConnectionPool:
+    def test_sequential_lookups_reuse_one_connection(
+        self, stub_server, stub_hibp_client
+    ):
+        """Test keep-alive lets every lookup share a single connection"""
+        for i in range(5):
+            assert (
+                stub_hibp_client.get_breached_accounts(f"user{i}@example.com") is None
+            )
+
+        assert stub_server.request_count == 5
+        assert stub_server.connection_count == 1
+
+    def test_concurrent_lookups_are_bounded_by_pool_size(
+        self, stub_server, stub_hibp_client
+    ):
+        """Test concurrent lookups open at most pool size connections"""
+        threads = [
+            threading.Thread(
+                target=lambda i=i: [
+                    stub_hibp_client.get_breached_accounts(f"user{i}-{j}@example.com")
+                    for j in range(5)
+                ]
+            )
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stub_server.request_count == 20
+        assert stub_server.connection_count <= len(threads)
@@ -0,0 +1,52 @@
+# tests/unit/db/test_db.py
+from sqlalchemy import create_engine
+
+from db.db import get_sqlite_engine_options, get_sqlite_pragmas
+
+
+def read_pragmas(engine) -> dict:
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("foreign_keys", "journal_mode", "synchronous", "busy_timeout")
+        }
+
+
+class TestSqlitePragmas:
+    def test_wal_profile_is_applied_on_connect(self, tmp_path, monkeypatch):
+        """Test file databases are opened in WAL mode with the tuned pragmas"""
+        monkeypatch.setenv("SQLITE_PRAGMA_PROFILE", "wal")
+        monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+        uri = f"sqlite:///{tmp_path / 'hibp.sqlite3'}"
+        engine = create_engine(uri, **get_sqlite_engine_options(uri))
+
+        assert read_pragmas(engine) == {
+            "foreign_keys": 1,
+            "journal_mode": "wal",
+            "synchronous": 1,
+            "busy_timeout": 1234,
+        }
+        engine.dispose()
+
+    def test_default_profile_keeps_rollback_journal(self, tmp_path, monkeypatch):
+        """Test the default profile only enables foreign keys"""
+        monkeypatch.setenv("SQLITE_PRAGMA_PROFILE", "default")
+        engine = create_engine(f"sqlite:///{tmp_path / 'hibp.sqlite3'}")
+
+        pragmas = read_pragmas(engine)
+
+        assert pragmas["foreign_keys"] == 1
+        assert pragmas["journal_mode"] == "delete"
+        engine.dispose()
+
+    def test_unknown_profile_falls_back_to_default(self, monkeypatch):
+        """Test a typo in the profile name does not break connections"""
+        monkeypatch.setenv("SQLITE_PRAGMA_PROFILE", "fast")
+
+        assert get_sqlite_pragmas() == {"foreign_keys": "ON"}
+
+    def test_in_memory_database_keeps_default_pool(self, monkeypatch):
+        """Test pool settings are only used for database files"""
+        monkeypatch.delenv("SQLALCHEMY_POOL_SIZE", raising=False)
+        assert get_sqlite_engine_options("sqlite://") == {}
+        assert get_sqlite_engine_options("sqlite:///db/hibp.sqlite3")["pool_size"] == 5
@@ -0,0 +1,276 @@
+# tests/unit/db/test_migrations.py
+import multiprocessing
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from db.db import db, get_sqlite_engine_options
+from db.migrations import (
+    ensure_columns,
+    ensure_indexes,
+    migrate_pwned_platforms,
+    run_migrations,
+)
+from db.model.breach import Breach
+from db.model.breach_data_class import BreachDataClass
+from db.model.breach_summary import BreachSummary
+from db.model.data_class import DataClass
+from db.model.email import Email
+from db.model.email_breach import EmailBreach
+from db.model.scheduler_config import SchedulerConfig
+from db.model.user import User
+
+
+def query_plan(statement) -> str:
+    """Returns the EXPLAIN QUERY PLAN details of a SQLAlchemy statement"""
+    sql = statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def index_names(table: str) -> set:
+    return {index["name"] for index in inspect(db.engine).get_indexes(table)}
+
+
+def add_email() -> None:
+    db.session.add(
+        User(id=1, user_name="admin", email="admin@example.com", password="password")
+    )
+    db.session.add(Email(id=1, user_id=1, email="first@example.com"))
+    db.session.commit()
+
+
+@pytest.fixture
+def emails(app):
+    add_email()
+
+
+class TestEnsureIndexes:
+    def test_creates_missing_indexes_on_existing_database(self, emails):
+        """Test indexes dropped from an old database are created again"""
+        for name in ("uq_email_breaches_email_breach", "ix_breaches_domain"):
+            db.session.execute(text(f"DROP INDEX {name}"))
+        db.session.commit()
+
+        ensure_indexes()
+
+        assert {
+            "uq_email_breaches_email_breach",
+            "ix_email_breaches_breach_id",
+        } <= index_names("email_breaches")
+        assert {"ix_breaches_breach_date", "ix_breaches_domain"} <= index_names(
+            "breaches"
+        )
+
+
+class TestEnsureColumns:
+    def test_adds_missing_columns_on_existing_database(self, emails):
+        """Test the last check columns are added to an old emails table"""
+        db.session.execute(text("DROP INDEX ix_emails_last_checked_at"))
+        for column in ("last_checked_at", "last_check_status"):
+            db.session.execute(text(f"ALTER TABLE emails DROP COLUMN {column}"))
+        db.session.commit()
+
+        ensure_columns()
+        ensure_indexes()
+
+        columns = inspect(db.engine).get_columns("emails")
+        assert {"last_checked_at", "last_check_status"} <= {
+            column["name"] for column in columns
+        }
+        assert "ix_emails_last_checked_at" in index_names("emails")
+        assert db.session.get(Email, 1).last_checked_at is None
+
+
+def create_legacy_tables() -> None:
+    """Three pwned_platforms rows of email 1 as stored before the breach catalog"""
+    db.session.execute(
+        text(
+            "CREATE TABLE pwned_platforms (id INTEGER PRIMARY KEY, "
+            "email_id INTEGER NOT NULL REFERENCES emails (id) ON DELETE CASCADE, "
+            "name VARCHAR, title VARCHAR, domain VARCHAR NOT NULL, "
+            "breach_date DATE NOT NULL, added_date DATETIME, description VARCHAR, "
+            "is_verified BOOLEAN NOT NULL, data_classes TEXT, created_at DATETIME)"
+        )
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO pwned_platforms (email_id, name, title, domain, breach_date, "
+            "description, is_verified, data_classes, created_at) VALUES "
+            "(1, 'Adobe', 'Adobe', 'adobe.com', '2013-10-04', 'Adobe breach', 1, "
+            "'[\"Email addresses\", \"Passwords\"]', '2024-01-01 00:00:00'), "
+            "(1, 'Wattpad', 'Wattpad', 'wattpad.com', '2020-06-29', 'Wattpad breach', "
+            "1, '[\"Email addresses\", \"Usernames\"]', '2024-01-02 00:00:00'), "
+            "(1, 'Wattpad', 'Wattpad', 'wattpad.com', '2020-06-29', 'Duplicate', 1, "
+            "NULL, '2024-01-03 00:00:00')"
+        )
+    )
+    db.session.commit()
+
+
+@pytest.fixture
+def legacy_database(emails):
+    create_legacy_tables()
+
+
+class TestMigratePwnedPlatforms:
+    def test_moves_rows_to_email_breaches(self, legacy_database):
+        """Test every email and breach pair is kept once, with its detection time"""
+        migrate_pwned_platforms()
+
+        assert not inspect(db.engine).has_table("pwned_platforms")
+        assert [
+            (email_breach.email_id, email_breach.breach.name, email_breach.detected_at)
+            for email_breach in EmailBreach.query.order_by(EmailBreach.id)
+        ] == [
+            (1, "Adobe", datetime(2024, 1, 1)),
+            (1, "Wattpad", datetime(2024, 1, 2)),
+        ]
+
+    def test_fills_in_the_catalog(self, legacy_database):
+        """Test each breach is added to the catalog from its first row"""
+        migrate_pwned_platforms()
+
+        adobe, wattpad = Breach.query.order_by(Breach.name).all()
+        assert adobe.description == "Adobe breach"
+        assert adobe.data_classes == ["Email addresses", "Passwords"]
+        assert wattpad.description == "Wattpad breach"
+        assert wattpad.breach_date == date(2020, 6, 29)
+        assert wattpad.data_classes == ["Email addresses", "Usernames"]
+        assert db.session.query(DataClass).count() == 3
+
+    def test_rebuilds_breach_summaries(self, legacy_database):
+        """Test summaries count the migrated breaches"""
+        migrate_pwned_platforms()
+
+        assert db.session.get(BreachSummary, 1).breach_count == 2
+
+    def test_skips_migrated_databases(self, emails):
+        """Test a database created with the current schema is left as it is"""
+        migrate_pwned_platforms()
+
+        assert EmailBreach.query.count() == 0
+
+
+def migrate_in_new_process(database_uri: str) -> None:
+    flask_app = Flask(__name__)
+    flask_app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_uri,
+        SQLALCHEMY_ENGINE_OPTIONS=get_sqlite_engine_options(database_uri),
+    )
+    db.init_app(flask_app)
+    with flask_app.app_context():
+        run_migrations()
+
+
+class TestRunMigrations:
+    def test_concurrent_processes_migrate_once(self, tmp_path):
+        """Test workers starting together do not trip over each other's steps"""
+        database_uri = f"sqlite:///{tmp_path / 'hibp.sqlite3'}"
+        flask_app = Flask(__name__)
+        flask_app.config.update(
+            SQLALCHEMY_DATABASE_URI=database_uri,
+            SQLALCHEMY_ENGINE_OPTIONS=get_sqlite_engine_options(database_uri),
+        )
+        db.init_app(flask_app)
+        with flask_app.app_context():
+            db.create_all()
+            add_email()
+            create_legacy_tables()
+            db.engine.dispose()
+
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=migrate_in_new_process, args=(database_uri,))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+
+        assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+        with flask_app.app_context():
+            assert not inspect(db.engine).has_table("pwned_platforms")
+            assert sorted(breach.name for breach in Breach.query) == [
+                "Adobe",
+                "Wattpad",
+            ]
+            assert EmailBreach.query.count() == 2
+            assert db.session.get(BreachSummary, 1).breach_count == 2
+            db.session.remove()
+            db.engine.dispose()
+
+
+class TestQueryPlans:
+    """Hot lookups must be served by an index instead of a full table scan"""
+
+    def test_email_breaches_by_email_id(self, app):
+        plan = query_plan(EmailBreach.query.filter_by(email_id=1).statement)
+
+        assert "USING INDEX uq_email_breaches_email_breach" in plan
+
+    def test_email_breach_fingerprints(self, app):
+        statement = (
+            db.session.query(EmailBreach.email_id, Breach.name)
+            .join(Breach, Breach.id == EmailBreach.breach_id)
+            .filter(EmailBreach.email_id.in_([1, 2, 3]))
+            .statement
+        )
+
+        assert "USING COVERING INDEX uq_email_breaches_email_breach" in query_plan(
+            statement
+        )
+
+    def test_breaches_by_domain(self, app):
+        plan = query_plan(Breach.query.filter_by(domain="adobe.com").statement)
+
+        assert "USING INDEX ix_breaches_domain" in plan
+
+    def test_breaches_by_breach_date_range(self, app):
+        statement = Breach.query.filter(
+            Breach.breach_date >= date(2020, 1, 1),
+            Breach.breach_date < date(2021, 1, 1),
+        ).statement
+
+        assert "USING INDEX ix_breaches_breach_date" in query_plan(statement)
+
+    def test_data_classes_by_breach_id(self, app):
+        statement = (
+            db.session.query(BreachDataClass.breach_id, DataClass.name)
+            .join(DataClass, DataClass.id == BreachDataClass.data_class_id)
+            .filter(BreachDataClass.breach_id.in_([1, 2, 3]))
+            .statement
+        )
+
+        assert "USING INDEX sqlite_autoindex_breach_data_classes" in query_plan(
+            statement
+        )
+
+    def test_users_by_email_and_password(self, app):
+        statement = (
+            db.session.query(User)
+            .filter(User.email == "admin@example.com", User.password == "password")
+            .statement
+        )
+
+        assert "USING INDEX sqlite_autoindex_users" in query_plan(statement)
+
+    def test_emails_by_last_check(self, app):
+        statement = (
+            db.session.query(Email)
+            .filter(Email.last_checked_at < datetime(2024, 1, 1))
+            .order_by(Email.last_checked_at)
+            .statement
+        )
+
+        assert "ix_emails_last_checked_at" in query_plan(statement)
+
+    def test_scheduler_configs_by_key(self, app):
+        statement = SchedulerConfig.query.filter_by(key="interval").statement
+
+        assert "USING INDEX sqlite_autoindex_scheduler_configs" in query_plan(statement)
@@ -0,0 +1,70 @@
+# tests/unit/db/test_models.py
+import json
+
+from db.db import db
+from db.model.breach import Breach
+from db.model.breach_summary import BreachSummary
+from db.model.data_class import DataClass
+from db.model.email import Email
+from db.model.user import User
+
+
+class TestBreachSummaryDataClassCounts:
+    def test_decodes_once_per_stored_value(self, monkeypatch):
+        """Test repeated reads reuse the decoded dict until the value changes"""
+        decoded = []
+        loads = json.loads
+        monkeypatch.setattr(
+            "db.model.breach_summary.json.loads",
+            lambda raw: decoded.append(raw) or loads(raw),
+        )
+        summary = BreachSummary(email_id=1, _data_class_counts='{"Passwords": 2}')
+
+        assert summary.data_class_counts == {"Passwords": 2}
+        assert summary.data_class_counts is summary.data_class_counts
+        assert len(decoded) == 1
+
+        summary.data_class_counts = {"Emails": 1}
+
+        assert summary.data_class_counts == {"Emails": 1}
+        assert len(decoded) == 1
+
+    def test_reloaded_values_are_decoded_again(self, app):
+        """Test a value changed in the database is seen after a refresh"""
+        db.session.add(
+            User(id=1, user_name="admin", email="admin@example.com", password="x")
+        )
+        db.session.add(Email(id=1, user_id=1, email="first@example.com"))
+        db.session.commit()
+        summary = BreachSummary(email_id=1, breach_count=1)
+        summary.data_class_counts = {"Passwords": 1}
+        db.session.add(summary)
+        db.session.commit()
+        assert summary.data_class_counts == {"Passwords": 1}
+
+        db.session.execute(
+            BreachSummary.__table__.update().values(data_class_counts='{"Emails": 3}')
+        )
+        db.session.refresh(summary)
+
+        assert summary.data_class_counts == {"Emails": 3}
+
+
+class TestBreachDataClasses:
+    def test_names_are_cached_until_the_links_change(self, app):
+        """Test the name list is reused and rebuilt by set_data_classes and expire"""
+        breach = Breach(name="Adobe")
+        db.session.add(breach)
+        breach.set_data_classes([DataClass(name="Emails"), DataClass(name="Passwords")])
+        db.session.commit()
+
+        names = breach.data_classes
+        assert names == ["Emails", "Passwords"]
+        assert breach.data_classes is names
+
+        breach.set_data_classes([DataClass(name="Usernames")])
+        assert breach.data_classes == ["Usernames"]
+
+        db.session.commit()
+        db.session.expire(breach)
+        assert breach.data_classes == ["Usernames"]
@@ -0,0 +1,124 @@
+# tests/unit/repository/test_breach_summary_repository.py
+from datetime import date
+
+import pytest
+
+from db.db import db
+from db.model.breach_summary import BreachSummary
+from db.model.email import Email
+from db.model.email_breach import EmailBreach
+from db.model.user import User
+from repository.breach_repository import BreachRepository
+from repository.breach_summary_repository import BreachSummaryRepository
+from repository.pwned_platform_repository import PwnedPlatformRepository
+from tests.unit.repository.test_pwned_platform_repository import make_row
+from tests.unit.task.test_pwn_checker import make_breach
+
+
+@pytest.fixture
+def repositories(app):
+    db.session.add(
+        User(id=1, user_name="admin", email="admin@example.com", password="password")
+    )
+    db.session.add(Email(id=1, user_id=1, email="first@example.com"))
+    db.session.add(Email(id=2, user_id=1, email="second@example.com"))
+    db.session.commit()
+    return PwnedPlatformRepository(), BreachSummaryRepository()
+
+
+class TestBreachSummaryRepository:
+    def test_bulk_insert_updates_summaries(self, repositories):
+        """Test bulk inserts add their breaches to the summary of each email"""
+        platforms, summaries = repositories
+
+        platforms.bulk_insert(
+            [
+                make_row(1, "Adobe", date(2013, 10, 4), ["Emails", "Passwords"]),
+                make_row(1, "Wattpad", date(2020, 6, 29), ["Emails"]),
+                make_row(2, "Canva", date(2019, 5, 24), []),
+            ]
+        )
+
+        first, second = summaries.get_all()
+        assert (first.email_id, first.breach_count) == (1, 2)
+        assert first.last_breach_date == date(2020, 6, 29)
+        assert first.data_class_counts == {"Emails": 2, "Passwords": 1}
+        assert (second.email_id, second.breach_count) == (2, 1)
+        assert second.data_class_counts == {}
+
+    def test_skipped_rows_are_not_counted(self, repositories):
+        """Test rows ignored by ON CONFLICT DO NOTHING leave the summary unchanged"""
+        platforms, summaries = repositories
+        row = make_row(1, "Adobe", date(2013, 10, 4), ["Emails"])
+
+        platforms.bulk_insert([row])
+        platforms.bulk_insert([row, make_row(1, "Wattpad", date(2020, 6, 29), [])])
+
+        summary = db.session.get(BreachSummary, 1)
+        assert summary.breach_count == 2
+        assert summary.data_class_counts == {"Emails": 1}
+
+    def test_delete_one_rebuilds_the_summary(self, repositories):
+        """Test deleting a breach recomputes the summary of its email"""
+        platforms, summaries = repositories
+        wattpad = make_row(1, "Wattpad", date(2020, 6, 29))
+        platforms.bulk_insert([make_row(1, "Adobe", date(2013, 10, 4)), wattpad])
+
+        platforms.delete_one(
+            EmailBreach.query.filter_by(breach_id=wattpad["breach_id"]).one()
+        )
+
+        summary = db.session.get(BreachSummary, 1)
+        assert summary.breach_count == 1
+        assert summary.last_breach_date == date(2013, 10, 4)
+
+    def test_delete_all_clears_summaries(self, repositories):
+        """Test deleting every breach also deletes every summary"""
+        platforms, summaries = repositories
+        platforms.bulk_insert([make_row(1, "Adobe", date(2013, 10, 4))])
+
+        platforms.delete_all()
+
+        assert summaries.is_table_empty()
+
+    def test_rebuild_backfills_from_email_breaches(self, repositories):
+        """Test rebuild recreates summaries from the saved breaches"""
+        platforms, summaries = repositories
+        platforms.bulk_insert(
+            [
+                make_row(1, "Adobe", date(2013, 10, 4), ["Passwords"]),
+                make_row(2, "Canva", date(2019, 5, 24), []),
+            ]
+        )
+        db.session.query(BreachSummary).delete()
+        db.session.commit()
+
+        summaries.rebuild()
+        db.session.commit()
+
+        assert [
+            (summary.email_id, summary.breach_count, summary.data_class_counts)
+            for summary in summaries.get_all()
+        ] == [(1, 1, {"Passwords": 1}), (2, 1, {})]
+
+    def test_catalog_changes_rebuild_summaries(self, repositories):
+        """Test a catalog refresh that changes a breach updates its emails' summaries"""
+        platforms, summaries = repositories
+        platforms.bulk_insert(
+            [
+                make_row(1, "Adobe", date(2013, 10, 4), ["Emails"]),
+                make_row(2, "Canva", date(2019, 5, 24), ["Emails"]),
+            ]
+        )
+
+        assert BreachRepository().upsert_from_hibp_models(
+            [
+                make_breach("Adobe", "2013-10-05", ["Emails", "Passwords"]),
+                make_breach("Canva", "2019-05-24", ["Emails"]),
+            ]
+        )
+
+        first, second = summaries.get_all()
+        assert first.last_breach_date == date(2013, 10, 5)
+        assert first.data_class_counts == {"Emails": 1, "Passwords": 1}
+        assert second.data_class_counts == {"Emails": 1}
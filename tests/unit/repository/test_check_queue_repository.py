@@ -0,0 +1,103 @@
+# tests/unit/repository/test_check_queue_repository.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.db import db
+from db.model.check_queue_item import CheckQueueItem
+from db.model.email import Email
+from db.model.user import User
+from repository.check_queue_repository import CheckQueueRepository
+
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 2
+
+
+@pytest.fixture
+def queue(app):
+    db.session.add(
+        User(id=1, user_name="admin", email="admin@example.com", password="password")
+    )
+    for email_id in (1, 2, 3):
+        db.session.add(Email(id=email_id, user_id=1, email=f"{email_id}@example.com"))
+    db.session.commit()
+    repository = CheckQueueRepository()
+    repository.fill([1, 2, 3])
+    return repository
+
+
+def claim(queue, worker, limit=2):
+    return queue.claim(worker, limit, LEASE_SECONDS, MAX_ATTEMPTS)
+
+
+def expire_leases():
+    CheckQueueItem.query.update(
+        {CheckQueueItem.lease_expires_at: datetime.now() - timedelta(seconds=1)}
+    )
+    db.session.commit()
+
+
+class TestCheckQueueRepository:
+    def test_no_double_claims(self, queue):
+        """Test two workers never lease the same email"""
+        assert claim(queue, "host:1") == [1, 2]
+        assert claim(queue, "host:2") == [3]
+        assert claim(queue, "host:2") == []
+
+        item = db.session.get(CheckQueueItem, 1)
+        assert item.leased_by == "host:1"
+        assert item.attempts == 1
+        assert queue.count_remaining(MAX_ATTEMPTS) == 3
+
+    def test_fill_keeps_queued_items(self, queue):
+        """Test queueing an email again keeps its lease and attempts"""
+        claim(queue, "host:1")
+
+        queue.fill([1, 2, 3])
+
+        assert claim(queue, "host:2") == [3]
+        assert db.session.get(CheckQueueItem, 1).attempts == 1
+
+    def test_ack_and_release_need_the_lease(self, queue):
+        """Test acked items are removed and released ones are claimable again"""
+        claim(queue, "host:1")
+
+        queue.ack("host:2", [1])
+        queue.ack("host:1", [1])
+        queue.release("host:1", [2])
+
+        assert [item.email_id for item in queue.get_all()] == [2, 3]
+        assert claim(queue, "host:2", limit=3) == [2, 3]
+
+    def test_renewed_leases_are_not_reclaimed(self, queue):
+        """Test a worker renewing its lease keeps its emails past the first expiry"""
+        claim(queue, "host:1", limit=3)
+        expire_leases()
+
+        queue.renew("host:2", [1], LEASE_SECONDS)
+        queue.renew("host:1", [2, 3], LEASE_SECONDS)
+
+        assert claim(queue, "host:2", limit=3) == [1]
+
+    def test_expired_leases_are_reclaimed(self, queue):
+        """Test emails of a worker that died are claimed by another one"""
+        claim(queue, "host:1", limit=3)
+        assert claim(queue, "host:2") == []
+
+        expire_leases()
+
+        assert claim(queue, "host:2", limit=3) == [1, 2, 3]
+        assert db.session.get(CheckQueueItem, 1).attempts == 2
+
+    def test_gives_up_after_max_attempts(self, queue):
+        """Test emails tried max_attempts times are not claimed but dropped"""
+        for _ in range(MAX_ATTEMPTS):
+            assert claim(queue, "host:1") == [1, 2]
+            # Leased items are kept, the worker may still check them
+            assert queue.drop_exhausted(MAX_ATTEMPTS) == []
+            queue.release("host:1", [1, 2])
+
+        assert claim(queue, "host:2", limit=3) == [3]
+        assert queue.count_remaining(MAX_ATTEMPTS) == 1
+        assert queue.drop_exhausted(MAX_ATTEMPTS) == [1, 2]
+        assert [item.email_id for item in queue.get_all()] == [3]
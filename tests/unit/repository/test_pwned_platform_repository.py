@@ -0,0 +1,156 @@
+# tests/unit/repository/test_pwned_platform_repository.py
+from datetime import date, datetime
+
+import pytest
+
+from db.db import db
+from db.model.email import Email
+from db.model.email_breach import EmailBreach
+from db.model.user import User
+from repository.breach_repository import BreachRepository
+from repository.pwned_platform_repository import PwnedPlatformRepository
+from tests.unit.task.test_pwn_checker import make_breach
+
+
+def make_row(
+    email_id: int, name: str, breach_date: date, data_classes=("Email addresses",)
+) -> dict:
+    """Adds the breach to the catalog and returns an email_breaches row for it"""
+    breach_ids = BreachRepository().get_ids_for_hibp_models(
+        [make_breach(name, breach_date.isoformat(), data_classes)]
+    )
+    return {
+        "email_id": email_id,
+        "breach_id": breach_ids[name],
+        "detected_at": datetime(2024, 1, 1),
+    }
+
+
+@pytest.fixture
+def repository(app):
+    db.session.add(
+        User(id=1, user_name="admin", email="admin@example.com", password="password")
+    )
+    db.session.add(Email(id=1, user_id=1, email="first@example.com"))
+    db.session.commit()
+    return PwnedPlatformRepository()
+
+
+class TestPwnedPlatformRepository:
+    def test_bulk_insert_skips_existing_rows(self, repository):
+        """Test rows conflicting on (email_id, breach_id) are ignored"""
+        assert repository.bulk_insert([make_row(1, "Adobe", date(2013, 10, 4))])
+
+        assert repository.bulk_insert(
+            [
+                make_row(1, "Adobe", date(2013, 10, 4)),
+                make_row(1, "Adobe", date(2013, 10, 4)),
+                make_row(1, "Wattpad", date(2020, 6, 29)),
+            ]
+        )
+
+        assert sorted(platform.breach.name for platform in repository.get_all()) == [
+            "Adobe",
+            "Wattpad",
+        ]
+
+    def test_bulk_insert_chunks_large_batches(self, repository, monkeypatch):
+        """Test batches larger than one chunk are all inserted"""
+        monkeypatch.setattr(repository, "_BULK_INSERT_CHUNK_SIZE", 7)
+        rows = [make_row(1, f"Breach{i}", date(2020, 1, 1)) for i in range(20)]
+
+        assert repository.bulk_insert(rows)
+
+        assert db.session.query(EmailBreach).count() == 20
+
+    def test_get_fingerprints_by_email_ids(self, repository):
+        """Test only the fingerprint columns of the requested emails are returned"""
+        repository.bulk_insert([make_row(1, "Adobe", date(2013, 10, 4))])
+
+        assert repository.get_fingerprints_by_email_ids([1, 2]) == [(1, "Adobe")]
+        assert repository.get_fingerprints_by_email_ids([2]) == []
+
+    def test_get_page_walks_the_table_by_id(self, repository):
+        """Test keyset pages continue after the last id of the previous page"""
+        repository.bulk_insert(
+            [make_row(1, f"Breach{i}", date(2020, 1, 1)) for i in range(5)]
+        )
+
+        first = repository.get_page(after_id=0, limit=2)
+        second = repository.get_page(after_id=first[-1].id, limit=2)
+        last = repository.get_page(after_id=second[-1].id, limit=2)
+
+        assert [platform.name for platform in first + second + last] == [
+            f"Breach{i}" for i in range(5)
+        ]
+        assert len(last) == 1
+
+    def test_get_page_applies_filters(self, repository):
+        """Test domain and breach date filters narrow the page"""
+        repository.bulk_insert(
+            [
+                make_row(1, "Adobe", date(2013, 10, 4)),
+                make_row(1, "Wattpad", date(2020, 6, 29)),
+                make_row(1, "Canva", date(2019, 5, 24)),
+            ]
+        )
+
+        assert [
+            platform.name
+            for platform in repository.get_page(breach_date_from=date(2019, 1, 1))
+        ] == ["Wattpad", "Canva"]
+        assert [
+            platform.name
+            for platform in repository.get_page(
+                domain="adobe.com", breach_date_to=date(2019, 1, 1)
+            )
+        ] == ["Adobe"]
+        assert repository.get_page(email_id=2) == []
+
+    def test_iter_rows_streams_every_row(self, repository, monkeypatch):
+        """Test streaming crosses cursor batches without loading ORM objects"""
+        monkeypatch.setattr(repository, "_STREAM_BATCH_SIZE", 3)
+        repository.bulk_insert(
+            [make_row(1, f"Breach{i}", date(2020, 1, 1)) for i in range(7)]
+        )
+
+        rows = list(repository.iter_rows(after_id=0))
+
+        assert [row.name for row in rows] == [f"Breach{i}" for i in range(7)]
+        assert len(db.session.identity_map) == 0
+
+    def test_rows_serialize_like_orm_objects(self, repository):
+        """Test projected rows produce the same JSON as EmailBreach.to_json"""
+        repository.bulk_insert(
+            [
+                make_row(1, "Adobe", date(2013, 10, 4), ["Emails", "Passwords"]),
+                make_row(1, "Canva", date(2019, 5, 24), []),
+            ]
+        )
+
+        assert [platform.to_json() for platform in repository.get_page()] == [
+            platform.to_json() for platform in repository.get_all()
+        ]
+
+    def test_iter_rows_looks_up_data_classes_once_per_breach(
+        self, repository, monkeypatch
+    ):
+        """Test rows of the same breach share one data classes lookup"""
+        db.session.add(Email(id=2, user_id=1, email="second@example.com"))
+        db.session.commit()
+        adobe = make_row(1, "Adobe", date(2013, 10, 4), ["Passwords"])
+        repository.bulk_insert([adobe, dict(adobe, email_id=2)])
+        lookups = []
+        breach_repository = BreachRepository()
+        get_data_classes = breach_repository.get_data_classes_by_breach_ids
+        monkeypatch.setattr(
+            breach_repository,
+            "get_data_classes_by_breach_ids",
+            lambda breach_ids: lookups.append(set(breach_ids))
+            or get_data_classes(breach_ids),
+        )
+
+        rows = list(repository.iter_rows())
+
+        assert [row.data_classes for row in rows] == [["Passwords"], ["Passwords"]]
+        assert lookups == [{adobe["breach_id"]}]
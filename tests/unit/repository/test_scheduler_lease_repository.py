@@ -0,0 +1,76 @@
+# tests/unit/repository/test_scheduler_lease_repository.py
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from db.db import db
+from repository.scheduler_lease_repository import SchedulerLeaseRepository
+
+LEASE = "pwn_check_job"
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def leases(app):
+    return SchedulerLeaseRepository()
+
+
+class TestSchedulerLeaseRepository:
+    def test_only_one_holder(self, leases):
+        """Test a held lease is renewed by its holder and refused to others"""
+        assert leases.acquire(LEASE, "worker-1", 60) is True
+        assert leases.acquire(LEASE, "worker-2", 60) is False
+        assert leases.acquire(LEASE, "worker-1", 60, trigger="interval") is True
+
+        lease = leases.get(LEASE)
+        assert lease.holder == "worker-1"
+        assert lease.trigger == "interval"
+        assert lease.expires_at > utc_now() + timedelta(seconds=50)
+
+    def test_expired_lease_is_taken_over(self, leases):
+        """Test another process takes the lease once it has expired"""
+        leases.acquire(LEASE, "worker-1", 60)
+        leases.get(LEASE).expires_at = utc_now() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert leases.acquire(LEASE, "worker-2", 60) is True
+        assert leases.acquire(LEASE, "worker-1", 60) is False
+        assert leases.get(LEASE).holder == "worker-2"
+
+    def test_release(self, leases):
+        """Test only the holder can release the lease"""
+        leases.acquire(LEASE, "worker-1", 60)
+
+        leases.release(LEASE, "worker-2")
+        assert leases.get(LEASE).holder == "worker-1"
+
+        leases.release(LEASE, "worker-1")
+        assert leases.get(LEASE) is None
+        assert leases.acquire(LEASE, "worker-2", 60) is True
+
+    def test_database_errors_are_not_a_lost_lease(self, leases):
+        """Test acquire reports a locked database as unknown rather than refused"""
+        leases.acquire(LEASE, "worker-1", 60)
+        error = OperationalError("INSERT", {}, Exception("database is locked"))
+
+        with patch.object(db.session, "execute", side_effect=error):
+            assert leases.acquire(LEASE, "worker-1", 60) is None
+
+        assert leases.get(LEASE).holder == "worker-1"
+
+    def test_expiry_is_utc_by_the_database_clock(self, leases):
+        """Test leases expire in UTC, whatever the timezone of the holder"""
+        leases.acquire(LEASE, "worker-1", 60)
+
+        expires_in = leases.get(LEASE).expires_at - utc_now()
+        assert timedelta(seconds=55) < expires_in <= timedelta(seconds=60)
+        assert leases.get_active(LEASE).holder == "worker-1"
+
+        leases.get(LEASE).expires_at = utc_now() - timedelta(seconds=1)
+        db.session.commit()
+        assert leases.get_active(LEASE) is None
@@ -0,0 +1,100 @@
+# tests/unit/repository/test_sweep_job_repository.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.db import db
+
+from db.model.sweep_job import SweepJob
+from repository.sweep_job_repository import SweepJobRepository
+
+
+@pytest.fixture
+def jobs(app):
+    return SweepJobRepository()
+
+
+class TestSweepJobRepository:
+    def test_enqueue_merges_pending_requests(self, jobs):
+        """Test requests made while a sweep is pending share that sweep"""
+        first = jobs.enqueue("scheduler")
+        second = jobs.enqueue("cli")
+
+        assert first.id == second.id
+        assert first.requested_by == "scheduler"
+        assert len(jobs.get_all()) == 1
+
+    def test_claim_oldest_pending_once(self, jobs):
+        """Test a pending job is claimed by exactly one worker"""
+        first = jobs.enqueue("scheduler")
+
+        claimed = jobs.claim("host:1")
+        assert claimed.id == first.id
+        assert claimed.status == SweepJob.STATUS_RUNNING
+        assert claimed.worker == "host:1"
+        assert claimed.started_at is not None
+        assert jobs.claim("host:2") is None
+
+        jobs.finish(claimed)
+        second = jobs.enqueue("scheduler")
+        assert second.id != first.id
+        assert jobs.claim("host:2").id == second.id
+
+    def test_claim_refuses_while_a_job_is_running(self, jobs):
+        """Test a second sweep does not start until the running one ends"""
+        jobs.enqueue("scheduler")
+        running = jobs.claim("host:1")
+        pending = jobs.enqueue("scheduler")
+
+        assert jobs.claim("host:2") is None
+        assert pending.status == SweepJob.STATUS_PENDING
+
+        jobs.finish(running)
+        assert jobs.claim("host:2").id == pending.id
+
+    def test_finish(self, jobs):
+        """Test finished jobs are done, or failed with their error"""
+        jobs.enqueue("scheduler")
+        done = jobs.claim("host:1")
+        jobs.finish(done)
+        jobs.enqueue("scheduler")
+        failed = jobs.claim("host:1")
+        jobs.finish(failed, "HIBP is down")
+
+        assert done.status == SweepJob.STATUS_DONE
+        assert failed.status == SweepJob.STATUS_FAILED
+        assert failed.error == "HIBP is down"
+        assert failed.finished_at is not None
+        assert jobs.get_latest().id == failed.id
+        assert jobs.get_running() == []
+
+    def test_requeued_jobs_keep_their_cursor(self, jobs):
+        """Test a resumed job is claimed again with the cursor of its first start"""
+        job = jobs.enqueue("scheduler")
+        jobs.claim("host:1")
+        cursor = job.cursor
+        jobs.requeue(job)
+
+        assert job.status == SweepJob.STATUS_PENDING
+        assert job.worker is None
+        resumed = jobs.claim("host:2")
+        assert resumed.id == job.id
+        assert resumed.worker == "host:2"
+        assert resumed.cursor == cursor
+
+    def test_requeue_stale_puts_back_jobs_without_heartbeat(self, jobs):
+        """Test running jobs whose heartbeat stopped go back to pending"""
+        jobs.enqueue("scheduler")
+        stale = jobs.claim("other-host:1")
+        stale.heartbeat_at = datetime.now() - timedelta(minutes=10)
+        db.session.commit()
+
+        assert jobs.requeue_stale(1800) == []
+        assert jobs.requeue_stale(60) == [stale.id]
+        assert stale.status == SweepJob.STATUS_PENDING
+        assert stale.worker is None
+
+        resumed = jobs.claim("host:2")
+        assert resumed.id == stale.id
+        jobs.touch(resumed)
+        assert jobs.requeue_stale(60) == []
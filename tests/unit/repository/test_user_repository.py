@@ -0,0 +1,62 @@
+# tests/unit/repository/test_user_repository.py
+import pytest
+from sqlalchemy import event
+
+from db.db import db
+from db.model.user import User
+from repository.user_repository import UserRepository
+
+
+@pytest.fixture
+def repository(app):
+    repository = UserRepository()
+    # The singleton outlives the in-memory database of other tests
+    repository._is_empty = None
+    return repository
+
+
+@pytest.fixture
+def count_queries(app):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_execute)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", before_execute)
+
+
+def make_user() -> User:
+    return User(user_name="admin", email="admin@example.com", password="password")
+
+
+class TestIsTableEmpty:
+    def test_answer_is_cached_between_calls(self, repository, count_queries):
+        """Test only the first check queries the users table"""
+        assert repository.is_table_empty() is True
+        assert repository.is_table_empty() is True
+
+        assert len(count_queries) == 1
+
+    def test_insert_and_delete_invalidate_the_cache(self, repository):
+        """Test adding or removing a user is seen by the next check"""
+        assert repository.is_table_empty() is True
+        user = make_user()
+
+        repository.insert_one(user)
+        assert repository.is_table_empty() is False
+
+        repository.delete_one(user)
+        assert repository.is_table_empty() is True
+
+    def test_bump_from_another_worker_invalidates_the_cache(self, repository):
+        """Test a generation bump re-checks a table changed behind our back"""
+        assert repository.is_table_empty() is True
+        db.session.add(make_user())
+        db.session.commit()
+        assert repository.is_table_empty() is True
+
+        repository._generation.bump()
+
+        assert repository.is_table_empty() is False
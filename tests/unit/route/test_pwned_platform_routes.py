@@ -0,0 +1,88 @@
+# tests/unit/route/test_pwned_platform_routes.py
+import json
+from datetime import date
+
+import pytest
+from flask_jwt_extended import JWTManager, create_access_token
+
+from db.db import db
+from db.model.email import Email
+from db.model.user import User
+from repository.pwned_platform_repository import PwnedPlatformRepository
+from route.pwned_platform_routes import pwned_platform_routes_blueprint
+from tests.unit.repository.test_pwned_platform_repository import make_row
+
+
+@pytest.fixture
+def client(app):
+    """Test client for the pwned platform routes with three saved breaches"""
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-enough-length"
+    JWTManager(app)
+    app.register_blueprint(pwned_platform_routes_blueprint)
+
+    db.session.add(
+        User(id=1, user_name="admin", email="admin@example.com", password="password")
+    )
+    db.session.add(Email(id=1, user_id=1, email="first@example.com"))
+    db.session.commit()
+    PwnedPlatformRepository().bulk_insert(
+        [
+            make_row(1, name, breach_date)
+            for name, breach_date in (
+                ("Adobe", date(2013, 10, 4)),
+                ("Canva", date(2019, 5, 24)),
+                ("Wattpad", date(2020, 6, 29)),
+            )
+        ]
+    )
+
+    token = create_access_token(identity="admin")
+    test_client = app.test_client()
+    test_client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return test_client
+
+
+class TestGetPwnedPlatforms:
+    def test_pages_with_after_id(self, client):
+        """Test the next_after_id cursor walks every page once"""
+        first = client.get("/api/pwned_platforms?limit=2").get_json()["data"]
+        second = client.get(
+            f"/api/pwned_platforms?limit=2&after_id={first['next_after_id']}"
+        ).get_json()["data"]
+
+        assert [platform["name"] for platform in first["platforms"]] == [
+            "Adobe",
+            "Canva",
+        ]
+        assert [platform["name"] for platform in second["platforms"]] == ["Wattpad"]
+        assert second["next_after_id"] is None
+
+    def test_streams_ndjson(self, client):
+        """Test format=ndjson streams one JSON document per matching row"""
+        response = client.get(
+            "/api/pwned_platforms?format=ndjson&breach_date_from=2019-01-01"
+        )
+
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["Canva", "Wattpad"]
+
+    def test_rejects_invalid_parameters(self, client):
+        """Test malformed query parameters are answered with 422"""
+        response = client.get("/api/pwned_platforms?limit=0")
+
+        assert response.status_code == 422
+        assert response.get_json()["success"] is False
+
+
+class TestGetBreachSummary:
+    def test_returns_summaries_and_totals(self, client):
+        """Test the summary endpoint reports per-email and overall counts"""
+        data = client.get("/api/pwned_platforms/summary").get_json()["data"]
+
+        assert [
+            (summary["email_id"], summary["breach_count"])
+            for summary in data["summaries"]
+        ] == [(1, 3)]
+        assert data["totals"]["breached_emails"] == 1
+        assert data["totals"]["breach_count"] == 3
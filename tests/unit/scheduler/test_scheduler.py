@@ -0,0 +1,145 @@
+# tests/unit/scheduler/test_scheduler.py
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db.db import db
+from repository.scheduler_config_repository import SchedulerConfigRepository
+from repository.scheduler_lease_repository import SchedulerLeaseRepository
+from scheduler.scheduler import PWN_CHECK_JOB_ID as LEASE, Scheduler
+
+
+@pytest.fixture
+def scheduler(app):
+    """Scheduler singleton on a mocked APScheduler, as worker-1"""
+    instance = Scheduler()
+    original = (instance._scheduler, instance._app, instance._holder)
+    instance._scheduler = MagicMock()
+    instance._scheduler.get_job.return_value = None
+    instance._scheduler.get_jobs.return_value = []
+    instance._app = app
+    instance._holder = "worker-1"
+    instance._leader_election = True
+    instance._is_leader = False
+    instance._pwn_check_interval = None
+    instance._sweep_schedule = "burst"
+    instance._sweep_runner = "scheduler"
+    instance._rolling_tick_seconds = 60
+    SchedulerConfigRepository().create_default_configs()
+    yield instance
+    instance._scheduler, instance._app, instance._holder = original
+    instance._is_leader = False
+    instance._sweep_schedule = "burst"
+
+
+def registered_job_ids(scheduler):
+    return [call.kwargs["id"] for call in scheduler._scheduler.add_job.call_args_list]
+
+
+class TestScheduler:
+    def test_heartbeat_elects_one_leader(self, scheduler):
+        """Test only the process that takes the lease registers the job"""
+        SchedulerLeaseRepository().acquire(LEASE, "worker-2", 60)
+
+        scheduler._heartbeat()
+        assert scheduler.is_leader is False
+        scheduler._scheduler.add_job.assert_not_called()
+
+        SchedulerLeaseRepository().release(LEASE, "worker-2")
+        scheduler._heartbeat()
+        assert scheduler.is_leader is True
+        assert registered_job_ids(scheduler) == [LEASE]
+
+        scheduler._heartbeat()
+        assert registered_job_ids(scheduler) == [LEASE]
+
+    def test_heartbeat_stops_the_job_when_the_lease_is_lost(self, scheduler):
+        """Test a leader whose lease was taken over removes its job"""
+        scheduler._heartbeat()
+        lease = SchedulerLeaseRepository().get(LEASE)
+        lease.holder = "worker-2"
+        lease.expires_at = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(
+            seconds=60
+        )
+        db.session.commit()
+
+        scheduler._heartbeat()
+
+        assert scheduler.is_leader is False
+        scheduler._scheduler.remove_job.assert_called_with(LEASE)
+
+    def test_heartbeat_keeps_the_role_when_the_database_errors(self, scheduler):
+        """Test a leader that cannot reach the lease keeps its job until it can"""
+        scheduler._heartbeat()
+
+        with patch.object(scheduler._lease_repo, "acquire", return_value=None):
+            scheduler._heartbeat()
+
+        assert scheduler.is_leader is True
+        scheduler._scheduler.remove_job.assert_not_called()
+        assert registered_job_ids(scheduler) == [LEASE]
+
+    def test_leader_follows_settings_changed_elsewhere(self, scheduler):
+        """Test the leader reschedules when another process changed the interval"""
+        scheduler._heartbeat()
+        SchedulerConfigRepository().set_value("pwn_check_interval_value", "6")
+
+        scheduler._heartbeat()
+
+        assert registered_job_ids(scheduler) == [LEASE, LEASE]
+        assert scheduler._scheduler.add_job.call_args.kwargs["hours"] == 6
+
+    def test_followers_report_the_published_job(self, scheduler):
+        """Test processes without the lease report the leader's schedule"""
+        next_run_time = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+        SchedulerLeaseRepository().acquire(
+            LEASE,
+            "worker-2",
+            60,
+            next_run_time=next_run_time.replace(tzinfo=None),
+            trigger="interval[1:00:00]",
+        )
+
+        scheduler._heartbeat()
+
+        assert scheduler.get_jobs() == [
+            {
+                "id": LEASE,
+                "name": "Check for new breaches",
+                "next_run_time": next_run_time.isoformat(),
+                "trigger": "interval[1:00:00]",
+                "leader": "worker-2",
+            }
+        ]
+
+    def test_rolling_schedule_checks_a_slice_every_tick(self, scheduler):
+        """Test rolling mode runs every tick and checks a share of the interval"""
+        scheduler._sweep_schedule = "rolling"
+
+        with patch("task.sweep_worker.SweepWorker") as worker:
+            scheduler._heartbeat()
+            job = scheduler._scheduler.add_job.call_args.kwargs
+            job["func"]()
+
+        assert job["id"] == LEASE
+        assert job["seconds"] == 60
+        assert "hours" not in job
+        worker.return_value.run_slice.assert_called_once_with(3600, 60)
+
+    def test_rolling_schedule_leaves_slices_to_sweep_workers(self, scheduler):
+        """Test with PWN_CHECK_RUNNER=worker a tick only queues the slice"""
+        scheduler._sweep_schedule = "rolling"
+        scheduler._sweep_runner = "worker"
+        SchedulerConfigRepository().set_value("pwn_check_interval_unit", "seconds")
+        SchedulerConfigRepository().set_value("pwn_check_interval_value", "30")
+
+        with patch("task.sweep_worker.SweepWorker") as worker:
+            scheduler._heartbeat()
+            job = scheduler._scheduler.add_job.call_args.kwargs
+            job["func"]()
+
+        # A tick never exceeds the interval
+        assert job["seconds"] == 30
+        worker.return_value.enqueue_slice.assert_called_once_with(30, 30)
+        worker.return_value.run_slice.assert_not_called()
@@ -0,0 +1,107 @@
+# tests/unit/service/test_breach_catalog_service.py
+import copy
+import pytest
+from unittest.mock import MagicMock
+
+from db.model.breach import Breach
+from service.breach_catalog_service import BreachCatalogService
+
+
+def catalog_item(name: str, modified_date: str) -> dict:
+    return {
+        "Name": name,
+        "Title": name,
+        "Domain": f"{name.lower()}.com",
+        "BreachDate": "2020-06-29",
+        "AddedDate": "2020-07-19T22:49:19Z",
+        "ModifiedDate": modified_date,
+        "PwnCount": 100,
+        "Description": f"{name} description",
+        "LogoPath": f"https://logos.haveibeenpwned.com/{name}.png",
+        "Attribution": None,
+        "DisclosureUrl": None,
+        "DataClasses": ["Email addresses", "Passwords"],
+        "IsVerified": True,
+        "IsFabricated": False,
+        "IsSensitive": False,
+        "IsRetired": False,
+        "IsSpamList": False,
+        "IsMalware": False,
+        "IsSubscriptionFree": False,
+        "IsStealerLog": False,
+    }
+
+
+@pytest.fixture
+def catalog_service(app):
+    """Fresh catalog state with a mocked HIBP client"""
+    service = BreachCatalogService()
+    service._models = {}
+    service._modified_dates = {}
+    original_client = service._hibp_client
+    service._hibp_client = MagicMock()
+    service._hibp_client.get_all_breaches.return_value = [
+        catalog_item("Adobe", "2020-07-19T22:49:19Z"),
+        catalog_item("Wattpad", "2020-07-19T22:49:19Z"),
+    ]
+    yield service
+    service._hibp_client = original_client
+    service._models = {}
+    service._modified_dates = {}
+
+
+class TestBreachCatalogService:
+    def test_refresh_mirrors_catalog(self, catalog_service):
+        """Test the first refresh stores every breach"""
+        assert catalog_service.refresh() is True
+
+        assert {breach.name for breach in Breach.query.all()} == {"Adobe", "Wattpad"}
+        stored = Breach.query.filter_by(name="Adobe").first()
+        assert stored.data_classes == ["Email addresses", "Passwords"]
+        assert stored.logo_path == "https://logos.haveibeenpwned.com/Adobe.png"
+
+    def test_refresh_only_updates_modified_breaches(self, catalog_service, monkeypatch):
+        """Test unchanged breaches are neither validated nor written again"""
+        catalog_service.refresh()
+        items = copy.deepcopy(
+            catalog_service._hibp_client.get_all_breaches.return_value
+        )
+        items[1]["ModifiedDate"] = "2021-01-01T00:00:00Z"
+        items[1]["PwnCount"] = 200
+        items.append(catalog_item("Dropbox", "2022-11-01T09:12:43Z"))
+        catalog_service._hibp_client.get_all_breaches.return_value = items
+        upsert = MagicMock(wraps=catalog_service._repository.upsert_from_hibp_models)
+        monkeypatch.setattr(
+            catalog_service._repository, "upsert_from_hibp_models", upsert
+        )
+
+        catalog_service.refresh()
+
+        assert [model.name for model in upsert.call_args.args[0]] == [
+            "Wattpad",
+            "Dropbox",
+        ]
+        assert Breach.query.filter_by(name="Wattpad").first().pwn_count == 200
+        assert Breach.query.count() == 3
+
+    def test_refresh_loads_stored_catalog(self, catalog_service):
+        """Test a restarted service reads the catalog back from the database"""
+        catalog_service.refresh()
+        catalog_service._models = {}
+        catalog_service._modified_dates = {}
+        catalog_service._hibp_client.get_all_breaches.side_effect = Exception(
+            "Connection error"
+        )
+
+        assert catalog_service.refresh() is True
+        assert catalog_service.resolve(["Adobe"])[0].description == "Adobe description"
+
+    def test_resolve(self, catalog_service):
+        """Test names are resolved to catalog details"""
+        catalog_service.refresh()
+
+        resolved = catalog_service.resolve(["Wattpad", "Adobe"])
+
+        assert [model.name for model in resolved] == ["Wattpad", "Adobe"]
+        assert resolved[0].breach_date == "2020-06-29"
+        assert catalog_service.resolve(["Adobe", "Unknown"]) is None
@@ -0,0 +1,92 @@
+# tests/unit/service/test_notification_service.py
+import pytest
+from unittest.mock import MagicMock
+
+from service.notification_service import NotificationService
+from tests.unit.task.test_pwn_checker import make_breach
+
+
+@pytest.fixture
+def notification_service():
+    """Digest mode notification service with mocked user lookup and mail sender"""
+    service = NotificationService()
+    original = (service._user_repository, service._email_sender, service._mode)
+    service._user_repository = MagicMock()
+    service._user_repository.get_first.return_value.email = "admin@example.com"
+    service._email_sender = MagicMock()
+    service._email_sender.send_breach_digest.return_value = True
+    service._mode = "digest"
+    service._digest_window_seconds = 0
+    yield service
+    service._user_repository, service._email_sender, service._mode = original
+    service._pending = {}
+    service._pending_since = None
+
+
+class TestNotificationService:
+    def test_digest_sends_one_message_per_flush(self, notification_service):
+        """Test breaches of several addresses go out in a single message"""
+        notification_service.notify(
+            "first@example.com", [make_breach("Adobe", "2013-10-04")]
+        )
+        notification_service.notify(
+            "second@example.com",
+            [make_breach("Adobe", "2013-10-04"), make_breach("Canva", "2019-05-24")],
+        )
+        notification_service._email_sender.send_breach_digest.assert_not_called()
+
+        assert notification_service.flush() is True
+
+        sender = notification_service._email_sender
+        sender.send_breach_digest.assert_called_once()
+        sender.send_breach_notification.assert_not_called()
+        notification_service._user_repository.get_first.assert_called_once()
+        digest = sender.send_breach_digest.call_args.kwargs
+        assert digest["recipient_email"] == "admin@example.com"
+        assert {
+            address: [site.name for site in sites]
+            for address, sites in digest["breached_sites_by_email"].items()
+        } == {
+            "first@example.com": ["Adobe"],
+            "second@example.com": ["Adobe", "Canva"],
+        }
+
+    def test_flush_without_pending_breaches_sends_nothing(self, notification_service):
+        """Test an empty digest is not sent"""
+        assert notification_service.flush() is True
+
+        notification_service._email_sender.send_breach_digest.assert_not_called()
+
+    def test_digest_is_flushed_when_the_window_passes(
+        self, notification_service, monkeypatch
+    ):
+        """Test a digest older than the flush window is sent without waiting"""
+        clock = iter([100.0, 100.0, 131.0])
+        monkeypatch.setattr(
+            "service.notification_service.time.monotonic", lambda: next(clock)
+        )
+        notification_service._digest_window_seconds = 30
+
+        notification_service.notify(
+            "first@example.com", [make_breach("Adobe", "2013-10-04")]
+        )
+        notification_service._email_sender.send_breach_digest.assert_not_called()
+
+        notification_service.notify(
+            "second@example.com", [make_breach("Canva", "2019-05-24")]
+        )
+        notification_service._email_sender.send_breach_digest.assert_called_once()
+
+    def test_immediate_mode_sends_per_address(self, notification_service):
+        """Test immediate mode keeps one message per breached address"""
+        notification_service._mode = "immediate"
+        sender = notification_service._email_sender
+        sender.send_breach_notification.return_value = True
+
+        notification_service.notify(
+            "first@example.com", [make_breach("Adobe", "2013-10-04")]
+        )
+        notification_service.flush()
+
+        sender.send_breach_notification.assert_called_once()
+        sender.send_breach_digest.assert_not_called()
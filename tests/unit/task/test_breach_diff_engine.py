@@ -0,0 +1,75 @@
+# tests/unit/task/test_breach_diff_engine.py
+from datetime import date
+
+import pytest
+
+from db.db import db
+from db.model.email import Email
+from db.model.user import User
+from repository.breach_repository import BreachRepository
+from repository.pwned_platform_repository import PwnedPlatformRepository
+from tests.unit.repository.test_pwned_platform_repository import make_row
+from task.breach_diff_engine import BreachDiffEngine
+from tests.unit.task.test_pwn_checker import make_breach
+
+
+@pytest.fixture
+def saved_breaches(app):
+    """Two emails, the first one already known to be in the Adobe breach"""
+    user = User(id=1, user_name="admin", email="admin@example.com", password="password")
+    db.session.add(user)
+    db.session.add_all(
+        [
+            Email(id=1, user_id=1, email="first@example.com"),
+            Email(id=2, user_id=1, email="second@example.com"),
+        ]
+    )
+    db.session.commit()
+    PwnedPlatformRepository().bulk_insert([make_row(1, "Adobe", date(2013, 10, 4))])
+
+
+class TestBreachDiffEngine:
+    def test_load_reads_fingerprints_of_requested_emails(self, saved_breaches):
+        """Test the index holds one fingerprint per saved breach"""
+        engine = BreachDiffEngine(PwnedPlatformRepository())
+
+        assert engine.load([1, 2]) is True
+        assert len(engine) == 1
+
+    def test_diff_returns_only_new_breaches(self, saved_breaches):
+        """Test saved breaches are skipped and new ones become rows"""
+        engine = BreachDiffEngine(PwnedPlatformRepository())
+        engine.load([1, 2])
+        results = [
+            make_breach("Adobe", "2013-10-04"),
+            make_breach("Wattpad", "2020-06-29"),
+        ]
+
+        first = engine.diff(1, results)
+        second = engine.diff(2, results)
+
+        assert [breach.name for breach in first] == ["Wattpad"]
+        assert [breach.name for breach in second] == ["Adobe", "Wattpad"]
+
+    def test_diff_reports_a_breach_once_per_sweep(self, saved_breaches):
+        """Test a breach found earlier in the sweep is not reported again"""
+        engine = BreachDiffEngine(PwnedPlatformRepository())
+        engine.load([2])
+        results = [make_breach("Wattpad", "2020-06-29")]
+
+        assert len(engine.diff(2, results)) == 1
+        assert engine.diff(2, results) == []
+
+    def test_to_rows_builds_insertable_columns(self, saved_breaches):
+        """Test rows point new breaches at their catalog entries"""
+        breaches = [make_breach("Wattpad", "2020-06-29")]
+        breach_ids = BreachRepository().get_ids_for_hibp_models(breaches)
+
+        rows = BreachDiffEngine.to_rows(2, breaches, breach_ids)
+
+        assert rows[0]["email_id"] == 2
+        assert rows[0]["breach_id"] == breach_ids["Wattpad"]
+        assert PwnedPlatformRepository().bulk_insert(rows) is True
+        saved = PwnedPlatformRepository().get_by_email_id(2)[0]
+        assert saved.breach.breach_date == date(2020, 6, 29)
+        assert saved.breach.data_classes == ["Email addresses"]
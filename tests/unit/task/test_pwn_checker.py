@@ -0,0 +1,345 @@
+# tests/unit/task/test_pwn_checker.py
+import pytest
+from unittest.mock import MagicMock
+
+from task.pwn_checker import PwnChecker
+from task.breach_diff_engine import BreachDiffEngine
+from db.model.email import Email
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+
+
+def make_breach(
+    name: str, breach_date: str, data_classes=("Email addresses",)
+) -> HibpBreachedSiteModel:
+    return HibpBreachedSiteModel.model_validate(
+        {
+            "Name": name,
+            "Title": name,
+            "Domain": f"{name.lower()}.com",
+            "BreachDate": breach_date,
+            "AddedDate": "2020-07-19T22:49:19Z",
+            "ModifiedDate": "2020-07-19T22:49:19Z",
+            "PwnCount": 100,
+            "Description": "Breach description",
+            "LogoPath": f"https://logos.haveibeenpwned.com/{name}.png",
+            "DataClasses": list(data_classes),
+            "IsVerified": True,
+            "IsFabricated": False,
+            "IsSensitive": False,
+            "IsRetired": False,
+            "IsSpamList": False,
+            "IsMalware": False,
+            "IsSubscriptionFree": False,
+            "IsStealerLog": False,
+        }
+    )
+
+
+# Catalog ids of the breaches returned by the mocked lookups
+BREACH_IDS = {"Adobe": 1, "Wattpad": 2}
+
+
+class FakeAsyncHibpClient:
+    """Async context manager answering lookups from the sync client mock"""
+
+    def __init__(self, sync_client):
+        self._sync_client = sync_client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def lookup_breached_accounts(self, email, truncate_response=False):
+        return self._sync_client.lookup_breached_accounts(email=email)
+
+
+@pytest.fixture
+def emails():
+    return [
+        Email(id=1, user_id=1, email="first@example.com"),
+        Email(id=2, user_id=1, email="second@example.com"),
+        Email(id=3, user_id=1, email="third@example.gov"),
+    ]
+
+
+@pytest.fixture
+def pwn_checker(monkeypatch, emails):
+    """PwnChecker with its collaborators replaced by mocks"""
+    monkeypatch.setenv("PWN_CHECK_MODE", "batch")
+    monkeypatch.setenv("PWN_CHECK_MAX_WORKERS", "2")
+    # Keep the shared HibpClient singleton free of the checker's rate limiter
+    monkeypatch.setattr("task.pwn_checker.HibpClient", MagicMock)
+    checker = PwnChecker()
+
+    results = {
+        "first@example.com": [make_breach("Adobe", "2013-10-04")],
+        "second@example.com": [
+            make_breach("Adobe", "2013-10-04"),
+            make_breach("Wattpad", "2020-06-29"),
+        ],
+        "third@example.gov": None,
+    }
+    checker._hibp_client.lookup_breached_accounts.side_effect = lambda email: (
+        results[email],
+        True,
+    )
+    checker._email_repository = MagicMock()
+    checker._email_repository.get_stalest.return_value = emails
+    checker._pwned_platform_repository = MagicMock()
+    checker._pwned_platform_repository.get_fingerprints_by_email_ids.return_value = []
+    checker._pwned_platform_repository.bulk_insert.return_value = True
+    checker._diff_engine = BreachDiffEngine(checker._pwned_platform_repository)
+    checker._breach_repository = MagicMock()
+    checker._breach_repository.get_ids_for_hibp_models.return_value = BREACH_IDS
+    checker._notification_service = MagicMock()
+    checker._notification_service.notify.return_value = True
+    checker._notification_service.flush.return_value = True
+    checker._breach_catalog = MagicMock()
+    checker._breach_catalog.refresh.return_value = False
+    return checker
+
+
+class TestPwnChecker:
+    def test_run_batch_saves_and_notifies(self, pwn_checker):
+        """Test batch mode looks up every email and notifies after saving"""
+        pwn_checker.run()
+
+        assert pwn_checker._hibp_client.lookup_breached_accounts.call_count == 3
+        # All new breaches of the sweep go out in one bulk insert
+        assert pwn_checker._pwned_platform_repository.bulk_insert.call_count == 1
+
+        notifications = {
+            call.kwargs["email_address"]: len(call.kwargs["new_breaches"])
+            for call in pwn_checker._notification_service.notify.call_args_list
+        }
+        assert notifications == {"first@example.com": 1, "second@example.com": 2}
+
+    def test_run_batch_flushes_every_db_batch_size_emails(self, pwn_checker):
+        """Test new breaches are bulk inserted in batches of emails"""
+        pwn_checker._db_batch_size = 1
+
+        pwn_checker.run_batch()
+
+        assert pwn_checker._pwned_platform_repository.bulk_insert.call_count == 2
+
+    def test_run_batch_skips_notification_when_save_fails(self, pwn_checker):
+        """Test no notification is sent for breaches that were not saved"""
+        pwn_checker._pwned_platform_repository.bulk_insert.return_value = False
+
+        pwn_checker.run_batch()
+
+        pwn_checker._notification_service.notify.assert_not_called()
+
+    def test_run_batch_skips_unchanged_responses(self, pwn_checker):
+        """Test responses identical to the cached ones are not diffed"""
+        pwn_checker._hibp_client.lookup_breached_accounts.side_effect = None
+        pwn_checker._hibp_client.lookup_breached_accounts.return_value = (
+            [make_breach("Adobe", "2013-10-04")],
+            False,
+        )
+
+        pwn_checker.run_batch()
+
+        pwn_checker._pwned_platform_repository.bulk_insert.assert_not_called()
+
+    def test_run_batch_skips_saved_breaches(self, pwn_checker):
+        """Test breaches already in the fingerprint index are not saved again"""
+        repository = pwn_checker._pwned_platform_repository
+        repository.get_fingerprints_by_email_ids.return_value = [
+            (1, "Adobe"),
+            (2, "Adobe"),
+        ]
+
+        pwn_checker.run_batch()
+
+        repository.get_fingerprints_by_email_ids.assert_called_once_with([1, 2, 3])
+        repository.bulk_insert.assert_called_once()
+        saved = repository.bulk_insert.call_args.args[0]
+        assert [(row["email_id"], row["breach_id"]) for row in saved] == [(2, 2)]
+
+    def test_run_batch_skips_notification_when_catalog_save_fails(self, pwn_checker):
+        """Test breaches are not saved when their catalog entries cannot be added"""
+        pwn_checker._breach_repository.get_ids_for_hibp_models.return_value = None
+
+        pwn_checker.run_batch()
+
+        pwn_checker._pwned_platform_repository.bulk_insert.assert_not_called()
+        pwn_checker._notification_service.notify.assert_not_called()
+
+    def test_run_batch_aborts_when_fingerprints_fail_to_load(self, pwn_checker):
+        """Test no lookups run when saved breaches cannot be loaded"""
+        repository = pwn_checker._pwned_platform_repository
+        repository.get_fingerprints_by_email_ids.return_value = None
+
+        pwn_checker.run_batch()
+
+        pwn_checker._hibp_client.lookup_breached_accounts.assert_not_called()
+        repository.bulk_insert.assert_not_called()
+
+    def test_run_batch_uses_breach_catalog(self, pwn_checker):
+        """Test names from truncated lookups are resolved through the catalog"""
+        catalog = {
+            "Adobe": make_breach("Adobe", "2013-10-04"),
+            "Wattpad": make_breach("Wattpad", "2020-06-29"),
+        }
+        names = {
+            "first@example.com": ["Adobe"],
+            "second@example.com": ["Adobe", "Unknown"],
+            "third@example.gov": None,
+        }
+        pwn_checker._breach_catalog.refresh.return_value = True
+        pwn_checker._breach_catalog.resolve.side_effect = lambda breach_names: (
+            None
+            if any(name not in catalog for name in breach_names)
+            else [catalog[name] for name in breach_names]
+        )
+        hibp_client = pwn_checker._hibp_client
+        hibp_client.lookup_breached_account_names.side_effect = lambda email: (
+            names[email],
+            True,
+        )
+
+        pwn_checker.run_batch()
+
+        assert hibp_client.lookup_breached_account_names.call_count == 3
+        # Only the address with a breach missing from the catalog is fetched in full
+        hibp_client.lookup_breached_accounts.assert_called_once_with(
+            email="second@example.com"
+        )
+        saved = pwn_checker._pwned_platform_repository.bulk_insert.call_args.args[0]
+        assert sorted((row["email_id"], row["breach_id"]) for row in saved) == [
+            (1, 1),
+            (2, 1),
+            (2, 2),
+        ]
+
+    def test_run_batch_survives_lookup_errors(self, pwn_checker):
+        """Test a failing lookup does not abort the sweep"""
+        pwn_checker._hibp_client.lookup_breached_accounts.side_effect = Exception(
+            "Connection error"
+        )
+
+        pwn_checker.run_batch()
+
+        assert pwn_checker._hibp_client.lookup_breached_accounts.call_count == 3
+        pwn_checker._pwned_platform_repository.bulk_insert.assert_not_called()
+
+    def test_run_batch_records_every_check(self, pwn_checker):
+        """Test each email gets the status of its check, in one write per batch"""
+        pwn_checker.run_batch()
+
+        pwn_checker._email_repository.mark_checked.assert_called_once_with(
+            {
+                1: Email.CHECK_STATUS_BREACHED,
+                2: Email.CHECK_STATUS_BREACHED,
+                3: Email.CHECK_STATUS_OK,
+            }
+        )
+
+    def test_run_batch_records_failed_checks(self, pwn_checker):
+        """Test failed lookups and unsaved breaches are recorded as failed"""
+
+        def lookup(email):
+            if email == "third@example.gov":
+                raise Exception("Connection error")
+            return [make_breach("Adobe", "2013-10-04")], True
+
+        pwn_checker._hibp_client.lookup_breached_accounts.side_effect = lookup
+        pwn_checker._pwned_platform_repository.bulk_insert.return_value = False
+
+        pwn_checker.run_batch()
+
+        pwn_checker._email_repository.mark_checked.assert_called_once_with(
+            {
+                1: Email.CHECK_STATUS_FAILED,
+                2: Email.CHECK_STATUS_FAILED,
+                3: Email.CHECK_STATUS_FAILED,
+            }
+        )
+
+    def test_run_returns_the_emails_to_retry(self, pwn_checker):
+        """Test run returns the ids of failed checks and reports its progress"""
+        pwn_checker._db_batch_size = 1
+
+        def lookup(email):
+            if email == "third@example.gov":
+                raise Exception("Connection error")
+            return [make_breach("Adobe", "2013-10-04")], True
+
+        pwn_checker._hibp_client.lookup_breached_accounts.side_effect = lookup
+        on_progress = MagicMock()
+
+        assert pwn_checker.run(on_progress=on_progress) == [3]
+        assert on_progress.call_count == 3
+        assert pwn_checker._on_progress is None
+
+    def test_run_returns_every_email_when_fingerprints_fail_to_load(self, pwn_checker):
+        """Test emails that could not be checked at all are all returned"""
+        repository = pwn_checker._pwned_platform_repository
+        repository.get_fingerprints_by_email_ids.return_value = None
+
+        assert pwn_checker.run() == [1, 2, 3]
+
+    def test_run_batch_commits_responses_once_saved(self, pwn_checker):
+        """Test cached responses are only committed after the checks are saved"""
+        response_cache = pwn_checker._hibp_client.response_cache
+
+        pwn_checker.run_batch()
+
+        committed = {
+            call.args[0] for call in response_cache.commit_email.call_args_list
+        }
+        assert committed == {
+            "first@example.com",
+            "second@example.com",
+            "third@example.gov",
+        }
+        response_cache.discard_email.assert_not_called()
+
+    def test_run_batch_discards_responses_when_save_fails(self, pwn_checker):
+        """Test a failed save leaves the responses changed for the next sweep"""
+        pwn_checker._pwned_platform_repository.bulk_insert.return_value = False
+        response_cache = pwn_checker._hibp_client.response_cache
+
+        pwn_checker.run_batch()
+
+        discarded = {
+            call.args[0] for call in response_cache.discard_email.call_args_list
+        }
+        assert discarded == {"first@example.com", "second@example.com"}
+        response_cache.commit_email.assert_called_once_with("third@example.gov")
+
+    def test_run_async_saves_in_one_batch_and_notifies(self, pwn_checker, monkeypatch):
+        """Test async mode diffs on the loop and writes all breaches in one batch"""
+        monkeypatch.setattr(
+            "task.pwn_checker.AsyncHibpClient",
+            lambda rate_limiter: FakeAsyncHibpClient(pwn_checker._hibp_client),
+        )
+        pwn_checker._mode = "async"
+
+        pwn_checker.run()
+
+        bulk_insert = pwn_checker._pwned_platform_repository.bulk_insert
+        bulk_insert.assert_called_once()
+        saved = bulk_insert.call_args.args[0]
+        assert sorted((row["email_id"], row["breach_id"]) for row in saved) == [
+            (1, 1),
+            (2, 1),
+            (2, 2),
+        ]
+        assert pwn_checker._notification_service.notify.call_count == 2
+
+    def test_sweeps_flush_the_notification_digest(self, pwn_checker):
+        """Test every sweep ends by sending the collected digest"""
+        pwn_checker.run()
+
+        pwn_checker._notification_service.flush.assert_called_once()
+
+    def test_batched_sweeps_can_defer_the_digest(self, pwn_checker):
+        """Test runs over part of the emails can leave the digest pending"""
+        pwn_checker.run(flush_notifications=False)
+
+        pwn_checker._notification_service.notify.assert_called()
+        pwn_checker._notification_service.flush.assert_not_called()
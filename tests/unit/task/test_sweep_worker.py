@@ -0,0 +1,263 @@
+# tests/unit/task/test_sweep_worker.py
+import socket
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from db.db import db
+from db.model.email import Email
+from db.model.sweep_job import SweepJob
+from db.model.user import User
+from repository.check_queue_repository import CheckQueueRepository
+from repository.email_repository import EmailRepository
+from repository.sweep_job_repository import SweepJobRepository
+from task.sweep_worker import SweepWorker, main
+
+
+@pytest.fixture
+def pwn_checker():
+    with patch("task.sweep_worker.PwnChecker") as checker:
+        # No failed lookups
+        checker.return_value.run.return_value = []
+        yield checker.return_value
+
+
+@pytest.fixture
+def worker(app, pwn_checker, monkeypatch):
+    """Worker checking the two emails of the database one batch at a time"""
+    db.session.add(
+        User(id=1, user_name="admin", email="admin@example.com", password="password")
+    )
+    db.session.add(Email(id=1, user_id=1, email="first@example.com"))
+    db.session.add(Email(id=2, user_id=1, email="second@example.com"))
+    db.session.commit()
+    monkeypatch.setenv("PWN_CHECK_QUEUE_BATCH_SIZE", "1")
+    monkeypatch.setenv("PWN_CHECK_QUEUE_MAX_ATTEMPTS", "2")
+    return SweepWorker(worker_id="host:1", poll_seconds=0)
+
+
+def checked_email_ids(pwn_checker):
+    return [
+        [email.id for email in call.args[0]] for call in pwn_checker.run.call_args_list
+    ]
+
+
+class TestSweepWorker:
+    def test_run_once_runs_pending_job(self, worker, pwn_checker):
+        """Test run_once runs the pending sweep instead of requesting another"""
+        pending = SweepJobRepository().enqueue("scheduler")
+
+        assert worker.run_once("cli") is True
+
+        assert checked_email_ids(pwn_checker) == [[1], [2]]
+        assert [job.id for job in SweepJobRepository().get_all()] == [pending.id]
+        assert pending.status == SweepJob.STATUS_DONE
+        assert pending.worker == "host:1"
+        assert CheckQueueRepository().get_all() == []
+
+    def test_one_digest_per_sweep(self, worker, pwn_checker):
+        """Test batches leave the digest pending until the sweep is done"""
+        worker.run_once("cli")
+
+        assert pwn_checker.run.call_count == 2
+        for call in pwn_checker.run.call_args_list:
+            assert call.kwargs["flush_notifications"] is False
+        assert [
+            call.kwargs["refresh_catalog"] for call in pwn_checker.run.call_args_list
+        ] == [True, False]
+        pwn_checker.flush_notifications.assert_called_once()
+
+    def test_run_once_records_failure(self, worker, pwn_checker):
+        """Test failing batches are retried, then the sweep is recorded as failed"""
+
+        def check(emails, **_):
+            if emails[0].id == 2:
+                raise RuntimeError("boom")
+            return []
+
+        pwn_checker.run.side_effect = check
+
+        assert worker.run_once("cli") is False
+
+        assert checked_email_ids(pwn_checker) == [[1], [2], [2]]
+        job = SweepJobRepository().get_latest()
+        assert job.requested_by == "cli"
+        assert job.status == SweepJob.STATUS_FAILED
+        assert job.error == "Gave up on 1 emails after 2 attempts"
+        assert db.session.get(Email, 2).last_check_status == Email.CHECK_STATUS_FAILED
+        assert CheckQueueRepository().get_all() == []
+
+    def test_failed_lookups_are_retried(self, worker, pwn_checker):
+        """Test emails whose lookup failed go back to the queue, not out of it"""
+        pwn_checker.run.side_effect = lambda emails, **_: [
+            email.id for email in emails if email.id == 2
+        ]
+
+        assert worker.run_once("cli") is False
+
+        assert checked_email_ids(pwn_checker) == [[1], [2], [2]]
+        job = SweepJobRepository().get_latest()
+        assert job.error == "Gave up on 1 emails after 2 attempts"
+        assert CheckQueueRepository().get_all() == []
+
+    def test_leases_are_renewed_while_a_batch_is_checked(self, worker, pwn_checker):
+        """Test recorded progress extends the lease of the batch being checked"""
+        leases = []
+
+        def check(emails, on_progress, **_):
+            item = CheckQueueRepository().get_all()[0]
+            item.lease_expires_at = datetime.now()
+            db.session.commit()
+            on_progress()
+            leases.append(CheckQueueRepository().get_all()[0].lease_expires_at)
+            return []
+
+        pwn_checker.run.side_effect = check
+
+        worker.run_once("cli")
+
+        assert leases[0] > datetime.now() + timedelta(seconds=800)
+
+    def test_stopped_sweeps_resume_where_they_stopped(self, worker, pwn_checker):
+        """Test a paused job is resumed from its cursor by the next worker"""
+
+        def check(emails, **_):
+            EmailRepository().mark_checked({email.id: "ok" for email in emails})
+            worker.stop()
+            return []
+
+        pwn_checker.run.side_effect = check
+
+        assert worker.run_once("cli") is False
+
+        job = SweepJobRepository().get_latest()
+        assert job.status == SweepJob.STATUS_PENDING
+        assert job.worker is None
+        cursor = job.cursor
+        assert [item.email_id for item in CheckQueueRepository().get_all()] == [2]
+
+        pwn_checker.run.side_effect = None
+        assert SweepWorker(worker_id="host:2", poll_seconds=0).run_once("cli")
+
+        assert checked_email_ids(pwn_checker) == [[1], [2]]
+        assert job.status == SweepJob.STATUS_DONE
+        assert job.worker == "host:2"
+        assert job.cursor == cursor
+
+    def test_sweeps_check_the_oldest_checked_emails_first(self, worker, pwn_checker):
+        """Test never checked emails come first, then the ones checked longest ago"""
+        db.session.add(Email(id=3, user_id=1, email="third@example.com"))
+        db.session.commit()
+        now = datetime.now()
+        emails = EmailRepository()
+        emails.mark_checked({1: Email.CHECK_STATUS_OK}, now - timedelta(hours=1))
+        emails.mark_checked({2: Email.CHECK_STATUS_OK}, now - timedelta(hours=2))
+
+        worker.run_once("cli")
+
+        assert checked_email_ids(pwn_checker) == [[3], [2], [1]]
+
+    def test_run_forever_resumes_abandoned_jobs(self, worker, pwn_checker):
+        """Test the daemon loop resumes the jobs of workers that died"""
+        abandoned = SweepJobRepository().enqueue("scheduler")
+        SweepJobRepository().claim(f"{socket.gethostname()}:999999999")
+        # The dead worker got as far as the first email
+        EmailRepository().mark_checked({1: Email.CHECK_STATUS_OK})
+
+        def check(emails, **_):
+            # Stop once the last email of the sweep is checked
+            if emails[0].id == 2:
+                worker.stop()
+            return []
+
+        pwn_checker.run.side_effect = check
+
+        worker.run_forever()
+
+        assert abandoned.status == SweepJob.STATUS_DONE
+        assert abandoned.worker == "host:1"
+        assert checked_email_ids(pwn_checker) == [[2]]
+
+    def test_run_once_waits_for_the_running_sweep(self, worker, pwn_checker):
+        """Test run_once does not start a second sweep next to a live one"""
+        SweepJobRepository().enqueue("scheduler")
+        running = SweepJobRepository().claim("other-host:1")
+
+        assert worker.run_once("scheduler") is False
+
+        assert pwn_checker.run.call_count == 0
+        assert running.status == SweepJob.STATUS_RUNNING
+        assert [job.status for job in SweepJobRepository().get_all()] == [
+            SweepJob.STATUS_RUNNING,
+            SweepJob.STATUS_PENDING,
+        ]
+
+    def test_run_once_resumes_jobs_with_a_stale_heartbeat(self, worker, pwn_checker):
+        """Test the scheduler runner takes over a job whose worker died elsewhere"""
+        abandoned = SweepJobRepository().enqueue("scheduler")
+        SweepJobRepository().claim("other-host:1")
+        abandoned.heartbeat_at = datetime.now() - timedelta(hours=1)
+        db.session.commit()
+
+        assert worker.run_once("scheduler") is True
+
+        assert abandoned.status == SweepJob.STATUS_DONE
+        assert abandoned.worker == "host:1"
+        assert len(SweepJobRepository().get_all()) == 1
+
+    def test_rolling_slices_spread_checks_over_the_interval(self, worker, pwn_checker):
+        """Test each tick checks its share of the emails that are due"""
+
+        def check(emails, **_):
+            EmailRepository().mark_checked(
+                {email.id: Email.CHECK_STATUS_OK for email in emails}
+            )
+            return []
+
+        pwn_checker.run.side_effect = check
+        # Two ticks per interval, one email per tick
+        assert worker.run_slice(120, 60) == 0
+        assert worker.enqueue_slice(120, 60) == 1
+        assert [item.email_id for item in CheckQueueRepository().get_all()] == [2]
+        worker.drain()
+
+        assert checked_email_ids(pwn_checker) == [[1], [2]]
+        assert SweepJobRepository().get_all() == []
+        assert worker.enqueue_slice(120, 60) == 0
+
+    def test_rolling_slices_sync_the_catalog_once_per_interval(
+        self, worker, pwn_checker
+    ):
+        """Test consecutive ticks share one checker and one catalog sync"""
+
+        def check(emails, **_):
+            EmailRepository().mark_checked(
+                {email.id: Email.CHECK_STATUS_OK for email in emails}
+            )
+            return []
+
+        pwn_checker.run.side_effect = check
+
+        worker.run_slice(120, 60)
+        worker.run_slice(120, 60)
+
+        assert checked_email_ids(pwn_checker) == [[1], [2]]
+        assert [
+            call.kwargs["refresh_catalog"] for call in pwn_checker.run.call_args_list
+        ] == [True, False]
+
+    def test_rolling_slices_skip_recently_checked_emails(self, worker, pwn_checker):
+        """Test emails checked within the interval are not queued again"""
+        EmailRepository().mark_checked({1: Email.CHECK_STATUS_OK})
+        EmailRepository().mark_checked(
+            {2: Email.CHECK_STATUS_OK}, datetime.now() - timedelta(hours=2)
+        )
+
+        assert worker.enqueue_slice(3600, 3600) == 1
+        assert [item.email_id for item in CheckQueueRepository().get_all()] == [2]
+
+    def test_main_requires_a_mode(self):
+        """Test the CLI refuses to start without --once or --daemon"""
+        with pytest.raises(SystemExit):
+            main([])
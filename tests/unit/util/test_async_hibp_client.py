@@ -0,0 +1,158 @@
+# tests/unit/util/test_async_hibp_client.py
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+from unittest.mock import MagicMock
+
+from util.async_hibp_client import AsyncHibpClient
+from util.response_cache import HibpResponseCache
+from exceptions.no_hibp_key_found_exception import NoHibpKeyFoundException
+from exceptions.hibp_could_not_be_verified_exception import (
+    HibpCouldNotBeVerifiedException,
+)
+
+SAMPLE_BREACH = {
+    "Name": "Wattpad",
+    "Title": "Wattpad",
+    "Domain": "wattpad.com",
+    "BreachDate": "2020-06-29",
+    "AddedDate": "2020-07-19T22:49:19Z",
+    "ModifiedDate": "2020-07-19T22:49:19Z",
+    "PwnCount": 268765495,
+    "Description": "Breach description",
+    "LogoPath": "https://logos.haveibeenpwned.com/Wattpad.png",
+    "Attribution": None,
+    "DisclosureUrl": None,
+    "DataClasses": ["Email addresses", "Passwords"],
+    "IsVerified": True,
+    "IsFabricated": False,
+    "IsSensitive": False,
+    "IsRetired": False,
+    "IsSpamList": False,
+    "IsMalware": False,
+    "IsSubscriptionFree": False,
+    "IsStealerLog": False,
+}
+
+
+@pytest.fixture
+def mock_env_with_key(monkeypatch):
+    """Mock environment with HIBP API key"""
+    monkeypatch.setenv("HIBP_API_KEY", "test_api_key")
+
+
+def lookup(handler, email="test@example.com", rate_limiter=None):
+    """Run a single lookup against a mock transport"""
+
+    async def run():
+        async with AsyncHibpClient(
+            rate_limiter=rate_limiter, transport=httpx.MockTransport(handler)
+        ) as client:
+            return await client.get_breached_accounts(email)
+
+    return asyncio.run(run())
+
+
+class TestAsyncHibpClient:
+    def test_get_breached_accounts_success(self, mock_env_with_key):
+        """Test successful retrieval of breached accounts"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, content=json.dumps([SAMPLE_BREACH]))
+
+        result = lookup(handler)
+
+        assert len(requests) == 1
+        assert requests[0].headers["hibp-api-key"] == "test_api_key"
+        assert "/breachedaccount/test@example.com" in str(requests[0].url)
+        assert result[0].name == "Wattpad"
+        assert result[0].pwn_count == 268765495
+
+    def test_get_breached_accounts_no_breaches(self, mock_env_with_key):
+        """Test when no breaches are found"""
+        assert lookup(lambda request: httpx.Response(404)) is None
+
+    def test_get_breached_accounts_unauthorized(self, mock_env_with_key):
+        """Test unauthorized API key"""
+        with pytest.raises(HibpCouldNotBeVerifiedException):
+            lookup(lambda request: httpx.Response(401))
+
+    def test_get_breached_accounts_no_api_key(self, monkeypatch):
+        """Test exception is raised when no API key is found"""
+        monkeypatch.delenv("HIBP_API_KEY", raising=False)
+
+        with pytest.raises(NoHibpKeyFoundException):
+            lookup(lambda request: httpx.Response(404))
+
+    def test_get_breached_accounts_retries_after_429(self, mock_env_with_key):
+        """Test a 429 response throttles the rate limiter and is retried"""
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, content=json.dumps([SAMPLE_BREACH])),
+        ]
+        rate_limiter = MagicMock()
+
+        async def acquire_async():
+            return 0.0
+
+        rate_limiter.acquire_async = acquire_async
+
+        result = lookup(lambda request: responses.pop(0), rate_limiter=rate_limiter)
+
+        assert len(result) == 1
+        rate_limiter.throttle.assert_called_once_with(2.0)
+        rate_limiter.recover.assert_called_once()
+
+    def test_response_cache_runs_off_the_event_loop(self, mock_env_with_key):
+        """Test cache reads and writes, which may hit SQLite, run in a thread"""
+        threads = []
+
+        class RecordingCache(HibpResponseCache):
+            def get(self, key):
+                threads.append(threading.get_ident())
+                return super().get(key)
+
+            def resolve(self, *args):
+                threads.append(threading.get_ident())
+                return super().resolve(*args)
+
+        async def run():
+            async with AsyncHibpClient(
+                transport=httpx.MockTransport(
+                    lambda request: httpx.Response(
+                        200, content=json.dumps([SAMPLE_BREACH])
+                    )
+                ),
+                response_cache=RecordingCache(),
+            ) as client:
+                await client.get_breached_accounts("test@example.com")
+                return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        assert len(threads) == 3
+        assert loop_thread not in threads
+
+    def test_get_breached_accounts_requires_context_manager(self, mock_env_with_key):
+        """Test lookups outside the async context manager are rejected"""
+        with pytest.raises(RuntimeError):
+            asyncio.run(AsyncHibpClient().get_breached_accounts("test@example.com"))
+
+    def test_get_mock_breached_accounts(self):
+        """Test mock data matches the sync client"""
+        result = asyncio.run(
+            AsyncHibpClient().get_mock_breached_accounts("test@example.com")
+        )
+
+        assert len(result) > 0
+        assert (
+            asyncio.run(
+                AsyncHibpClient().get_mock_breached_accounts("test@example.gov")
+            )
+            is None
+        )
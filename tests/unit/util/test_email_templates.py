@@ -0,0 +1,90 @@
+# tests/unit/util/test_email_templates.py
+import pytest
+from unittest.mock import patch
+
+from util.email_templates import EmailTemplates
+from util.html_sanitizer import sanitize_html
+from tests.unit.task.test_pwn_checker import make_breach
+
+DESCRIPTION = (
+    'In 2013, <a href="https://example.com/news" target="_blank">Adobe</a> '
+    'was breached.<script>alert(1)</script><p onclick="x()">Passwords'
+)
+
+
+@pytest.fixture
+def templates():
+    return EmailTemplates()
+
+
+def with_description(name: str, description: str):
+    breach = make_breach(name, "2013-10-04", ("Email addresses", "Passwords"))
+    return breach.model_copy(update={"description": description})
+
+
+class TestSanitizeHtml:
+    def test_keeps_allowed_markup(self):
+        """Test allowed tags, safe links and text are kept, scripts are not"""
+        html, text = sanitize_html(DESCRIPTION)
+
+        assert html == (
+            'In 2013, <a href="https://example.com/news" rel="noopener noreferrer">'
+            "Adobe</a> was breached.<p>Passwords</p>"
+        )
+        assert text == "In 2013, Adobe was breached. Passwords"
+
+    def test_drops_unsafe_links_and_escapes_text(self):
+        """Test javascript links lose their href and text is escaped"""
+        html, _ = sanitize_html('<a href="javascript:alert(1)">x</a> 1 < 2 &amp; <b>')
+
+        assert html == "<a>x</a> 1 &lt; 2 &amp; <b></b>"
+
+
+class TestEmailTemplates:
+    def test_render_breach_alert(self, templates):
+        """Test every address and breach is rendered in both bodies"""
+        text, html = templates.render_breach_alert(
+            {
+                "a@example.com": [with_description("Adobe", DESCRIPTION)],
+                "b@example.com": [with_description("Wattpad", "<b>Wattpad</b>")],
+            }
+        )
+
+        assert "detected for a@example.com:" in text
+        assert "- Adobe (2013-10-04): adobe.com" in text
+        assert "Description: In 2013, Adobe was breached. Passwords" in text
+        assert "Data compromised: Email addresses, Passwords" in text
+        assert "detected for b@example.com:" in text
+        assert "<" not in text
+
+        assert "<script>" not in html
+        assert 'rel="noopener noreferrer">Adobe</a>' in html
+        assert "<b>Wattpad</b>" in html
+
+    def test_html_escapes_breach_fields(self, templates):
+        """Test fields other than the sanitized description are escaped"""
+        breach = with_description("Adobe", "").model_copy(
+            update={"title": "<i>Adobe</i>"}
+        )
+
+        _, html = templates.render_breach_alert({"a&b@example.com": [breach]})
+
+        assert "&lt;i&gt;Adobe&lt;/i&gt;" in html
+        assert "a&amp;b@example.com" in html
+
+    def test_descriptions_are_sanitized_once_per_breach(self, templates):
+        """Test descriptions are shared across renders until they change"""
+        with patch(
+            "util.email_templates.sanitize_html", wraps=sanitize_html
+        ) as sanitize:
+            for email_address in ("a@example.com", "b@example.com"):
+                templates.render_breach_alert(
+                    {email_address: [with_description("Adobe", DESCRIPTION)]}
+                )
+            assert sanitize.call_count == 1
+
+            text, _ = templates.render_breach_alert(
+                {"a@example.com": [with_description("Adobe", "Updated")]}
+            )
+            assert sanitize.call_count == 2
+            assert "Description: Updated" in text
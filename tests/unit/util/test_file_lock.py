@@ -0,0 +1,30 @@
+# tests/unit/util/test_file_lock.py
+import threading
+
+from util.file_lock import FileLock
+
+
+class TestFileLock:
+    def test_second_holder_waits_for_the_first(self, tmp_path):
+        """Test the lock is only taken once the current holder released it"""
+        path = str(tmp_path / "migrate.lock")
+        events = []
+
+        def take():
+            with FileLock(path):
+                events.append("second")
+
+        with FileLock(path):
+            thread = threading.Thread(target=take)
+            thread.start()
+            thread.join(timeout=0.2)
+            events.append("first")
+        thread.join(timeout=5)
+
+        assert events == ["first", "second"]
+
+    def test_without_path_does_not_lock(self):
+        """Test in-memory databases run their migrations without a lock file"""
+        with FileLock(None):
+            with FileLock(None):
+                pass
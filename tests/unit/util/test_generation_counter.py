@@ -0,0 +1,26 @@
+# tests/unit/util/test_generation_counter.py
+from util.generation_counter import GenerationCounter
+
+
+class TestGenerationCounter:
+    def test_bump_is_seen_by_other_counters_on_the_same_file(self, tmp_path):
+        """Test a bump in one process changes the generation seen by another"""
+        path = str(tmp_path / "users.generation")
+        worker_a, worker_b = GenerationCounter(path), GenerationCounter(path)
+        before = worker_b.current()
+
+        worker_a.bump()
+        after_first = worker_b.current()
+        worker_a.bump()
+
+        assert before != after_first
+        assert worker_b.current() != after_first
+
+    def test_without_path_counts_in_memory(self):
+        """Test the counter still changes when it is not backed by a file"""
+        counter = GenerationCounter()
+        before = counter.current()
+
+        counter.bump()
+
+        assert counter.current() != before
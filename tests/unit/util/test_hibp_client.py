@@ -1,13 +1,17 @@
 # tests/unit/util/test_hibp_client.py
+import json
 import os
 import pytest
 from unittest.mock import patch, MagicMock
 
-from util.hibp_client import HibpClient
+from util.hibp_client import HibpClient, parse_retry_after, DEFAULT_RETRY_AFTER
 from exceptions.no_hibp_key_found_exception import NoHibpKeyFoundException
 from exceptions.hibp_could_not_be_verified_exception import (
     HibpCouldNotBeVerifiedException,
 )
+from exceptions.hibp_rate_limit_exceeded_exception import (
+    HibpRateLimitExceededException,
+)
 from model.hibp_breached_site_model import HibpBreachedSiteModel
 
 
@@ -74,7 +78,7 @@ class TestHibpClient:
         with pytest.raises(NoHibpKeyFoundException):
             hibp_client.get_breached_accounts("test@example.com")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_success(
         self, mock_get, hibp_client, mock_env_with_key, sample_breach_response
     ):
@@ -83,6 +87,8 @@ class TestHibpClient:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = sample_breach_response
+        mock_response.text = json.dumps(mock_response.json.return_value)
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         result = hibp_client.get_breached_accounts("test@example.com")
@@ -95,6 +101,10 @@ class TestHibpClient:
             in args[0]
         )
         assert kwargs["headers"] == {"hibp-api-key": "test_api_key"}
+        assert kwargs["timeout"] == (
+            hibp_client._connect_timeout,
+            hibp_client._read_timeout,
+        )
 
         assert len(result) == 1
         assert isinstance(result[0], HibpBreachedSiteModel)
@@ -107,7 +117,7 @@ class TestHibpClient:
         assert result[0].is_verified is True
         assert result[0].is_malware is False
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_truncate_param(
         self, mock_get, hibp_client, mock_env_with_key
     ):
@@ -115,6 +125,8 @@ class TestHibpClient:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = []
+        mock_response.text = json.dumps(mock_response.json.return_value)
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         hibp_client.get_breached_accounts("test@example.com", truncate_response=True)
@@ -127,7 +139,7 @@ class TestHibpClient:
         args, kwargs = mock_get.call_args
         assert "truncateResponse=false" in args[0]
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_no_breaches(
         self, mock_get, hibp_client, mock_env_with_key
     ):
@@ -139,7 +151,7 @@ class TestHibpClient:
         result = hibp_client.get_breached_accounts("test@example.com")
         assert result is None
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_unauthorized(
         self, mock_get, hibp_client, mock_env_with_key
     ):
@@ -151,7 +163,7 @@ class TestHibpClient:
         with pytest.raises(HibpCouldNotBeVerifiedException):
             hibp_client.get_breached_accounts("test@example.com")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_unexpected_status(
         self, mock_get, hibp_client, mock_env_with_key
     ):
@@ -164,7 +176,7 @@ class TestHibpClient:
         with pytest.raises(Exception, match="Server error"):
             hibp_client.get_breached_accounts("test@example.com")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_request_exception(
         self, mock_get, hibp_client, mock_env_with_key
     ):
@@ -174,7 +186,7 @@ class TestHibpClient:
         with pytest.raises(Exception, match="Connection error"):
             hibp_client.get_breached_accounts("test@example.com")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_breached_accounts_multiple_breaches(
         self, mock_get, hibp_client, mock_env_with_key
     ):
@@ -228,6 +240,8 @@ class TestHibpClient:
                 "IsStealerLog": False,
             },
         ]
+        mock_response.text = json.dumps(mock_response.json.return_value)
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         result = hibp_client.get_breached_accounts("test@example.com")
@@ -236,3 +250,159 @@ class TestHibpClient:
         assert result[0].name == "Dailymotion"
         assert result[1].name == "Wattpad"
         assert result[1].pwn_count == 268765495
+
+    @patch("util.hibp_client.time.sleep")
+    @patch("requests.Session.get")
+    def test_get_breached_accounts_retries_after_429(
+        self,
+        mock_get,
+        mock_sleep,
+        hibp_client,
+        mock_env_with_key,
+        sample_breach_response,
+    ):
+        """Test a 429 response is retried after the Retry-After delay"""
+        throttled_response = MagicMock()
+        throttled_response.status_code = 429
+        throttled_response.headers = {"Retry-After": "3"}
+        success_response = MagicMock()
+        success_response.status_code = 200
+        success_response.json.return_value = sample_breach_response
+        success_response.text = json.dumps(success_response.json.return_value)
+        success_response.headers = {}
+        mock_get.side_effect = [throttled_response, success_response]
+
+        result = hibp_client.get_breached_accounts("test@example.com")
+
+        assert mock_get.call_count == 2
+        mock_sleep.assert_called_once_with(3.0)
+        assert len(result) == 1
+
+    @patch("util.hibp_client.time.sleep")
+    @patch("requests.Session.get")
+    def test_get_breached_accounts_throttles_rate_limiter(
+        self, mock_get, mock_sleep, hibp_client, mock_env_with_key
+    ):
+        """Test a 429 response slows down the attached rate limiter"""
+        throttled_response = MagicMock()
+        throttled_response.status_code = 429
+        throttled_response.headers = {"Retry-After": "1"}
+        not_found_response = MagicMock()
+        not_found_response.status_code = 404
+        mock_get.side_effect = [throttled_response, not_found_response]
+
+        rate_limiter = MagicMock(rate=1.0)
+        hibp_client.rate_limiter = rate_limiter
+        try:
+            result = hibp_client.get_breached_accounts("test@example.com")
+        finally:
+            hibp_client.rate_limiter = None
+
+        assert result is None
+        assert rate_limiter.acquire.call_count == 2
+        rate_limiter.throttle.assert_called_once_with(1.0)
+        rate_limiter.recover.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch("util.hibp_client.time.sleep")
+    @patch("requests.Session.get")
+    def test_get_breached_accounts_gives_up_after_max_retries(
+        self, mock_get, mock_sleep, hibp_client, mock_env_with_key
+    ):
+        """Test the request is abandoned when the API keeps answering 429"""
+        throttled_response = MagicMock()
+        throttled_response.status_code = 429
+        throttled_response.headers = {}
+        mock_get.return_value = throttled_response
+
+        with pytest.raises(HibpRateLimitExceededException):
+            hibp_client.get_breached_accounts("test@example.com")
+
+        assert mock_get.call_count == hibp_client._max_retries + 1
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for seconds, HTTP dates and bad values"""
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after(None) == DEFAULT_RETRY_AFTER
+        assert parse_retry_after("soon") == DEFAULT_RETRY_AFTER
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @patch("requests.Session.get")
+    def test_lookup_breached_accounts_detects_unchanged_response(
+        self, mock_get, hibp_client, mock_env_with_key, sample_breach_response
+    ):
+        """Test a repeated identical response is reported as unchanged"""
+        hibp_client.response_cache.invalidate_email("cached@example.com")
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = json.dumps(sample_breach_response)
+        mock_response.headers = {"ETag": '"v1"'}
+        mock_get.return_value = mock_response
+
+        first, first_changed = hibp_client.lookup_breached_accounts(
+            "cached@example.com"
+        )
+        with patch.object(HibpBreachedSiteModel, "model_validate") as mock_validate:
+            second, second_changed = hibp_client.lookup_breached_accounts(
+                "cached@example.com"
+            )
+
+        assert first_changed is True
+        assert second_changed is False
+        assert second == first
+        mock_validate.assert_not_called()
+        args, kwargs = mock_get.call_args
+        assert kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    @patch("requests.Session.get")
+    def test_lookup_breached_accounts_not_modified(
+        self, mock_get, hibp_client, mock_env_with_key, sample_breach_response
+    ):
+        """Test a 304 response is served from the cache"""
+        hibp_client.response_cache.invalidate_email("etag@example.com")
+        ok_response = MagicMock()
+        ok_response.status_code = 200
+        ok_response.text = json.dumps(sample_breach_response)
+        ok_response.headers = {"ETag": '"v1"'}
+        not_modified_response = MagicMock()
+        not_modified_response.status_code = 304
+        mock_get.side_effect = [ok_response, not_modified_response]
+
+        hibp_client.lookup_breached_accounts("etag@example.com")
+        result, changed = hibp_client.lookup_breached_accounts("etag@example.com")
+
+        assert changed is False
+        assert result[0].name == "Dailymotion"
+
+    @patch("requests.Session.get")
+    def test_lookup_breached_account_names(
+        self, mock_get, hibp_client, mock_env_with_key
+    ):
+        """Test truncated lookups return breach names only"""
+        hibp_client.response_cache.invalidate_email("names@example.com")
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = json.dumps([{"Name": "Adobe"}, {"Name": "Wattpad"}])
+        mock_response.headers = {}
+        mock_get.return_value = mock_response
+
+        names, changed = hibp_client.lookup_breached_account_names("names@example.com")
+
+        args, kwargs = mock_get.call_args
+        assert "truncateResponse=true" in args[0]
+        assert names == ["Adobe", "Wattpad"]
+        assert changed is True
+
+    @patch("requests.Session.get")
+    def test_get_all_breaches(self, mock_get, hibp_client, sample_breach_response):
+        """Test the breach catalog is returned as raw dictionaries"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = sample_breach_response
+        mock_get.return_value = mock_response
+
+        result = hibp_client.get_all_breaches()
+
+        args, kwargs = mock_get.call_args
+        assert args[0] == "https://haveibeenpwned.com/api/v3/breaches"
+        assert result == sample_breach_response
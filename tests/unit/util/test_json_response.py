@@ -0,0 +1,115 @@
+# tests/unit/util/test_json_response.py
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import pytest
+from flask import Flask, jsonify
+
+import util.json_response
+from model.response_model import ResponseModel
+from util.json_response import OrjsonJSONProvider, dumps, json_response
+
+
+@dataclass
+class BreachCount:
+    domain: str
+    count: int
+
+
+class Row:
+    def to_json(self):
+        return {"id": 1}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    """Runs a test with orjson and with the stdlib fallback"""
+    if request.param == "stdlib":
+        monkeypatch.setattr(util.json_response, "orjson", None)
+    return request.param
+
+
+class TestDumps:
+    def test_serializes_models_dataclasses_and_dates(self, encoder):
+        """Test every supported type ends up as plain JSON"""
+        body = ResponseModel.model_construct(
+            success=True,
+            message="ok",
+            data={
+                "counts": [BreachCount("adobe.com", 2)],
+                "rows": [Row()],
+                "breach_date": date(2013, 10, 4),
+                "created_at": datetime(2024, 1, 1, 12, 30),
+            },
+            error=None,
+        )
+
+        assert json.loads(dumps(body)) == {
+            "success": True,
+            "message": "ok",
+            "data": {
+                "counts": [{"domain": "adobe.com", "count": 2}],
+                "rows": [{"id": 1}],
+                "breach_date": "2013-10-04",
+                "created_at": "2024-01-01T12:30:00",
+            },
+            "error": None,
+        }
+
+    def test_rejects_unknown_types(self, encoder):
+        """Test unsupported objects still raise TypeError"""
+        with pytest.raises(TypeError):
+            dumps({"value": object()})
+
+
+class TestJsonResponse:
+    def test_builds_response_model_body(self):
+        """Test the helper answers with the ResponseModel shape and status"""
+        app = Flask(__name__)
+        with app.app_context():
+            response = json_response(success=False, message="Nope", status=409)
+
+        assert response.status_code == 409
+        assert response.mimetype == "application/json"
+        assert response.get_json() == {
+            "success": False,
+            "message": "Nope",
+            "data": None,
+            "error": None,
+        }
+
+    def test_provider_backs_jsonify(self):
+        """Test jsonify goes through the provider and keeps stdlib options working"""
+        app = Flask(__name__)
+        app.json = OrjsonJSONProvider(app)
+        with app.app_context():
+            response = jsonify(breach_date=date(2013, 10, 4))
+
+            assert response.get_json() == {"breach_date": "2013-10-04"}
+            assert app.json.dumps({"a": 1}, indent=2) == '{\n  "a": 1\n}'
+            assert app.json.dumps({"a": 1}, indent=4) == '{\n    "a": 1\n}'
+
+    @pytest.mark.parametrize("compact", [True, False])
+    def test_provider_responses_use_orjson(self, compact, monkeypatch):
+        """Test app.json.response serializes with orjson, compact or indented"""
+        calls = []
+        orjson_dumps = util.json_response.orjson.dumps
+        monkeypatch.setattr(
+            util.json_response.orjson,
+            "dumps",
+            lambda *args, **kwargs: calls.append(kwargs)
+            or orjson_dumps(*args, **kwargs),
+        )
+        app = Flask(__name__)
+        app.json = OrjsonJSONProvider(app)
+        app.json.compact = compact
+        with app.app_context():
+            response = app.json.response(b=1, a=date(2013, 10, 4))
+
+        assert len(calls) == 1
+        assert response.get_json() == {"a": "2013-10-04", "b": 1}
+        expected = '{"a":"2013-10-04","b":1}\n'
+        if not compact:
+            expected = '{\n  "a": "2013-10-04",\n  "b": 1\n}\n'
+        assert response.get_data(as_text=True) == expected
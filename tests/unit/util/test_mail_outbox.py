@@ -0,0 +1,212 @@
+# tests/unit/util/test_mail_outbox.py
+import glob
+import json
+import os
+import socketserver
+import threading
+
+import pytest
+from flask import Flask
+from flask_mail import Mail, Message
+
+from util.mail_outbox import MailOutbox
+
+
+class SmtpStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server that records what it receives.
+    MAIL FROM is refused with a 451 while refusals is above zero.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.connections = 0
+        self.messages = []
+        self.refusals = 0
+        self.lock = threading.Lock()
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server: SmtpStandIn = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost ready")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 bye")
+                return
+            if command in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                with server.lock:
+                    refused = server.refusals > 0
+                    server.refusals -= refused
+                self.reply("451 try again later" if refused else "250 OK")
+            elif command == "DATA":
+                self.reply("354 end with .")
+                data = []
+                while (data_line := self.rfile.readline().decode()) != ".\r\n":
+                    data.append(data_line)
+                with server.lock:
+                    server.messages.append("".join(data))
+                self.reply("250 queued")
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server():
+    server = SmtpStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mail_app(smtp_server):
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=smtp_server.server_address[1],
+        MAIL_USE_TLS=False,
+        MAIL_DEFAULT_SENDER="alerts@example.com",
+    )
+    mail = Mail(app)
+    with app.app_context():
+        yield app, mail
+
+
+def make_outbox(mail_app, spool_path=None, **kwargs):
+    app, mail = mail_app
+    kwargs.setdefault("backoff_seconds", 0.01)
+    return MailOutbox(app, mail, spool_path=spool_path, **kwargs)
+
+
+def make_message(subject="Breach"):
+    return Message(subject=subject, recipients=["owner@example.com"], body="body")
+
+
+class TestMailOutbox:
+    def test_messages_share_one_connection(self, mail_app, smtp_server, tmp_path):
+        """Test queued messages are sent over a single SMTP connection"""
+        outbox = make_outbox(mail_app, str(tmp_path))
+        outbox.start()
+
+        for i in range(5):
+            assert outbox.enqueue(make_message(f"Breach {i}")) is True
+        outbox.join()
+        outbox.stop()
+
+        assert len(smtp_server.messages) == 5
+        assert smtp_server.connections == 1
+        assert outbox.connection_count == 1
+        assert os.listdir(tmp_path) == []
+
+    def test_failed_send_is_retried(self, mail_app, smtp_server, tmp_path):
+        """Test a refused message is sent again on a new connection"""
+        smtp_server.refusals = 2
+        outbox = make_outbox(mail_app, str(tmp_path))
+        outbox.start()
+
+        outbox.enqueue(make_message())
+        outbox.join()
+        outbox.stop()
+
+        assert len(smtp_server.messages) == 1
+        assert outbox.connection_count == 3
+        assert os.listdir(tmp_path) == []
+
+    def test_gives_up_after_max_attempts(self, mail_app, smtp_server, tmp_path):
+        """Test a message that keeps failing is kept as a .failed spool file"""
+        smtp_server.refusals = 10
+        outbox = make_outbox(mail_app, str(tmp_path), max_attempts=2)
+        outbox.start()
+
+        outbox.enqueue(make_message())
+        outbox.join()
+        outbox.stop()
+
+        assert smtp_server.messages == []
+        failed = glob.glob(os.path.join(tmp_path, "*.json.failed"))
+        assert len(failed) == 1
+        with open(failed[0]) as failed_file:
+            assert json.load(failed_file)["attempts"] == 2
+
+    def test_retries_do_not_hold_up_other_messages(
+        self, mail_app, smtp_server, tmp_path
+    ):
+        """Test messages queued behind a failed one are sent during its backoff"""
+        smtp_server.refusals = 1
+        outbox = make_outbox(mail_app, str(tmp_path), backoff_seconds=0.2)
+        outbox.start()
+
+        for i in range(3):
+            outbox.enqueue(make_message(f"Breach {i}"))
+        outbox.join()
+        outbox.stop()
+
+        subjects = [
+            line.split(": ", 1)[1].strip()
+            for message in smtp_server.messages
+            for line in message.splitlines()
+            if line.startswith("Subject: ")
+        ]
+        assert subjects == ["Breach 1", "Breach 2", "Breach 0"]
+        assert os.listdir(tmp_path) == []
+
+    def test_stop_leaves_retries_in_the_spool(self, mail_app, smtp_server, tmp_path):
+        """Test a message waiting for a retry is spooled again for the next start"""
+        smtp_server.refusals = 1
+        outbox = make_outbox(mail_app, str(tmp_path), backoff_seconds=60)
+        outbox.start()
+
+        outbox.enqueue(make_message())
+        outbox.stop(timeout=10)
+
+        assert smtp_server.messages == []
+        spooled = glob.glob(os.path.join(tmp_path, "*.json"))
+        assert len(spooled) == 1
+        with open(spooled[0]) as spool_file:
+            assert json.load(spool_file)["attempts"] == 1
+
+    def test_spooled_messages_are_sent_on_start(self, mail_app, smtp_server, tmp_path):
+        """Test messages spooled before a restart are sent by the next outbox"""
+        stopped = make_outbox(mail_app, str(tmp_path))
+        for i in range(3):
+            stopped.enqueue(make_message(f"Breach {i}"))
+        # A message a crashed process was sending is picked up as well
+        os.rename(
+            sorted(glob.glob(os.path.join(tmp_path, "*.json")))[0],
+            os.path.join(tmp_path, "0-crashed.json.999999999.sending"),
+        )
+        assert len(os.listdir(tmp_path)) == 3
+
+        outbox = make_outbox(mail_app, str(tmp_path))
+        outbox.start()
+        outbox.join()
+        outbox.stop()
+
+        assert len(smtp_server.messages) == 3
+        assert os.listdir(tmp_path) == []
+
+    def test_without_spool_path(self, mail_app, smtp_server):
+        """Test messages are kept in memory when there is no spool directory"""
+        outbox = make_outbox(mail_app)
+        outbox.start()
+
+        outbox.enqueue(make_message())
+        outbox.join()
+        outbox.stop()
+
+        assert len(smtp_server.messages) == 1
@@ -0,0 +1,111 @@
+# tests/unit/util/test_rate_limiter.py
+import pytest
+from unittest.mock import patch
+
+from util.rate_limiter import TokenBucketRateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only moves when sleep is called"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    clock = FakeClock()
+    with (
+        patch("util.rate_limiter.time.monotonic", clock.monotonic),
+        patch("util.rate_limiter.time.sleep", clock.sleep),
+    ):
+        yield clock
+
+
+class TestTokenBucketRateLimiter:
+    def test_invalid_arguments(self):
+        """Test rate and capacity are validated"""
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(rate=0)
+
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(rate=1, capacity=0)
+
+    def test_per_minute(self):
+        """Test limiter is sized from requests per minute"""
+        limiter = TokenBucketRateLimiter.per_minute(120, burst=5)
+
+        assert limiter.rate == 2
+        assert limiter.capacity == 5
+
+    def test_burst_is_served_without_waiting(self, fake_clock):
+        """Test a full bucket serves its capacity immediately"""
+        limiter = TokenBucketRateLimiter(rate=1, capacity=3)
+
+        waits = [limiter.acquire() for _ in range(3)]
+
+        assert waits == [0, 0, 0]
+        assert limiter.try_acquire() is False
+
+    def test_acquire_waits_for_refill(self, fake_clock):
+        """Test acquire blocks until the next token is available"""
+        limiter = TokenBucketRateLimiter.per_minute(30)
+        start = fake_clock.now
+
+        for _ in range(4):
+            limiter.acquire()
+
+        # One token up front, then one every two seconds
+        assert fake_clock.now - start == pytest.approx(6)
+
+    def test_tokens_do_not_exceed_capacity(self, fake_clock):
+        """Test idle time does not build up more than capacity tokens"""
+        limiter = TokenBucketRateLimiter(rate=1, capacity=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        fake_clock.sleep(100)
+
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+
+    def test_throttle_halves_rate_and_pauses(self, fake_clock):
+        """Test throttle decreases the rate and honours the retry delay"""
+        limiter = TokenBucketRateLimiter(rate=1, capacity=1)
+        limiter.acquire()
+        start = fake_clock.now
+
+        limiter.throttle(retry_after=10)
+
+        assert limiter.rate == 0.5
+        assert limiter.try_acquire() is False
+        limiter.acquire()
+        assert fake_clock.now - start == pytest.approx(10)
+
+    def test_throttle_does_not_go_below_minimum_rate(self, fake_clock):
+        """Test repeated throttling stops at the minimum rate"""
+        limiter = TokenBucketRateLimiter(rate=16)
+
+        for _ in range(10):
+            limiter.throttle()
+
+        assert limiter.rate == 1
+
+    def test_recover_increases_rate_up_to_maximum(self, fake_clock):
+        """Test recover adds back the rate step by step"""
+        limiter = TokenBucketRateLimiter(rate=10)
+        limiter.throttle()
+
+        limiter.recover()
+        assert limiter.rate == pytest.approx(6)
+
+        for _ in range(10):
+            limiter.recover()
+        assert limiter.rate == limiter.max_rate
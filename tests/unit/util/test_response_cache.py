@@ -0,0 +1,152 @@
+# tests/unit/util/test_response_cache.py
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from util.response_cache import HibpResponseCache
+
+BODY = json.dumps([{"Name": "Adobe"}])
+OTHER_BODY = json.dumps([{"Name": "Adobe"}, {"Name": "Wattpad"}])
+
+
+@pytest.fixture
+def parse():
+    """Parser that records how often it is called"""
+    return MagicMock(side_effect=json.loads)
+
+
+@pytest.fixture
+def cache():
+    return HibpResponseCache(max_entries=2)
+
+
+class TestHibpResponseCache:
+    def test_make_key_hashes_normalized_email(self):
+        """Test keys do not contain the address and ignore case"""
+        key = HibpResponseCache.make_key("Test@Example.com")
+
+        assert "example" not in key
+        assert key == HibpResponseCache.make_key(" test@example.com ")
+        assert key != HibpResponseCache.make_key("test@example.com", True)
+
+    def test_resolve_reports_changes(self, cache, parse):
+        """Test first and different bodies are changed, identical ones are not"""
+        key = HibpResponseCache.make_key("test@example.com")
+
+        assert cache.resolve(key, BODY, None, parse) == ([{"Name": "Adobe"}], True)
+        assert cache.resolve(key, BODY, None, parse) == ([{"Name": "Adobe"}], False)
+        assert cache.resolve(key, OTHER_BODY, None, parse)[1] is True
+
+        assert parse.call_count == 2
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2}
+
+    def test_resolve_not_modified(self, cache, parse):
+        """Test a 304 is answered from the cached body"""
+        key = HibpResponseCache.make_key("test@example.com")
+        assert cache.resolve_not_modified(key, parse) is None
+
+        cache.resolve(key, BODY, '"etag-1"', parse)
+
+        assert cache.get(key).etag == '"etag-1"'
+        assert cache.resolve_not_modified(key, parse) == [{"Name": "Adobe"}]
+        assert parse.call_count == 1
+
+    def test_lru_eviction(self, cache, parse):
+        """Test the least recently used entry is evicted"""
+        cache.resolve("a", BODY, None, parse)
+        cache.resolve("b", BODY, None, parse)
+        cache.get("a")
+        cache.resolve("c", BODY, None, parse)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_ttl_expiry(self, parse):
+        """Test expired entries are treated as missing"""
+        cache = HibpResponseCache(ttl_seconds=60)
+        with patch("util.response_cache.time.time", return_value=1000.0):
+            cache.resolve("a", BODY, None, parse)
+
+        with patch("util.response_cache.time.time", return_value=1030.0):
+            assert cache.get("a") is not None
+        with patch("util.response_cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+            assert cache.resolve("a", BODY, None, parse)[1] is True
+
+    def test_persistence(self, tmp_path, parse):
+        """Test entries survive a restart and are parsed lazily"""
+        path = str(tmp_path / "cache.sqlite3")
+        key = HibpResponseCache.make_key("test@example.com")
+        cache = HibpResponseCache(path=path)
+        cache.resolve(key, BODY, None, parse)
+        cache.commit(key)
+
+        reloaded = HibpResponseCache(path=path)
+
+        assert reloaded.resolve(key, BODY, None, parse) == ([{"Name": "Adobe"}], False)
+        assert parse.call_count == 2
+
+    def test_invalidate_email_and_clear(self, tmp_path, parse):
+        """Test invalidation removes entries from memory and disk"""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = HibpResponseCache(path=path)
+        for email in ("a@example.com", "b@example.com"):
+            cache.resolve(HibpResponseCache.make_key(email), BODY, None, parse)
+            cache.commit_email(email)
+
+        cache.invalidate_email("a@example.com")
+        assert HibpResponseCache(path=path).stats()["entries"] == 1
+
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+        assert HibpResponseCache(path=path).stats()["entries"] == 0
+
+    def test_changes_are_written_once_committed(self, tmp_path, parse):
+        """Test a changed response only reaches the file when committed"""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = HibpResponseCache(path=path)
+        key = HibpResponseCache.make_key("test@example.com")
+
+        cache.resolve(key, BODY, None, parse)
+        # A process dying here leaves nothing behind
+        assert HibpResponseCache(path=path).get(key) is None
+
+        cache.commit_email("test@example.com")
+        assert HibpResponseCache(path=path).get(key).body == BODY
+
+    def test_discard_restores_the_committed_response(self, tmp_path, parse):
+        """Test the next lookup is changed again after a failed save"""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = HibpResponseCache(path=path)
+        key = HibpResponseCache.make_key("test@example.com")
+        cache.resolve(key, BODY, None, parse)
+        cache.commit(key)
+
+        assert cache.resolve(key, OTHER_BODY, None, parse)[1] is True
+        cache.discard_email("test@example.com")
+
+        assert cache.get(key).body == BODY
+        assert cache.resolve(key, OTHER_BODY, None, parse)[1] is True
+        assert HibpResponseCache(path=path).get(key).body == BODY
+
+        cache.discard(key)
+        cache.discard(HibpResponseCache.make_key("new@example.com"))
+        assert cache.get(key).body == BODY
+
+    def test_invalidations_reach_other_processes(self, tmp_path, parse):
+        """Test entries invalidated by one process are dropped by the others"""
+        path = str(tmp_path / "cache.sqlite3")
+        web, sweep = HibpResponseCache(path=path), HibpResponseCache(path=path)
+        key = HibpResponseCache.make_key("a@example.com")
+        sweep.resolve(key, BODY, None, parse)
+        sweep.commit(key)
+        assert sweep.resolve(key, BODY, None, parse)[1] is False
+
+        web.invalidate_email("a@example.com")
+        assert sweep.resolve(key, BODY, None, parse)[1] is True
+        sweep.commit(key)
+
+        web.clear()
+        assert sweep.get(key) is None
+        assert sweep.stats()["entries"] == 0
@@ -0,0 +1,194 @@
+import asyncio
+import os
+from typing import Any, Callable, Optional, List, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+from util.hibp_client import (
+    BreachedAccountLookup,
+    HibpClient,
+    get_rate_limited_delay,
+    parse_breached_account_names,
+    parse_breached_accounts,
+)
+from util.logger import get_logger
+from util.rate_limiter import TokenBucketRateLimiter
+from util.response_cache import HibpResponseCache
+
+load_dotenv()
+
+
+class AsyncHibpClient:
+    """
+    asyncio counterpart of HibpClient with the same lookup methods.
+
+    The underlying httpx connection pool is bound to the running event loop,
+    so the client is used as an async context manager instead of a singleton.
+    Responses are cached in the response cache of HibpClient by default:
+
+        async with AsyncHibpClient(rate_limiter=limiter) as client:
+            breaches = await client.get_breached_accounts(email)
+    """
+
+    _API_VERSION: str = "v3"
+    _logger = get_logger(__name__)
+
+    def __init__(
+        self,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        response_cache: Optional[HibpResponseCache] = None,
+    ) -> None:
+        self._BASE_URL: str = f"https://haveibeenpwned.com/api/{self._API_VERSION}"
+        self._rate_limiter: Optional[TokenBucketRateLimiter] = rate_limiter
+        self._transport: Optional[httpx.AsyncBaseTransport] = transport
+        self._response_cache: HibpResponseCache = (
+            response_cache or HibpClient().response_cache
+        )
+        self._max_retries: int = int(os.getenv("HIBP_MAX_RETRIES", 5))
+        self._pool_size: int = int(os.getenv("HIBP_POOL_SIZE", 10))
+        self._connect_timeout: float = float(os.getenv("HIBP_CONNECT_TIMEOUT", 5))
+        self._read_timeout: float = float(os.getenv("HIBP_READ_TIMEOUT", 30))
+        self._use_http2: bool = os.getenv("HIBP_HTTP2", "False").lower() == "true"
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsyncHibpClient":
+        client_kwargs: dict = {
+            "limits": httpx.Limits(
+                max_connections=self._pool_size,
+                max_keepalive_connections=self._pool_size,
+            ),
+            "timeout": httpx.Timeout(self._read_timeout, connect=self._connect_timeout),
+            "transport": self._transport,
+        }
+        try:
+            self._client = httpx.AsyncClient(http2=self._use_http2, **client_kwargs)
+        except ImportError:
+            self._logger.warning(
+                "HTTP/2 requested but h2 is not installed, falling back to HTTP/1.1"
+            )
+            self._client = httpx.AsyncClient(**client_kwargs)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def rate_limiter(self) -> Optional[TokenBucketRateLimiter]:
+        return self._rate_limiter
+
+    async def get_breached_accounts(
+        self,
+        email: str,
+        truncate_response: bool = False,
+    ) -> Optional[List[HibpBreachedSiteModel]] | None:
+        """
+        Retrieves breached account information for a given email address.
+        :param email: The email address to check for breaches.
+        :param truncate_response: If True, the response will be truncated to reduce data size.
+        :return: A list of HibpBreachedSiteModel objects or None if no breaches found.
+        """
+        breached_accounts, _ = await self.lookup_breached_accounts(
+            email, truncate_response
+        )
+        return breached_accounts
+
+    async def lookup_breached_accounts(
+        self,
+        email: str,
+        truncate_response: bool = False,
+    ) -> Tuple[Optional[List[HibpBreachedSiteModel]], bool]:
+        """
+        Same as HibpClient.lookup_breached_accounts.
+        :return: A list of HibpBreachedSiteModel objects or None if no breaches found,
+                 and False if the response is identical to the cached one.
+        """
+        return await self._lookup(email, truncate_response, parse_breached_accounts)
+
+    async def lookup_breached_account_names(
+        self, email: str
+    ) -> Tuple[Optional[List[str]], bool]:
+        """
+        Same as HibpClient.lookup_breached_account_names.
+        :return: A list of breach names or None if no breaches found,
+                 and False if the response is identical to the cached one.
+        """
+        return await self._lookup(email, True, parse_breached_account_names)
+
+    async def _lookup(
+        self,
+        email: str,
+        truncate_response: bool,
+        parse: Callable[[str], List[Any]],
+    ) -> Tuple[Optional[List[Any]], bool]:
+        if not self._client:
+            raise RuntimeError(
+                "AsyncHibpClient must be used as an async context manager"
+            )
+
+        # The response cache may read or write its SQLite file, keep that
+        # and the parsing of the bodies off the event loop
+        lookup: BreachedAccountLookup = await asyncio.to_thread(
+            BreachedAccountLookup,
+            self._BASE_URL,
+            email,
+            truncate_response,
+            parse,
+            self._response_cache,
+        )
+        attempts: int = 0
+        try:
+            while True:
+                if self._rate_limiter:
+                    await self._rate_limiter.acquire_async()
+
+                self._logger.debug(f"Sending request to: {lookup.url}")
+                response: httpx.Response = await self._client.get(
+                    lookup.url, headers=lookup.headers
+                )
+                self._logger.debug(f"Response: {response}")
+                attempts += 1
+
+                if response.status_code == 429:
+                    await self._handle_rate_limited(response, attempts)
+                    continue
+
+                if self._rate_limiter:
+                    self._rate_limiter.recover()
+
+                result = await asyncio.to_thread(lookup.handle, response)
+                if result is not None:
+                    return result
+
+        except httpx.HTTPError as e:
+            self._logger.error(f"Request failed: {str(e)}")
+            raise
+
+    async def _handle_rate_limited(
+        self, response: httpx.Response, attempts: int
+    ) -> None:
+        """Waits after a 429 until the request can be sent again."""
+        delay: float = get_rate_limited_delay(
+            response, attempts, self._max_retries, self._rate_limiter
+        )
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def get_mock_breached_accounts(
+        self,
+        email: str,
+        truncate_response: bool = False,
+    ) -> Optional[List[HibpBreachedSiteModel]] | None:
+        """
+        Returns the same mock breach data as HibpClient.get_mock_breached_accounts.
+        """
+        return HibpClient().get_mock_breached_accounts(
+            email=email, truncate_response=truncate_response
+        )
@@ -7,6 +7,8 @@ from flask import Flask
 
 from decorators.singleton import singleton
 from util.logger import get_logger
+from util.email_templates import EmailTemplates
+from util.mail_outbox import MailOutbox
 from model.hibp_breached_site_model import HibpBreachedSiteModel
 
 load_dotenv()
@@ -16,6 +18,8 @@ load_dotenv()
 class EmailSender:
     _logger = get_logger(__name__)
     _mail: Optional[Mail] = None
+    _outbox: Optional[MailOutbox] = None
+    _templates: Optional[EmailTemplates] = None
 
     def __init__(self) -> None:
         self._logger.debug("Initializing EmailSender")
@@ -30,8 +34,49 @@ class EmailSender:
             MAIL_DEFAULT_SENDER=os.getenv("MAIL_DEFAULT_SENDER"),
         )
         self._mail = Mail(app)
+        self._templates = EmailTemplates()
+
+        self.close()
+        if os.getenv("MAIL_OUTBOX_ENABLED", "True").lower() == "true":
+            self._outbox = MailOutbox(
+                app,
+                self._mail,
+                spool_path=os.getenv(
+                    "MAIL_SPOOL_PATH",
+                    os.path.join(
+                        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "db",
+                        "mail_spool",
+                    ),
+                ),
+                max_attempts=int(os.getenv("MAIL_MAX_ATTEMPTS", 5)),
+                backoff_seconds=float(os.getenv("MAIL_RETRY_BACKOFF_SECONDS", 5)),
+                max_backoff_seconds=float(
+                    os.getenv("MAIL_RETRY_MAX_BACKOFF_SECONDS", 300)
+                ),
+                idle_timeout=float(os.getenv("MAIL_IDLE_TIMEOUT_SECONDS", 30)),
+            )
+            self._outbox.start()
         self._logger.info("Email sender initialized with app context")
 
+    def close(self) -> None:
+        """Send the queued messages and stop the outbox, for processes that exit."""
+        if self._outbox is not None:
+            self._outbox.stop()
+            self._outbox = None
+
+    def _send(self, msg: Message) -> bool:
+        """
+        Hand a message to the outbox, or send it right away when the outbox
+        is disabled.
+
+        :return: True if the message was queued or sent, False otherwise
+        """
+        if self._outbox is not None:
+            return self._outbox.enqueue(msg)
+        self._mail.send(msg)
+        return True
+
     def send_breach_notification(
         self,
         email_address: str,
@@ -52,19 +97,16 @@ class EmailSender:
         try:
             subject: str = f"ALERT: New Security Breaches Detected"
 
-            body: str = f"The following new breaches have been detected for {email_address}:\n\n"
-            for site in breached_sites:
-                body += f"- {site.title} ({site.breach_date}): {site.domain}\n"
-                body += f"  Description: {site.description}\n"
-                body += f"  Data compromised: {site.data_classes}\n\n"
-
-            body += "\nPlease consider changing your passwords for these services."
+            body, html = self._templates.render_breach_alert(
+                {email_address: breached_sites}
+            )
 
             msg: Message = Message(
-                subject=subject, recipients=[recipient_email], body=body
+                subject=subject, recipients=[recipient_email], body=body, html=html
             )
 
-            self._mail.send(msg)
+            if not self._send(msg):
+                return False
             self._logger.info(
                 f"Breach notification sent to {recipient_email} for {email_address}"
             )
@@ -75,3 +117,48 @@ class EmailSender:
                 f"Failed to send breach notification to {recipient_email} for {email_address}: {str(e)}"
             )
             return False
+
+    def send_breach_digest(
+        self,
+        recipient_email: str,
+        breached_sites_by_email: Dict[str, List[HibpBreachedSiteModel]],
+    ) -> bool:
+        """
+        Send one email notification about the new breaches of several addresses
+
+        :param recipient_email: Email address to send notification to
+        :param breached_sites_by_email: New breaches by breached email address
+        :return: True if email sent successfully, False otherwise
+        """
+        if not self._mail:
+            self._logger.error("Mail not initialized. Call init_app first.")
+            return False
+
+        try:
+            breach_count: int = sum(
+                len(sites) for sites in breached_sites_by_email.values()
+            )
+            subject: str = (
+                f"ALERT: {breach_count} New Security Breaches Detected for "
+                f"{len(breached_sites_by_email)} Email Addresses"
+            )
+
+            body, html = self._templates.render_breach_alert(breached_sites_by_email)
+
+            msg: Message = Message(
+                subject=subject, recipients=[recipient_email], body=body, html=html
+            )
+
+            if not self._send(msg):
+                return False
+            self._logger.info(
+                f"Breach digest sent to {recipient_email} for "
+                f"{len(breached_sites_by_email)} email addresses"
+            )
+            return True
+
+        except Exception as e:
+            self._logger.error(
+                f"Failed to send breach digest to {recipient_email}: {str(e)}"
+            )
+            return False
@@ -0,0 +1,96 @@
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from markupsafe import Markup
+
+from util.html_sanitizer import sanitize_html
+from util.logger import get_logger
+from model.hibp_breached_site_model import HibpBreachedSiteModel
+
+
+class BreachDescription(NamedTuple):
+    # HIBP description the rendering was made from
+    source: str
+    text: str
+    html: Markup
+
+
+class BreachView(NamedTuple):
+    title: str
+    domain: str
+    breach_date: str
+    data_classes: str
+    description: BreachDescription
+
+
+class EmailTemplates:
+    """
+    Text and HTML templates of the breach notification mails.
+
+    Every template under templates/email is compiled once when the instance
+    is created, so sending only renders. Breach descriptions are sanitized
+    once per breach name and shared by every mail that mentions the breach.
+    """
+
+    _logger = get_logger(__name__)
+    TEMPLATE_PATH: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "templates",
+        "email",
+    )
+
+    def __init__(self, template_path: Optional[str] = None) -> None:
+        self._environment = Environment(
+            loader=FileSystemLoader(template_path or self.TEMPLATE_PATH),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        self._templates: Dict[str, Template] = {
+            name: self._environment.get_template(name)
+            for name in self._environment.list_templates()
+        }
+        self._descriptions: Dict[str, BreachDescription] = {}
+        self._logger.info(f"Compiled {len(self._templates)} email templates")
+
+    def render_breach_alert(
+        self, breached_sites_by_email: Dict[str, List[HibpBreachedSiteModel]]
+    ) -> Tuple[str, str]:
+        """
+        Render one breach alert for any number of breached addresses.
+
+        :param breached_sites_by_email: New breaches by breached email address
+        :return: The text and the HTML body
+        """
+        context = {
+            "breaches_by_email": [
+                (email_address, [self._to_view(site) for site in sites])
+                for email_address, sites in breached_sites_by_email.items()
+            ]
+        }
+        return (
+            self._templates["breach_alert.txt"].render(context),
+            self._templates["breach_alert.html"].render(context),
+        )
+
+    def _to_view(self, site: HibpBreachedSiteModel) -> BreachView:
+        return BreachView(
+            title=site.title,
+            domain=site.domain,
+            breach_date=site.breach_date,
+            data_classes=", ".join(site.data_classes),
+            description=self._describe(site.name, site.description),
+        )
+
+    def _describe(self, name: str, description: str) -> BreachDescription:
+        cached: Optional[BreachDescription] = self._descriptions.get(name)
+        if cached is not None and cached.source == description:
+            return cached
+
+        # Racing threads sanitize the same description twice at worst
+        html, text = sanitize_html(description)
+        cached = BreachDescription(description, text, Markup(html))
+        self._descriptions[name] = cached
+        return cached
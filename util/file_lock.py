@@ -0,0 +1,40 @@
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from util.logger import get_logger
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, held between processes on the same host for
+    the duration of a with block. Without a path, or on platforms without
+    fcntl, it does not lock at all.
+    """
+
+    _logger = get_logger(__name__)
+
+    def __init__(self, path: Optional[str]) -> None:
+        self._path: Optional[str] = path
+        self._file = None
+
+    def __enter__(self) -> "FileLock":
+        if not self._path:
+            return self
+        if fcntl is None:
+            self._logger.warning(f"Cannot lock {self._path} on this platform")
+            return self
+        self._file = open(self._path, "a")
+        # Blocks until the process holding the lock releases it or exits
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._file is None:
+            return
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import threading
+from typing import Optional, Tuple
+
+
+class GenerationCounter:
+    """
+    Counter shared between worker processes through a small file.
+
+    bump() atomically replaces the file, so every bump gives it a new inode
+    and modification time. current() only stats the file, which is much
+    cheaper than a query, and callers compare generations to tell whether
+    another process changed the data they cached. Without a path the
+    counter is only shared within this process.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._path: Optional[str] = path
+        self._lock = threading.Lock()
+        self._local_generation: int = 0
+
+    def current(self) -> Tuple[int, ...]:
+        if not self._path:
+            return (self._local_generation,)
+        try:
+            stat = os.stat(self._path)
+            return stat.st_ino, stat.st_mtime_ns
+        except FileNotFoundError:
+            return (0,)
+
+    def bump(self) -> None:
+        with self._lock:
+            self._local_generation += 1
+            if not self._path:
+                return
+
+            directory: str = os.path.dirname(os.path.abspath(self._path))
+            file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(file_descriptor, "w") as temp_file:
+                temp_file.write(str(self._local_generation))
+            os.replace(temp_path, self._path)
@@ -1,8 +1,13 @@
+import json
 import os
-from typing import Optional, List, Set
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, List, Set, Tuple
 
 import requests
-from requests import Response
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 from decorators.singleton import singleton
@@ -10,20 +15,185 @@ from exceptions.no_hibp_key_found_exception import NoHibpKeyFoundException
 from exceptions.hibp_could_not_be_verified_exception import (
     HibpCouldNotBeVerifiedException,
 )
+from exceptions.hibp_rate_limit_exceeded_exception import (
+    HibpRateLimitExceededException,
+)
 from model.hibp_breached_site_model import HibpBreachedSiteModel
 from util.logger import get_logger
+from util.rate_limiter import TokenBucketRateLimiter
+from util.response_cache import HibpResponseCache
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 transport is optional
+    httpx = None
 
 load_dotenv()
 
+logger = get_logger(__name__)
+DEFAULT_RETRY_AFTER: float = 2.0
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """
+    Parses a Retry-After header given either in seconds or as an HTTP date.
+    :param value: The raw header value.
+    :return: Seconds to wait before retrying.
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at: datetime = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        logger.warning(f"Could not parse Retry-After header: {value}")
+        return DEFAULT_RETRY_AFTER
+
+
+def parse_breached_accounts(body: str) -> List[HibpBreachedSiteModel]:
+    """Converts a breachedaccount response body to HibpBreachedSiteModel objects"""
+    return [HibpBreachedSiteModel.model_validate(item) for item in json.loads(body)]
+
+
+def parse_breached_account_names(body: str) -> List[str]:
+    """Reads the breach names of a truncated breachedaccount response body"""
+    return [item["Name"] for item in json.loads(body)]
+
+
+def get_rate_limited_delay(
+    response: Any,
+    attempts: int,
+    max_retries: int,
+    rate_limiter: Optional[TokenBucketRateLimiter],
+) -> float:
+    """
+    Backs off after a 429 so the request can be sent again.
+    With a rate limiter attached, every request sharing it is slowed down.
+    :param response: The 429 response, from requests or httpx.
+    :param attempts: Number of attempts made so far for this request.
+    :return: Seconds the caller has to wait before sending the request
+        again, 0 if the rate limiter paces the retry.
+    """
+    retry_after: float = parse_retry_after(response.headers.get("Retry-After"))
+    if attempts > max_retries:
+        logger.error(f"Still rate limited after {attempts} attempts")
+        raise HibpRateLimitExceededException(attempts)
+
+    logger.warning(
+        f"Rate limited by the API, retrying in {retry_after} seconds "
+        f"(attempt {attempts}/{max_retries})"
+    )
+    if rate_limiter:
+        rate_limiter.throttle(retry_after)
+        return 0.0
+    return retry_after
+
+
+class BreachedAccountLookup:
+    """
+    One breachedaccount request and the handling of its responses, shared
+    by HibpClient and AsyncHibpClient, which only send it and wait between
+    attempts. A cached ETag is sent along, so an unchanged response comes
+    back as a 304 and is served from the response cache.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        truncate_response: bool,
+        parse: Callable[[str], List[Any]],
+        response_cache: HibpResponseCache,
+    ) -> None:
+        hibp_key: str = os.getenv("HIBP_API_KEY")
+        if not hibp_key:
+            logger.error("No HIBP API key found in environment variables")
+            raise NoHibpKeyFoundException()
+
+        self._email: str = email
+        self._parse: Callable[[str], List[Any]] = parse
+        self._response_cache: HibpResponseCache = response_cache
+        self._cache_key: str = HibpResponseCache.make_key(email, truncate_response)
+        self.url: str = (
+            f"{base_url}/breachedaccount/{email}"
+            f"?truncateResponse={str(truncate_response).lower()}"
+        )
+        self.headers: Dict[str, str] = {"hibp-api-key": hibp_key}
+        cached_response = response_cache.get(self._cache_key)
+        if cached_response and cached_response.etag:
+            self.headers["If-None-Match"] = cached_response.etag
+
+    def handle(self, response: Any) -> Optional[Tuple[Optional[List[Any]], bool]]:
+        """
+        Handles a response other than a 429, from requests or httpx.
+        :return: The parsed breaches, None if no breaches were found, and
+            False if they are identical to the cached ones. None instead if
+            the request has to be sent again.
+        """
+        if response.status_code == 200:
+            return self._response_cache.resolve(
+                self._cache_key,
+                response.text,
+                response.headers.get("ETag"),
+                self._parse,
+            )
+        elif response.status_code == 304:
+            breached_accounts = self._response_cache.resolve_not_modified(
+                self._cache_key, self._parse
+            )
+            if breached_accounts is not None:
+                return breached_accounts, False
+            # The entry expired meanwhile, ask for the full body again
+            self.headers.pop("If-None-Match", None)
+            return None
+        elif response.status_code == 404:
+            logger.info(f"No breaches found for email: {self._email}")
+            return None, True
+        elif response.status_code == 401:
+            logger.error("API key verification failed")
+            raise HibpCouldNotBeVerifiedException()
+        else:
+            logger.warning(f"Unexpected status code: {response.status_code}")
+            response.raise_for_status()
+            return None, True
+
 
 @singleton
 class HibpClient:
     _API_VERSION: str = "v3"
     _BASE_URL: str = f"https://haveibeenpwned.com/api/{_API_VERSION}"
     _logger = get_logger(__name__)
+    _rate_limiter: Optional[TokenBucketRateLimiter] = None
+    _REQUEST_EXCEPTIONS: tuple = (requests.exceptions.RequestException,) + (
+        (httpx.HTTPError,) if httpx is not None else ()
+    )
 
     def __init__(self):
         self._BASE_URL = f"https://haveibeenpwned.com/api/{self._API_VERSION}"
+        self._max_retries: int = int(os.getenv("HIBP_MAX_RETRIES", 5))
+        self._pool_size: int = int(os.getenv("HIBP_POOL_SIZE", 10))
+        self._connect_timeout: float = float(os.getenv("HIBP_CONNECT_TIMEOUT", 5))
+        self._read_timeout: float = float(os.getenv("HIBP_READ_TIMEOUT", 30))
+        self._use_http2: bool = os.getenv("HIBP_HTTP2", "False").lower() == "true"
+        self._session = self._create_session()
+        self._response_cache = HibpResponseCache(
+            path=os.getenv(
+                "HIBP_CACHE_PATH",
+                os.path.join(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    "db",
+                    "hibp_cache.sqlite3",
+                ),
+            ),
+            max_entries=int(os.getenv("HIBP_CACHE_MAX_ENTRIES", 10000)),
+            ttl_seconds=float(os.getenv("HIBP_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+        )
         self._logger.debug(f"Initialized with API version: {self._API_VERSION}")
 
     @property
@@ -36,6 +206,71 @@ class HibpClient:
         self._BASE_URL = f"https://haveibeenpwned.com/api/{self._API_VERSION}"
         self._logger.info(f"API version changed to: {value}")
 
+    def _create_session(self):
+        """
+        Creates the pooled session every request goes through, so connections
+        to the API are kept alive and reused across lookups.
+        """
+        if self._use_http2:
+            if httpx is not None:
+                try:
+                    session = httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(
+                            max_connections=self._pool_size,
+                            max_keepalive_connections=self._pool_size,
+                        ),
+                        timeout=httpx.Timeout(
+                            self._read_timeout, connect=self._connect_timeout
+                        ),
+                    )
+                    self._logger.info("Using httpx HTTP/2 transport")
+                    return session
+                except ImportError:
+                    pass
+            self._logger.warning(
+                "HTTP/2 requested but httpx[http2] is not installed, falling back to requests"
+            )
+
+        session: Session = requests.Session()
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self._pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _send(self, url: str, headers: dict):
+        if httpx is not None and isinstance(self._session, httpx.Client):
+            return self._session.get(url, headers=headers)
+        return self._session.get(
+            url, headers=headers, timeout=(self._connect_timeout, self._read_timeout)
+        )
+
+    def close(self) -> None:
+        """Closes the pooled connections."""
+        self._session.close()
+
+    @property
+    def response_cache(self) -> HibpResponseCache:
+        return self._response_cache
+
+    @property
+    def rate_limiter(self) -> Optional[TokenBucketRateLimiter]:
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, value: Optional[TokenBucketRateLimiter]) -> None:
+        """
+        Every request to the API takes a token from this limiter before it is sent.
+        Set it to None to send requests without pacing.
+        """
+        self._rate_limiter = value
+        if value:
+            self._logger.info(
+                f"Rate limiter set to {value.rate * 60:.1f} requests/minute"
+            )
+
     def get_breached_accounts(
         self,
         email: str,
@@ -47,39 +282,96 @@ class HibpClient:
         :param truncate_response: If True, the response will be truncated to reduce data size.
         :return: A list of HibpBreachedSiteModel objects or None if no breaches found.
         """
-        hibp_key: str = os.getenv("HIBP_API_KEY")
-        if not hibp_key:
-            self._logger.error("No HIBP API key found in environment variables")
-            raise NoHibpKeyFoundException()
+        breached_accounts, _ = self.lookup_breached_accounts(email, truncate_response)
+        return breached_accounts
+
+    def lookup_breached_accounts(
+        self,
+        email: str,
+        truncate_response: bool = False,
+    ) -> Tuple[Optional[List[HibpBreachedSiteModel]], bool]:
+        """
+        Retrieves breached account information and whether it changed since the last lookup.
+        Unchanged responses are served from the response cache without being validated again.
+        :param email: The email address to check for breaches.
+        :param truncate_response: If True, the response will be truncated to reduce data size.
+        :return: A list of HibpBreachedSiteModel objects or None if no breaches found,
+                 and False if the response is identical to the cached one.
+        """
+        return self._lookup(email, truncate_response, parse_breached_accounts)
+
+    def lookup_breached_account_names(
+        self, email: str
+    ) -> Tuple[Optional[List[str]], bool]:
+        """
+        Retrieves only the names of the breaches an email appears in (truncateResponse=true).
+        Details are meant to be filled in from the local breach catalog.
+        :param email: The email address to check for breaches.
+        :return: A list of breach names or None if no breaches found,
+                 and False if the response is identical to the cached one.
+        """
+        return self._lookup(email, True, parse_breached_account_names)
+
+    def _lookup(
+        self,
+        email: str,
+        truncate_response: bool,
+        parse: Callable[[str], List[Any]],
+    ) -> Tuple[Optional[List[Any]], bool]:
+        lookup = BreachedAccountLookup(
+            self._BASE_URL, email, truncate_response, parse, self._response_cache
+        )
+        attempts: int = 0
+        try:
+            while True:
+                if self._rate_limiter:
+                    self._rate_limiter.acquire()
+
+                self._logger.debug(f"Sending request to: {lookup.url}")
+                response: Response = self._send(lookup.url, lookup.headers)
+                self._logger.debug(f"Response: {response}")
+                attempts += 1
+
+                if response.status_code == 429:
+                    self._handle_rate_limited(response, attempts)
+                    continue
 
-        request_url: str = f"{self._BASE_URL}/breachedaccount/{email}?truncateResponse={str(truncate_response).lower()}"
-        headers: dict = {"hibp-api-key": hibp_key}
+                if self._rate_limiter:
+                    self._rate_limiter.recover()
 
+                result = lookup.handle(response)
+                if result is not None:
+                    return result
+
+        except self._REQUEST_EXCEPTIONS as e:
+            self._logger.error(f"Request failed: {str(e)}")
+            raise
+
+    def get_all_breaches(self) -> List[Dict[str, Any]]:
+        """
+        Retrieves the whole breach catalog from the /breaches endpoint.
+        The items are returned as raw dictionaries, so callers only validate the ones they need.
+        :return: A list of breach dictionaries as sent by the API.
+        """
+        request_url: str = f"{self._BASE_URL}/breaches"
         try:
             self._logger.debug(f"Sending request to: {request_url}")
-            response: Response = requests.get(request_url, headers=headers)
-            self._logger.debug(f"Response: {response}")
-
-            if response.status_code == 200:
-                # Convert the JSON response to a list of HibpBreachedSiteModel objects
-                return [
-                    HibpBreachedSiteModel.model_validate(item)
-                    for item in response.json()
-                ]
-            elif response.status_code == 404:
-                self._logger.info(f"No breaches found for email: {email}")
-                return None
-            elif response.status_code == 401:
-                self._logger.error("API key verification failed")
-                raise HibpCouldNotBeVerifiedException()
-            else:
-                self._logger.warning(f"Unexpected status code: {response.status_code}")
-                response.raise_for_status()
-
-        except requests.exceptions.RequestException as e:
+            response: Response = self._send(request_url, {})
+            response.raise_for_status()
+            return response.json()
+
+        except self._REQUEST_EXCEPTIONS as e:
             self._logger.error(f"Request failed: {str(e)}")
             raise
 
+    def _handle_rate_limited(self, response: Response, attempts: int) -> None:
+        """Waits after a 429 until the request can be sent again."""
+        delay: float = get_rate_limited_delay(
+            response, attempts, self._max_retries, self._rate_limiter
+        )
+        if delay:
+            time.sleep(delay)
+
     def get_mock_breached_accounts(
         self,
         email: str,
@@ -0,0 +1,93 @@
+from html import escape
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class HtmlSanitizer(HTMLParser):
+    """
+    Allowlist sanitizer for the HTML in HIBP breach descriptions.
+
+    Allowed tags are kept without their attributes, except the href of
+    links with a http, https or mailto scheme. Other tags are dropped and
+    their text is kept, except the content of script and style elements.
+    Unclosed tags are closed at the end. The plain text
+    of the input is collected in the same pass.
+    """
+
+    ALLOWED_TAGS = frozenset(
+        ("a", "b", "br", "em", "i", "li", "ol", "p", "strong", "ul")
+    )
+    ALLOWED_SCHEMES = frozenset(("http", "https", "mailto"))
+    DROPPED_CONTENT_TAGS = frozenset(("script", "style"))
+    # Tags that separate words in the plain text
+    BREAKING_TAGS = frozenset(("br", "li", "p"))
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._html: List[str] = []
+        self._text: List[str] = []
+        self._open_tags: List[str] = []
+        self._dropping: int = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in self.DROPPED_CONTENT_TAGS:
+            self._dropping += 1
+            return
+        if tag in self.BREAKING_TAGS:
+            self._text.append(" ")
+        if tag not in self.ALLOWED_TAGS:
+            return
+        if tag == "br":
+            self._html.append("<br>")
+            return
+
+        if tag == "a":
+            href: Optional[str] = dict(attrs).get("href")
+            href = href.strip() if href else ""
+            if urlparse(href).scheme.lower() in self.ALLOWED_SCHEMES:
+                self._html.append(
+                    f'<a href="{escape(href)}" rel="noopener noreferrer">'
+                )
+            else:
+                self._html.append("<a>")
+        else:
+            self._html.append(f"<{tag}>")
+        self._open_tags.append(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.DROPPED_CONTENT_TAGS:
+            self._dropping = max(self._dropping - 1, 0)
+            return
+        if tag in self.BREAKING_TAGS:
+            self._text.append(" ")
+        if tag not in self._open_tags:
+            return
+        while self._open_tags:
+            open_tag: str = self._open_tags.pop()
+            self._html.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if self._dropping:
+            return
+        self._html.append(escape(data))
+        self._text.append(data)
+
+    def result(self) -> Tuple[str, str]:
+        """:return: The sanitized HTML and the plain text fed so far."""
+        self.close()
+        closing: List[str] = [f"</{tag}>" for tag in reversed(self._open_tags)]
+        return "".join(self._html + closing), " ".join("".join(self._text).split())
+
+
+def sanitize_html(source: str) -> Tuple[str, str]:
+    """
+    Sanitize an HTML fragment.
+    :param source: Untrusted HTML, e.g. a HIBP breach description.
+    :return: Safe HTML and the whitespace collapsed plain text of source.
+    """
+    sanitizer = HtmlSanitizer()
+    sanitizer.feed(source)
+    return sanitizer.result()
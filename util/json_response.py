@@ -0,0 +1,114 @@
+import dataclasses
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+from model.response_model import ResponseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+_ORJSON_OPTIONS: int = orjson.OPT_NON_STR_KEYS if orjson else 0
+_COMPACT_SEPARATORS = (",", ":")
+
+
+def _default(obj: Any) -> Any:
+    """Serializes the types neither encoder handles natively"""
+    if isinstance(obj, BaseModel):
+        # Shallow, nested models come back through this hook
+        return dict(obj)
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serializes obj with orjson, falling back to the stdlib encoder.
+    Pydantic models, dataclasses, dates and objects with a to_json method are supported.
+    """
+    if orjson:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=_COMPACT_SEPARATORS).encode()
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps, used by jsonify and flask.json"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serializes obj with orjson. The options Flask passes are mapped to
+        orjson's: compact separators are its only output, indent=2 is
+        OPT_INDENT_2 and sort_keys is OPT_SORT_KEYS. ensure_ascii is
+        ignored, orjson always writes UTF-8. Other options, e.g. another
+        indent or a custom default, fall back to the stdlib encoder.
+        """
+        sort_keys: bool = kwargs.pop("sort_keys", self.sort_keys)
+        ensure_ascii: bool = kwargs.pop("ensure_ascii", self.ensure_ascii)
+        indent: Optional[int] = kwargs.pop("indent", None)
+        separators = kwargs.pop("separators", None)
+        if (
+            orjson
+            and not kwargs
+            and indent in (None, 2)
+            and separators in (None, _COMPACT_SEPARATORS)
+        ):
+            option: int = _ORJSON_OPTIONS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=_default, option=option).decode()
+
+        kwargs.setdefault("default", _default)
+        return json.dumps(
+            obj,
+            sort_keys=sort_keys,
+            ensure_ascii=ensure_ascii,
+            indent=indent,
+            separators=separators,
+            **kwargs,
+        )
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+def json_response(
+    success: bool,
+    message: str,
+    data: Optional[Any] = None,
+    error: Optional[str] = None,
+    status: int = 200,
+) -> Response:
+    """
+    Builds a ResponseModel response without a validation pass or dict copy.
+    :return: An application/json Response.
+    """
+    body = ResponseModel.model_construct(
+        success=success, message=message, data=data, error=error
+    )
+    return Response(response=dumps(body), status=status, mimetype="application/json")
+
+
+def service_response(result: Dict[str, Any], status: int = 200) -> Response:
+    """Builds a json_response from the result dict of a service method."""
+    return json_response(
+        success=result.get("success"),
+        message=result.get("message"),
+        data=result.get("data"),
+        error=result.get("error"),
+        status=status,
+    )
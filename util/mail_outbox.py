@@ -0,0 +1,290 @@
+import glob
+import heapq
+import itertools
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import Flask
+from flask_mail import Connection, Mail, Message
+
+from util.logger import get_logger
+from util.process import is_process_running
+
+
+class OutboxItem(NamedTuple):
+    message: Dict[str, Any]
+    # Spool file of the message, None when the outbox has no spool directory
+    path: Optional[str] = None
+    # Spool file once this process claimed it for sending
+    claimed_path: Optional[str] = None
+
+
+class MailOutbox:
+    """
+    Background sender for EmailSender.
+
+    Messages are written to a spool directory before they are queued, so a
+    restart does not lose them. A single worker thread sends them over one
+    SMTP connection that is kept open while there is work and closed once
+    the queue has been idle for idle_timeout seconds. A failed send closes
+    the connection and the message is scheduled for another attempt after
+    an exponential backoff, while the worker goes on with the other
+    messages. Messages that still fail after max_attempts are renamed to
+    *.failed and left in the spool. Without a spool path messages are only
+    kept in memory.
+
+    Spool files are claimed by renaming them before they are sent, so
+    several processes can share a spool directory without sending a message
+    twice. Messages spooled by a previous process are sent on start.
+    """
+
+    _logger = get_logger(__name__)
+    _STOP = object()
+
+    def __init__(
+        self,
+        app: Flask,
+        mail: Mail,
+        spool_path: Optional[str] = None,
+        max_attempts: int = 5,
+        backoff_seconds: float = 5,
+        max_backoff_seconds: float = 300,
+        idle_timeout: float = 30,
+    ) -> None:
+        self._app: Flask = app
+        self._mail: Mail = mail
+        self._spool_path: Optional[str] = spool_path
+        self._max_attempts: int = max_attempts
+        self._backoff_seconds: float = backoff_seconds
+        self._max_backoff_seconds: float = max_backoff_seconds
+        self._idle_timeout: float = idle_timeout
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        # (next_attempt_at, sequence, item) of failed messages, by time.monotonic()
+        self._retries: List[Tuple[float, int, OutboxItem]] = []
+        self._retry_sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[Connection] = None
+        self._connection_count: int = 0
+
+        if self._spool_path:
+            os.makedirs(self._spool_path, exist_ok=True)
+
+    @property
+    def connection_count(self) -> int:
+        """SMTP connections opened since start, for logging and tests"""
+        return self._connection_count
+
+    def start(self) -> None:
+        """Queue spooled messages of previous processes and start the worker."""
+        self._recover_spool()
+        self._thread = threading.Thread(
+            target=self._run, name="mail_outbox", daemon=True
+        )
+        self._thread.start()
+        self._logger.info("Mail outbox started")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Send what is queued, then stop the worker. Messages waiting for a
+        retry are left in the spool for the next start.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def join(self) -> None:
+        """Block until every queued message was sent or given up on."""
+        self._queue.join()
+
+    def enqueue(self, message: Message) -> bool:
+        """
+        Spool a message and queue it for the worker.
+        :return: True once the message is stored, False if spooling failed.
+        """
+        data: Dict[str, Any] = {
+            "subject": message.subject,
+            "recipients": list(message.recipients),
+            "body": message.body,
+            "html": message.html,
+            "sender": message.sender,
+            "attempts": 0,
+        }
+        try:
+            path: Optional[str] = self._spool(data) if self._spool_path else None
+        except OSError as e:
+            self._logger.error(f"Failed to spool message {data['subject']}: {str(e)}")
+            return False
+
+        self._queue.put(OutboxItem(data, path))
+        return True
+
+    def _spool(self, data: Dict[str, Any]) -> str:
+        # Names sort in enqueue order, so recovered messages keep their order
+        name: str = f"{time.time_ns():020d}-{uuid.uuid4().hex}.json"
+        path: str = os.path.join(self._spool_path, name)
+        self._write(path, data)
+        return path
+
+    def _write(self, path: str, data: Dict[str, Any]) -> None:
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self._spool_path, suffix=".tmp"
+        )
+        with os.fdopen(file_descriptor, "w") as temp_file:
+            json.dump(data, temp_file)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+
+    def _recover_spool(self) -> None:
+        if not self._spool_path:
+            return
+
+        # Messages a crashed process was sending go back to the spool
+        for path in glob.glob(os.path.join(self._spool_path, "*.json.*.sending")):
+            pid: int = int(path.rsplit(".", 2)[1])
+            if pid != os.getpid() and not is_process_running(pid):
+                try:
+                    os.rename(path, path.rsplit(".", 2)[0])
+                except OSError:
+                    pass
+
+        paths: List[str] = sorted(glob.glob(os.path.join(self._spool_path, "*.json")))
+        for path in paths:
+            try:
+                with open(path) as spool_file:
+                    self._queue.put(OutboxItem(json.load(spool_file), path))
+            except (OSError, ValueError) as e:
+                self._logger.error(f"Skipping unreadable spool file {path}: {str(e)}")
+        if paths:
+            self._logger.info(f"Queued {len(paths)} spooled messages")
+
+    @staticmethod
+    def _claim(path: str) -> Optional[str]:
+        """Rename a spool file to this process, None if another one got it."""
+        claimed_path: str = f"{path}.{os.getpid()}.sending"
+        try:
+            os.rename(path, claimed_path)
+        except FileNotFoundError:
+            return None
+        return claimed_path
+
+    def _run(self) -> None:
+        with self._app.app_context():
+            while True:
+                self._retry_due()
+                timeout: float = self._idle_timeout
+                if self._retries:
+                    timeout = min(timeout, self._retries[0][0] - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    if timeout >= self._idle_timeout:
+                        self._disconnect()
+                    continue
+
+                if item is self._STOP:
+                    self._queue.task_done()
+                    break
+                self._deliver(item)
+
+            self._release_retries()
+            self._disconnect()
+
+    def _deliver(self, item: OutboxItem) -> None:
+        """Claim a queued message and make its first attempt."""
+        if item.path is not None:
+            claimed_path: Optional[str] = self._claim(item.path)
+            if claimed_path is None:
+                # Sent or being sent by another process sharing the spool
+                self._queue.task_done()
+                return
+            item = item._replace(claimed_path=claimed_path)
+        self._attempt(item)
+
+    def _retry_due(self) -> None:
+        """Make another attempt at every failed message whose backoff is over."""
+        while self._retries and self._retries[0][0] <= time.monotonic():
+            _, _, item = heapq.heappop(self._retries)
+            self._attempt(item)
+
+    def _attempt(self, item: OutboxItem) -> None:
+        """
+        Send a claimed message. A message is done once it is sent or given
+        up on, a failed one is scheduled for another attempt instead.
+        """
+        data: Dict[str, Any] = item.message
+        try:
+            self._send(data)
+        except Exception as e:
+            self._disconnect()
+            data["attempts"] += 1
+            self._logger.warning(
+                f"Sending {data['subject']} failed "
+                f"({data['attempts']}/{self._max_attempts}): {str(e)}"
+            )
+            if item.claimed_path:
+                self._write(item.claimed_path, data)
+
+            if data["attempts"] >= self._max_attempts:
+                self._logger.error(f"Giving up on {data['subject']}")
+                if item.claimed_path:
+                    os.replace(item.claimed_path, f"{item.path}.failed")
+                self._queue.task_done()
+                return
+
+            delay: float = min(
+                self._backoff_seconds * 2 ** (data["attempts"] - 1),
+                self._max_backoff_seconds,
+            )
+            heapq.heappush(
+                self._retries,
+                (time.monotonic() + delay, next(self._retry_sequence), item),
+            )
+            return
+
+        if item.claimed_path:
+            os.remove(item.claimed_path)
+        self._queue.task_done()
+
+    def _release_retries(self) -> None:
+        """Give messages waiting for a retry back to the spool for the next start."""
+        while self._retries:
+            _, _, item = heapq.heappop(self._retries)
+            if item.claimed_path:
+                os.replace(item.claimed_path, item.path)
+            self._queue.task_done()
+
+    def _send(self, data: Dict[str, Any]) -> None:
+        if self._connection is None:
+            connection: Connection = self._mail.connect()
+            connection.__enter__()
+            self._connection = connection
+            self._connection_count += 1
+
+        self._connection.send(
+            Message(
+                subject=data["subject"],
+                recipients=data["recipients"],
+                body=data["body"],
+                html=data["html"],
+                sender=data["sender"],
+            )
+        )
+
+    def _disconnect(self) -> None:
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        try:
+            connection.__exit__(None, None, None)
+        except Exception as e:
+            # The server may already have dropped the connection
+            self._logger.debug(f"Closing the SMTP connection failed: {str(e)}")
@@ -0,0 +1,13 @@
+import os
+
+
+def is_process_running(pid: int) -> bool:
+    """True if a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # It exists, but belongs to another user
+        return True
+    return True
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+from util.logger import get_logger
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket used to keep HIBP lookups within the API quota.
+
+    Tokens refill continuously at ``rate`` tokens per second up to ``capacity``.
+    Every call to ``acquire`` takes one token and blocks until one is available,
+    ``acquire_async`` does the same without blocking the event loop.
+
+    The rate adapts with AIMD: ``throttle`` halves it and pauses the bucket when
+    the API answers with 429, ``recover`` adds back a fraction of the configured
+    rate after every successful request.
+    """
+
+    _logger = get_logger(__name__)
+    _DECREASE_FACTOR: float = 0.5
+    _INCREASE_STEP: float = 0.1
+    _MIN_RATE_FRACTION: float = 1 / 16
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be greater than 0")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        self._rate: float = rate
+        self._max_rate: float = rate
+        self._min_rate: float = rate * self._MIN_RATE_FRACTION
+        self._paused_until: float = 0.0
+        self._capacity: float = capacity
+        self._tokens: float = capacity
+        self._last_refill: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(
+        cls, requests_per_minute: int, burst: int = 1
+    ) -> "TokenBucketRateLimiter":
+        """
+        Creates a limiter sized to an HIBP subscription tier.
+        :param requests_per_minute: Requests per minute allowed by the tier.
+        :param burst: Number of requests that may be sent back to back.
+        :return: A TokenBucketRateLimiter instance.
+        """
+        return cls(rate=requests_per_minute / 60.0, capacity=burst)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def max_rate(self) -> float:
+        return self._max_rate
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    def throttle(self, retry_after: float = 0.0) -> None:
+        """
+        Multiplicatively decreases the rate and holds every acquirer back.
+        :param retry_after: Seconds to wait before the next request, from the Retry-After header.
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self._refill(now)
+            self._rate = max(self._min_rate, self._rate * self._DECREASE_FACTOR)
+            # Leave a single token so the retry goes out as soon as the pause ends
+            self._tokens = 1.0
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._logger.warning(
+                f"Throttled to {self._rate * 60:.1f} requests/minute, "
+                f"pausing for {retry_after:.1f} seconds"
+            )
+
+    def recover(self) -> None:
+        """Additively increases the rate back towards the configured one."""
+        with self._lock:
+            if self._rate < self._max_rate:
+                self._refill(time.monotonic())
+                self._rate = min(
+                    self._max_rate, self._rate + self._max_rate * self._INCREASE_STEP
+                )
+
+    def _refill(self, now: float) -> None:
+        if now < self._paused_until:
+            self._last_refill = now
+            return
+
+        elapsed: float = now - max(self._last_refill, self._paused_until)
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._last_refill = now
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token without waiting.
+        :return: True if a token was taken, False otherwise.
+        """
+        return self._reserve() == 0
+
+    def _reserve(self) -> float:
+        """
+        Takes a token if one is available.
+        :return: 0 if a token was taken, otherwise the seconds until one may be.
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self) -> float:
+        """
+        Blocks until a token is available and takes it.
+        :return: The number of seconds spent waiting.
+        """
+        waited: float = 0.0
+        while wait_time := self._reserve():
+            time.sleep(wait_time)
+            waited += wait_time
+        return waited
+
+    async def acquire_async(self) -> float:
+        """
+        Waits on the event loop until a token is available and takes it.
+        :return: The number of seconds spent waiting.
+        """
+        waited: float = 0.0
+        while wait_time := self._reserve():
+            await asyncio.sleep(wait_time)
+            waited += wait_time
+        return waited
@@ -0,0 +1,297 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from util.generation_counter import GenerationCounter
+from util.logger import get_logger
+
+
+class CachedResponse(NamedTuple):
+    fingerprint: str
+    body: str
+    etag: Optional[str]
+    fetched_at: float
+    # Parsed body, only kept in memory
+    parsed: Optional[List[Any]] = None
+
+
+class HibpResponseCache:
+    """
+    LRU cache of breached-account responses keyed by a hash of the email.
+
+    Entries are mirrored to a small SQLite file so they survive restarts.
+    A response whose fingerprint matches the cached one is reported as
+    unchanged, which lets callers skip parsing and diffing it again.
+
+    A changed response is uncommitted until the caller has saved what it
+    learned from it: it is only kept in memory, commit() writes it to the
+    file and discard() restores the previous response, so a failed save or
+    a crash never makes the next lookup look unchanged.
+
+    Invalidations are shared with every process using the same file: they
+    bump a generation counter next to it, and the other processes reload
+    the file before their next lookup.
+    """
+
+    _logger = get_logger(__name__)
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 10000,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ) -> None:
+        self._max_entries: int = max_entries
+        self._ttl_seconds: float = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        # Previous response of every uncommitted key, None if there was none
+        self._uncommitted: Dict[str, Optional[CachedResponse]] = {}
+        self._lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        # Only a cache backed by a file is shared with other processes
+        self._generation: Optional[GenerationCounter] = (
+            GenerationCounter(f"{path}.generation") if path else None
+        )
+        self._loaded_generation: Optional[Tuple[int, ...]] = (
+            self._generation.current() if self._generation else None
+        )
+
+        if path:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS hibp_response_cache ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, body TEXT NOT NULL, "
+                "etag TEXT, fetched_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+            self._load()
+
+    @staticmethod
+    def make_key(email: str, truncate_response: bool = False) -> str:
+        digest: str = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return f"{digest}:{int(truncate_response)}"
+
+    @staticmethod
+    def fingerprint(body: str) -> str:
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    def _load(self) -> None:
+        rows = self._connection.execute(
+            "SELECT key, fingerprint, body, etag, fetched_at FROM hibp_response_cache "
+            "ORDER BY fetched_at DESC LIMIT ?",
+            (self._max_entries,),
+        ).fetchall()
+        for key, fingerprint, body, etag, fetched_at in reversed(rows):
+            self._entries[key] = CachedResponse(fingerprint, body, etag, fetched_at)
+        self._logger.info(f"Loaded {len(self._entries)} cached HIBP responses")
+
+    def _sync(self) -> None:
+        """
+        Drops every entry, uncommitted ones included, and reloads the file
+        if another process invalidated entries since it was loaded.
+        Must be called with the lock held.
+        """
+        if self._generation is None:
+            return
+        generation: Tuple[int, ...] = self._generation.current()
+        if generation == self._loaded_generation:
+            return
+        self._loaded_generation = generation
+        self._entries.clear()
+        self._uncommitted.clear()
+        self._load()
+
+    def _is_expired(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.fetched_at > self._ttl_seconds
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns a cached response that has not expired, without counting a hit or miss.
+        """
+        with self._lock:
+            self._sync()
+            entry: Optional[CachedResponse] = self._entries.get(key)
+            if entry is None or self._is_expired(entry):
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        """Stores a committed response, in memory and in the file."""
+        with self._lock:
+            self._uncommitted.pop(key, None)
+            self._store(key, entry, persist=True)
+
+    def _store(self, key: str, entry: CachedResponse, persist: bool) -> None:
+        """Must be called with the lock held."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        evicted: List[str] = []
+        while len(self._entries) > self._max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._uncommitted.pop(evicted_key, None)
+            evicted.append(evicted_key)
+
+        if self._connection and (persist or evicted):
+            if persist:
+                self._write(key, entry)
+            if evicted:
+                self._connection.executemany(
+                    "DELETE FROM hibp_response_cache WHERE key = ?",
+                    [(evicted_key,) for evicted_key in evicted],
+                )
+            self._connection.commit()
+
+    def _write(self, key: str, entry: CachedResponse) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO hibp_response_cache "
+            "(key, fingerprint, body, etag, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (key, entry.fingerprint, entry.body, entry.etag, entry.fetched_at),
+        )
+
+    def commit(self, key: str) -> None:
+        """Writes the uncommitted response of key to the file."""
+        with self._lock:
+            if key not in self._uncommitted:
+                return
+            del self._uncommitted[key]
+            entry: Optional[CachedResponse] = self._entries.get(key)
+            if entry is not None and self._connection:
+                self._write(key, entry)
+                self._connection.commit()
+
+    def discard(self, key: str) -> None:
+        """Restores the response key had before its uncommitted one."""
+        with self._lock:
+            if key not in self._uncommitted:
+                return
+            previous: Optional[CachedResponse] = self._uncommitted.pop(key)
+            if previous is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = previous
+
+    def commit_email(self, email: str) -> None:
+        """Commits every lookup of an email, once its changes are saved."""
+        for truncate_response in (False, True):
+            self.commit(self.make_key(email, truncate_response))
+
+    def discard_email(self, email: str) -> None:
+        """Discards every uncommitted lookup of an email, e.g. when saving failed."""
+        for truncate_response in (False, True):
+            self.discard(self.make_key(email, truncate_response))
+
+    def resolve(
+        self,
+        key: str,
+        body: str,
+        etag: Optional[str],
+        parse: Callable[[str], List[Any]],
+    ) -> Tuple[List[Any], bool]:
+        """
+        Compares a fresh response body with the cached one.
+        :param key: Cache key of the lookup.
+        :param body: Raw response body.
+        :param etag: ETag header of the response, if any.
+        :param parse: Turns the body into models, only called when it changed.
+        :return: The parsed body and whether it differs from the cached one.
+            A changed body stays uncommitted until commit or discard.
+        """
+        fingerprint: str = self.fingerprint(body)
+        entry: Optional[CachedResponse] = self.get(key)
+        if entry and entry.fingerprint == fingerprint:
+            return self._hit(key, entry, etag, parse), False
+
+        self._count(hit=False)
+        parsed: List[Any] = parse(body)
+        with self._lock:
+            self._uncommitted.setdefault(key, self._entries.get(key))
+            self._store(
+                key,
+                CachedResponse(fingerprint, body, etag, time.time(), parsed),
+                persist=False,
+            )
+        return parsed, True
+
+    def resolve_not_modified(
+        self, key: str, parse: Callable[[str], List[Any]]
+    ) -> Optional[List[Any]]:
+        """
+        Handles a 304 answer to a conditional request.
+        :return: The cached parsed body, or None if the entry is gone.
+        """
+        entry: Optional[CachedResponse] = self.get(key)
+        if entry is None:
+            return None
+        return self._hit(key, entry, entry.etag, parse)
+
+    def _hit(
+        self,
+        key: str,
+        entry: CachedResponse,
+        etag: Optional[str],
+        parse: Callable[[str], List[Any]],
+    ) -> List[Any]:
+        self._count(hit=True)
+        if entry.parsed is not None and etag == entry.etag:
+            return entry.parsed
+
+        # The fetch time is left alone, so the TTL bounds how long a body is
+        # trusted without a full re-check even if it never changes.
+        updated: CachedResponse = entry._replace(
+            etag=etag or entry.etag,
+            parsed=entry.parsed if entry.parsed is not None else parse(entry.body),
+        )
+        with self._lock:
+            if updated.etag != entry.etag:
+                self._store(key, updated, persist=key not in self._uncommitted)
+            elif key in self._entries:
+                self._entries[key] = updated
+        return updated.parsed
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._uncommitted.pop(key, None)
+            if self._connection:
+                self._connection.execute(
+                    "DELETE FROM hibp_response_cache WHERE key = ?", (key,)
+                )
+                self._connection.commit()
+        if self._generation:
+            self._generation.bump()
+
+    def invalidate_email(self, email: str) -> None:
+        """Forgets every cached lookup of an email, so its next check is a full diff."""
+        for truncate_response in (False, True):
+            self.invalidate(self.make_key(email, truncate_response))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._uncommitted.clear()
+            if self._connection:
+                self._connection.execute("DELETE FROM hibp_response_cache")
+                self._connection.commit()
+        if self._generation:
+            self._generation.bump()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
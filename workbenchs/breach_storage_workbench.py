@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Breach Storage Workbench
+
+Compares the database size of the old pwned_platforms table, which copied
+every breach detail per email, with the normalized breaches catalog and
+email_breaches rows that migrate_pwned_platforms turns it into.
+
+Usage:
+    python workbenchs/breach_storage_workbench.py [--emails 1000] [--breaches 50]
+
+Every email is put in every breach, with HIBP sized descriptions.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from db.db import db  # noqa: E402
+from db import model  # noqa: E402, F401
+from db.migrations import migrate_pwned_platforms  # noqa: E402
+
+LEGACY_TABLE = (
+    "CREATE TABLE pwned_platforms (id INTEGER PRIMARY KEY, "
+    "email_id INTEGER NOT NULL REFERENCES emails (id) ON DELETE CASCADE, "
+    "name VARCHAR, title VARCHAR, domain VARCHAR NOT NULL, "
+    "breach_date DATE NOT NULL, added_date DATETIME, description VARCHAR, "
+    "is_verified BOOLEAN NOT NULL, data_classes TEXT, created_at DATETIME)"
+)
+DATA_CLASSES = json.dumps(
+    ["Email addresses", "IP addresses", "Names", "Passwords", "Usernames"]
+)
+
+
+def database_size(path: str) -> int:
+    """Size of the database file, after moving a WAL back into it"""
+    with db.engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(path)
+
+
+def seed_legacy(emails: int, breaches: int) -> None:
+    db.session.execute(
+        text(
+            "INSERT INTO users (id, user_name, email, password, created_at) "
+            "VALUES (1, 'admin', 'admin@example.com', 'x', CURRENT_TIMESTAMP)"
+        )
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO emails (id, user_id, email, created_at) "
+            "VALUES (:id, 1, :email, CURRENT_TIMESTAMP)"
+        ),
+        [{"id": i, "email": f"user{i}@example.com"} for i in range(1, emails + 1)],
+    )
+    db.session.execute(text(LEGACY_TABLE))
+    db.session.execute(
+        text(
+            "INSERT INTO pwned_platforms (email_id, name, title, domain, "
+            "breach_date, added_date, description, is_verified, data_classes, "
+            "created_at) VALUES (:email_id, :name, :name, :domain, '2020-01-01', "
+            "'2020-02-01 00:00:00', :description, 1, :data_classes, "
+            "'2024-01-01 00:00:00')"
+        ),
+        [
+            {
+                "email_id": email_id,
+                "name": f"Breach{i}",
+                "domain": f"breach{i}.com",
+                "description": f"<p>In 2020, Breach{i} suffered a data breach "
+                "that exposed user records. " * 8 + "</p>",
+                "data_classes": DATA_CLASSES,
+            }
+            for email_id in range(1, emails + 1)
+            for i in range(breaches)
+        ],
+    )
+    db.session.commit()
+    with db.engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql(
+            "VACUUM"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--breaches", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(
+        tempfile.mkdtemp(prefix="breach_storage_workbench_"), "hibp.sqlite3"
+    )
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        seed_legacy(args.emails, args.breaches)
+        legacy_size = database_size(path)
+
+        started = time.perf_counter()
+        migrate_pwned_platforms()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        normalized_size = database_size(path)
+
+    rows = args.emails * args.breaches
+    print(f"{rows} email breaches, migrated in {elapsed_ms:.0f} ms")
+    for name, size in (
+        ("pwned_platforms", legacy_size),
+        ("breaches + email_breaches", normalized_size),
+    ):
+        print(f"  {name:<26} {size / 1024 / 1024:8.2f} MiB")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+JSON Response Workbench
+
+Times building the GET /api/pwned_platforms response body the old way
+(validated ResponseModel, model_dump and Flask's stdlib JSON provider)
+against util.json_response (model_construct and orjson).
+
+Usage:
+    python workbenchs/json_response_workbench.py [--rows 500 5000] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime
+
+from flask import Flask, Response, json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from db.custom_data_model.pwned_platform_row import PwnedPlatformRow  # noqa: E402
+from model.response_model import ResponseModel  # noqa: E402
+from util.json_response import json_response  # noqa: E402
+
+
+def make_platforms(rows: int) -> list:
+    return [
+        PwnedPlatformRow(
+            id=i,
+            email_id=i % 100,
+            name=f"Breach{i}",
+            title=f"Breach {i}",
+            domain=f"breach{i}.com",
+            breach_date=date(2020, 1, 1),
+            added_date=datetime(2020, 2, 1),
+            description="A breach description " * 10,
+            is_verified=True,
+            data_classes=["Email addresses", "Passwords", "Usernames"],
+            created_at=datetime(2024, 1, 1),
+        ).to_json()
+        for i in range(rows)
+    ]
+
+
+def stdlib_response(data: dict) -> Response:
+    return Response(
+        response=json.dumps(
+            ResponseModel(success=True, message="ok", data=data, error="").model_dump()
+        ),
+        status=200,
+        mimetype="application/json",
+    )
+
+
+def orjson_response(data: dict) -> Response:
+    return json_response(success=True, message="ok", data=data, error="")
+
+
+def best_of(repeat: int, func, data: dict) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    with app.app_context():
+        for rows in args.rows:
+            data = {"platforms": make_platforms(rows), "next_after_id": rows}
+            for name, func in (
+                ("ResponseModel + stdlib", stdlib_response),
+                ("json_response + orjson", orjson_response),
+            ):
+                elapsed_ms = best_of(args.repeat, func, data) * 1000
+                print(f"{rows:>6} rows {name:<24} {elapsed_ms:8.2f} ms")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Read Model Workbench
+
+Compares the ORM read path (hydrating EmailBreach / Email objects and
+calling to_json) with the column-projected rows used by the list endpoints.
+
+Usage:
+    python workbenchs/read_model_workbench.py [--sizes 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime
+
+from flask import Flask
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from db.db import db  # noqa: E402
+from db import model  # noqa: E402, F401
+from db.model.email import Email  # noqa: E402
+from db.model.breach import Breach  # noqa: E402
+from db.model.email_breach import EmailBreach  # noqa: E402
+from repository.email_repository import EmailRepository  # noqa: E402
+from repository.pwned_platform_repository import PwnedPlatformRepository  # noqa: E402
+
+
+def seed(rows: int) -> None:
+    db.drop_all()
+    db.create_all()
+    db.session.execute(
+        text(
+            "INSERT INTO users (id, user_name, email, password, created_at) "
+            "VALUES (1, 'admin', 'admin@example.com', 'x', CURRENT_TIMESTAMP)"
+        )
+    )
+    email_count = max(rows // 10, 1)
+    db.session.execute(
+        Email.__table__.insert(),
+        [
+            {"id": i, "user_id": 1, "email": f"user{i}@example.com"}
+            for i in range(1, email_count + 1)
+        ],
+    )
+    breach_count = max(rows // 100, 1)
+    db.session.execute(
+        Breach.__table__.insert(),
+        [
+            {
+                "id": i,
+                "name": f"Breach{i}",
+                "title": f"Breach {i}",
+                "domain": f"breach{i}.com",
+                "breach_date": date(2020, 1, 1),
+                "added_date": datetime(2020, 2, 1),
+                "description": "A breach description " * 10,
+                "is_verified": True,
+            }
+            for i in range(1, breach_count + 1)
+        ],
+    )
+    db.session.commit()
+    PwnedPlatformRepository().bulk_insert(
+        [
+            {
+                "email_id": i % email_count + 1,
+                "breach_id": i // email_count % breach_count + 1,
+                "detected_at": datetime.now(),
+            }
+            for i in range(rows)
+        ]
+    )
+    db.session.remove()
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+        # Start each run with an empty identity map, like a new request
+        db.session.remove()
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite://", SQLALCHEMY_TRACK_MODIFICATIONS=False
+    )
+    db.init_app(app)
+    pwned_platform_repository = PwnedPlatformRepository()
+    email_repository = EmailRepository()
+
+    with app.app_context():
+        for size in args.sizes:
+            seed(size)
+            cases = {
+                "pwned_platforms orm": lambda: [
+                    platform.to_json() for platform in EmailBreach.query.all()
+                ],
+                "pwned_platforms rows": lambda: [
+                    row.to_json() for row in pwned_platform_repository.iter_rows()
+                ],
+                "emails orm": lambda: [
+                    {"id": email.id, "email": email.email}
+                    for email in email_repository.get_all()
+                ],
+                "emails rows": lambda: [
+                    row.to_json() for row in email_repository.get_all_rows()
+                ],
+            }
+            for name, case in cases.items():
+                elapsed_ms = best_of(args.repeat, case) * 1000
+                print(f"{size:>7} {name:<22} {elapsed_ms:9.1f} ms")
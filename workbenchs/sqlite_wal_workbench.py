@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+SQLite WAL Workbench
+
+Measures dashboard read throughput while a sweep is writing breaches,
+once per SQLite pragma profile.
+
+Usage:
+    python workbenchs/sqlite_wal_workbench.py [--seconds 5] [--readers 4] [--rows 20000]
+
+A writer thread bulk inserts pwned platforms in small transactions, like
+PwnChecker does, while reader threads page through GET /api/pwned_platforms
+style queries. Reads that fail with "database is locked" are counted as errors.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from flask import Flask
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from db.db import db, get_sqlite_engine_options  # noqa: E402
+from db import model  # noqa: E402, F401
+from db.model.breach import Breach  # noqa: E402
+from repository.pwned_platform_repository import PwnedPlatformRepository  # noqa: E402
+
+
+def create_benchmark_app(path: str, rows: int) -> Flask:
+    app = Flask(__name__)
+    uri = f"sqlite:///{path}"
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=uri,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS=get_sqlite_engine_options(uri),
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            text(
+                "INSERT INTO users (id, user_name, email, password, created_at) "
+                "VALUES (1, 'admin', 'admin@example.com', 'x', CURRENT_TIMESTAMP)"
+            )
+        )
+        db.session.execute(
+            text(
+                "INSERT INTO emails (id, user_id, email, created_at) "
+                "VALUES (1, 1, 'first@example.com', CURRENT_TIMESTAMP)"
+            )
+        )
+        db.session.execute(
+            Breach.__table__.insert(),
+            [
+                {
+                    "id": i + 1,
+                    "name": f"Breach{i}",
+                    "title": f"Breach {i}",
+                    "domain": f"breach{i}.com",
+                    "breach_date": date(2020, 1, 1),
+                }
+                for i in range(rows)
+            ],
+        )
+        db.session.commit()
+    return app
+
+
+def writer(app: Flask, rows: int, stop: threading.Event, stats: dict) -> None:
+    repository = PwnedPlatformRepository()
+    with app.app_context():
+        for start in range(0, rows, 50):
+            if stop.is_set():
+                break
+            batch = [
+                {"email_id": 1, "breach_id": i + 1}
+                for i in range(start, min(start + 50, rows))
+            ]
+            if repository.bulk_insert(batch):
+                stats["written"] += len(batch)
+            else:
+                stats["write_errors"] += 1
+
+
+def reader(
+    app: Flask, stop: threading.Event, stats: dict, lock: threading.Lock
+) -> None:
+    reads, errors = 0, 0
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                db.session.execute(
+                    text(
+                        "SELECT e.id, b.name, b.domain FROM email_breaches e "
+                        "JOIN breaches b ON b.id = e.breach_id "
+                        "ORDER BY e.id DESC LIMIT 100"
+                    )
+                ).all()
+                db.session.execute(text("SELECT COUNT(*) FROM email_breaches")).scalar()
+                reads += 1
+            except Exception:
+                db.session.rollback()
+                errors += 1
+            finally:
+                db.session.remove()
+    with lock:
+        stats["reads"] += reads
+        stats["read_errors"] += errors
+
+
+def run_profile(profile: str, seconds: float, readers: int, rows: int) -> dict:
+    os.environ["SQLITE_PRAGMA_PROFILE"] = profile
+    # Keep the rollback journal run from waiting out the default busy timeout
+    os.environ.setdefault("SQLITE_BUSY_TIMEOUT_MS", "5000")
+    directory = tempfile.mkdtemp(prefix="sqlite_wal_workbench_")
+    app = create_benchmark_app(os.path.join(directory, "hibp.sqlite3"), rows)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "read_errors": 0, "written": 0, "write_errors": 0}
+    threads = [threading.Thread(target=writer, args=(app, rows, stop, stats))]
+    threads += [
+        threading.Thread(target=reader, args=(app, stop, stats, lock))
+        for _ in range(readers)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        db.engine.dispose()
+    stats["reads_per_second"] = stats["reads"] / elapsed
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    for profile in ("default", "wal"):
+        result = run_profile(profile, args.seconds, args.readers, args.rows)
+        print(
+            f"{profile:>8}: {result['reads_per_second']:8.1f} reads/s, "
+            f"{result['read_errors']} read errors, "
+            f"{result['written']} rows written, {result['write_errors']} write errors"
+        )